@@ -50,10 +50,31 @@ type RepairT = {
   created_at: string;
 };
 
+// The list is keyset-paginated, newest first: follow `next` for older requests
+type RepairPageT = {
+  next: string | null;
+  results: RepairT[];
+};
+
+// Counts over every repair, from /fixrequests/repairs/stats/ (staff only)
+type RepairStatsT = {
+  counts: Record<string, number>;
+};
+
+const fetchStats = () => {
+  const token = typeof window !== 'undefined' ? localStorage.getItem('access') : null;
+  return axios.get<RepairStatsT>(`${API_BASE}/fixrequests/repairs/stats/`, {
+    headers: token ? { Authorization: `Bearer ${token}` } : {},
+  });
+};
+
 export default function AdminRepairsTable() {
   const [repairs, setRepairs] = useState<RepairT[]>([]);
   const [filtered, setFiltered] = useState<RepairT[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
+  const [counts, setCounts] = useState<Record<string, number> | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [search, setSearch] = useState('');
   const [snackbar, setSnackbar] = useState<{
     open: boolean;
@@ -74,12 +95,14 @@ export default function AdminRepairsTable() {
   const fetchRepairs = async () => {
     setLoading(true);
     try {
-      const res = await axios.get(`${API_BASE}/fixrequests/repairs/`);
-      const sorted = res.data.sort((a: RepairT, b: RepairT) => 
-        new Date(b.created_at).getTime() - new Date(a.created_at).getTime()
-      );
-      setRepairs(sorted);
-      setFiltered(sorted);
+      const [res, statsRes] = await Promise.all([
+        axios.get<RepairPageT>(`${API_BASE}/fixrequests/repairs/`),
+        fetchStats().catch(() => null),
+      ]);
+      setRepairs(res.data.results);
+      setFiltered(applySearch(res.data.results, search));
+      setNextPage(res.data.next);
+      setCounts(statsRes ? statsRes.data.counts : null);
     } catch (err) {
       console.error(err);
       setSnackbar({ open: true, message: 'Failed to fetch repair requests', type: 'error' });
@@ -88,25 +111,51 @@ export default function AdminRepairsTable() {
     }
   };
 
-  const handleSearch = (val: string) => {
-    setSearch(val);
+  const loadMore = async () => {
+    if (!nextPage) return;
+    setLoadingMore(true);
+    try {
+      const res = await axios.get<RepairPageT>(nextPage);
+      const all = [...repairs, ...res.data.results];
+      setRepairs(all);
+      setFiltered(applySearch(all, search));
+      setNextPage(res.data.next);
+    } catch (err) {
+      console.error(err);
+      setSnackbar({ open: true, message: 'Failed to load more repair requests', type: 'error' });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // Searches the requests loaded so far
+  const applySearch = (list: RepairT[], val: string) => {
     const lower = val.toLowerCase();
-    setFiltered(
-      repairs.filter(
-        (r) =>
-          r.client_name?.toLowerCase().includes(lower) ||
-          r.device_type?.toLowerCase().includes(lower) ||
-          r.client_phone?.includes(val) ||
-          r.status?.toLowerCase().includes(lower)
-      )
+    return list.filter(
+      (r) =>
+        r.client_name?.toLowerCase().includes(lower) ||
+        r.device_type?.toLowerCase().includes(lower) ||
+        r.client_phone?.includes(val) ||
+        r.status?.toLowerCase().includes(lower)
     );
   };
 
+  const handleSearch = (val: string) => {
+    setSearch(val);
+    setFiltered(applySearch(repairs, val));
+  };
+
   const updateStatus = async (id: string, status: string) => {
     try {
       await axios.patch(`${API_BASE}/fixrequests/repairs/${id}/`, { status });
       setSnackbar({ open: true, message: `Status updated to ${status.replace('_', ' ')}`, type: 'success' });
-      fetchRepairs();
+      // Update in place so the pages loaded so far stay; only the counts are refetched
+      const all = repairs.map((r) => (r.id === id ? { ...r, status } : r));
+      setRepairs(all);
+      setFiltered(applySearch(all, search));
+      fetchStats()
+        .then((res) => setCounts(res.data.counts))
+        .catch(() => setCounts(null));
     } catch (err) {
       console.error(err);
       setSnackbar({ open: true, message: 'Failed to update status', type: 'error' });
@@ -126,13 +175,20 @@ export default function AdminRepairsTable() {
     }
   };
 
-  // Calculate stats
-  const stats = {
-    total: repairs.length,
-    pending: repairs.filter(r => r.status === 'PENDING').length,
-    inProgress: repairs.filter(r => r.status === 'IN_PROGRESS').length,
-    completed: repairs.filter(r => r.status === 'COMPLETED').length,
-  };
+  // Calculate stats: server-wide counts, or the loaded requests if those are unavailable
+  const stats = counts
+    ? {
+        total: Object.values(counts).reduce((sum, n) => sum + n, 0),
+        pending: counts.PENDING ?? 0,
+        inProgress: counts.IN_PROGRESS ?? 0,
+        completed: counts.COMPLETED ?? 0,
+      }
+    : {
+        total: repairs.length,
+        pending: repairs.filter(r => r.status === 'PENDING').length,
+        inProgress: repairs.filter(r => r.status === 'IN_PROGRESS').length,
+        completed: repairs.filter(r => r.status === 'COMPLETED').length,
+      };
 
   const currentTime = new Date().toLocaleString('en-KE', {
     weekday: 'long',
@@ -357,6 +413,28 @@ export default function AdminRepairsTable() {
             </Table>
           )}
         </Box>
+
+        {/* Load More - older requests, one page at a time */}
+        {!loading && nextPage && (
+          <Box sx={{ py: 4, textAlign: 'center', borderTop: '1px solid #eee' }}>
+            <Button
+              variant="outlined"
+              onClick={loadMore}
+              disabled={loadingMore}
+              sx={{
+                borderColor: '#000',
+                color: '#000',
+                px: 6,
+                py: 1.5,
+                fontWeight: 700,
+                borderRadius: 0,
+                '&:hover': { borderColor: '#000', bgcolor: '#f8f8f8' },
+              }}
+            >
+              {loadingMore ? <CircularProgress size={22} sx={{ color: '#ff1493' }} /> : 'LOAD MORE'}
+            </Button>
+          </Box>
+        )}
       </Box>
 
       {/* Snackbar */}
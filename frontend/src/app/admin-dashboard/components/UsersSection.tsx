@@ -44,6 +44,12 @@ type UserT = {
   is_superuser?: boolean;
 };
 
+// The list is keyset-paginated, newest first, 50 per page: follow `next` for older users
+type UserPageT = {
+  next: string | null;
+  results: UserT[];
+};
+
 // === STYLED COMPONENTS ===
 const StyledPaper = styled(Paper)(({ theme }) => ({
   overflow: "hidden",
@@ -73,7 +79,9 @@ const API_REGISTER = `${API_BASE}/register/`;
 const UsersSection: React.FC = () => {
   const router = useRouter();
   const [users, setUsers] = useState<UserT[]>([]);
+  const [nextPage, setNextPage] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [saving, setSaving] = useState(false);
   const [deletingId, setDeletingId] = useState<number | null>(null);
 
@@ -114,6 +122,23 @@ const UsersSection: React.FC = () => {
   const token = typeof window !== "undefined" ? localStorage.getItem("access") : null;
 
   // === FETCH USERS ===
+  // One page; null after a redirect to the login page
+  const fetchPage = async (url: string): Promise<UserPageT | null> => {
+    const res = await fetch(url, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+
+    if (res.status === 401 || res.status === 403) {
+      localStorage.removeItem("access");
+      localStorage.removeItem("refresh");
+      router.push("/admin/login");
+      return null;
+    }
+
+    if (!res.ok) throw new Error(`Failed: ${res.status}`);
+    return res.json();
+  };
+
   const fetchUsers = async () => {
     if (!token) {
       router.push("/admin/login");
@@ -122,22 +147,10 @@ const UsersSection: React.FC = () => {
 
     setLoading(true);
     try {
-      const res = await fetch(API_USERS, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
-
-      if (res.status === 401 || res.status === 403) {
-        localStorage.removeItem("access");
-        localStorage.removeItem("refresh");
-        router.push("/admin/login");
-        return;
-      }
-
-      if (!res.ok) throw new Error(`Failed: ${res.status}`);
-
-      const data = await res.json();
-      const list = Array.isArray(data) ? data : data.results || [];
-      setUsers(list);
+      const page = await fetchPage(API_USERS);
+      if (!page) return;
+      setUsers(page.results);
+      setNextPage(page.next);
     } catch (err) {
       console.error("Fetch error:", err);
       setSnack({ open: true, msg: "Failed to load users", sev: "error" });
@@ -146,6 +159,23 @@ const UsersSection: React.FC = () => {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextPage || !token) return;
+
+    setLoadingMore(true);
+    try {
+      const page = await fetchPage(nextPage);
+      if (!page) return;
+      setUsers((prev) => [...prev, ...page.results]);
+      setNextPage(page.next);
+    } catch (err) {
+      console.error("Fetch error:", err);
+      setSnack({ open: true, msg: "Failed to load more users", sev: "error" });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchUsers();
   }, []);
@@ -276,7 +306,7 @@ const UsersSection: React.FC = () => {
     }
   };
 
-  // === FILTERED USERS ===
+  // === FILTERED USERS (among those loaded so far) ===
   const filteredUsers = users.filter((u) => {
     const matchesSearch =
       u.email.toLowerCase().includes(searchQuery.toLowerCase()) ||
@@ -443,6 +473,26 @@ const UsersSection: React.FC = () => {
               </Table>
             )}
           </Box>
+
+          {/* Load More - older users, one page at a time */}
+          {!loading && nextPage && (
+            <Box sx={{ py: 3, textAlign: "center", borderTop: "1px solid #ddd" }}>
+              <Button
+                variant="outlined"
+                onClick={loadMore}
+                disabled={loadingMore}
+                sx={{
+                  borderColor: "#000",
+                  color: "#000",
+                  px: 6,
+                  fontWeight: 700,
+                  "&:hover": { borderColor: "#000", bgcolor: "#f8f8f8" },
+                }}
+              >
+                {loadingMore ? <CircularProgress size={22} sx={{ color: "#000" }} /> : "LOAD MORE"}
+              </Button>
+            </Box>
+          )}
         </StyledPaper>
       </Box>
 
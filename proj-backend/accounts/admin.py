@@ -1,11 +1,39 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+from .filters import prefix_search
 from .models import User  # removed EmailOTP
 
+
+class EstimatedCountPaginator(Paginator):
+    """Use PostgreSQL's row estimate instead of COUNT(*) for the unfiltered list."""
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        if connection.vendor == 'postgresql' and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [query.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # reltuples is -1 until the table is first analyzed
+            if row and row[0] > 0:
+                return row[0]
+        return super().count
+
+
 class UserAdmin(BaseUserAdmin):
     list_display = ('email', 'full_name', 'is_staff', 'is_superuser')
+    list_filter = ('is_staff', 'is_superuser', 'is_active', 'date_joined')
     ordering = ('email',)
-    search_fields = ('email',)
+    search_fields = ('email', 'full_name')
+    search_help_text = "Email or name prefix (case-insensitive)"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         ('Personal info', {'fields': ('full_name',)}),
@@ -16,4 +44,8 @@ class UserAdmin(BaseUserAdmin):
                 'fields': ('email', 'password1', 'password2')}),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        # Indexed prefix match instead of the default LIKE '%term%' scan
+        return prefix_search(queryset, search_term), False
+
 admin.site.register(User, UserAdmin)
@@ -0,0 +1,122 @@
+# accounts/async_views.py
+"""
+Async login/register for the ASGI deployment (backend.asgi).
+
+Same request/response contract as LoginView/RegisterView, but the event loop
+only awaits: authenticate() (user lookup and PBKDF2) and registration
+hashing run on the bounded hashing pool and other DB access goes through
+the async ORM, so a login burst can't stall the worker.
+"""
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_logged_in
+from django.db import IntegrityError
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from backend.throttling import bucket_keys, check_rate
+from purchases.claims import aclaim_guest_orders, device_ids_from
+from .hashing import Overloaded, apooled_authenticate, get_hash_pool, server_timing
+from .models import User
+from .serializers import CredentialsSerializer, RegisterSerializer
+from .tokens import RevocableRefreshToken
+
+
+def _throttled(wait=1):
+    wait = math.ceil(wait)
+    response = JsonResponse(
+        {"detail": f"Request was throttled. Expected available in {wait} seconds."}, status=429
+    )
+    response['Retry-After'] = str(wait)
+    return response
+
+
+class AsyncJSONView(View):
+    http_method_names = ['post', 'options']
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Token endpoints, like DRF's APIView, don't use CSRF
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    @staticmethod
+    def parse(request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except (ValueError, UnicodeDecodeError):
+            return None
+        return data if isinstance(data, dict) else None
+
+
+class AsyncLoginView(AsyncJSONView):
+    async def post(self, request):
+        data = self.parse(request)
+        if data is None:
+            return JsonResponse({"detail": "Invalid JSON body"}, status=400)
+
+        serializer = CredentialsSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+        email = serializer.validated_data['email']
+        password = serializer.validated_data['password']
+
+        timings = {}
+        try:
+            user = await apooled_authenticate(request, timings=timings, email=email, password=password)
+        except Overloaded:
+            return _throttled()
+        if user is None:
+            return JsonResponse({"non_field_errors": ["Invalid credentials"]}, status=400)
+
+        refresh = RevocableRefreshToken.for_user(user)
+        await user_logged_in.asend(sender=user.__class__, request=request, user=user)
+        response = JsonResponse({
+            "access": str(refresh.access_token),
+            "refresh": str(refresh),
+            "claimed_orders": await aclaim_guest_orders(user, device_ids_from(request.META)),
+        }, status=200)
+        response['Server-Timing'] = server_timing(timings)
+        return response
+
+
+class AsyncRegisterView(AsyncJSONView):
+    throttle_scope = 'register'
+
+    async def post(self, request):
+        # Same buckets as RegisterView; drawing from Redis is a blocking round trip
+        wait = await sync_to_async(check_rate)(self.throttle_scope, bucket_keys(self.throttle_scope, request))
+        if wait:
+            return _throttled(wait)
+
+        data = self.parse(request)
+        if data is None:
+            return JsonResponse({"detail": "Invalid JSON body"}, status=400)
+
+        # Field + unique-email validation touches the DB
+        serializer = RegisterSerializer(data=data)
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=400)
+        validated = dict(serializer.validated_data)
+
+        timings = {}
+        try:
+            encoded = await get_hash_pool().acall(
+                make_password, validated.pop('password'), timings=timings
+            )
+        except Overloaded:
+            return _throttled()
+
+        validated['email'] = User.objects.normalize_email(validated['email'])
+        try:
+            user = await User.objects.acreate(password=encoded, **validated)
+        except IntegrityError:
+            return JsonResponse({"email": ["user with this email already exists."]}, status=400)
+
+        claimed = await aclaim_guest_orders(user, device_ids_from(request.META))
+        response = JsonResponse({"detail": "User created", "claimed_orders": claimed}, status=201)
+        response['Server-Timing'] = server_timing(timings)
+        return response
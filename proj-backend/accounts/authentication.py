@@ -0,0 +1,159 @@
+# accounts/authentication.py
+"""
+JWT authentication with cached user resolution.
+
+The stock JWTAuthentication loads the User row on every authenticated
+request. Here the user is resolved from a small per-process LRU, then the
+shared cache, and only then the database. Entries are keyed by user id plus
+a per-user version that User.save()/delete() and the User queryset's
+update()/delete() bump. The version is read from the shared tier on every
+request (backend/cache.py keeps ints out of its per-process tier), so edits
+made through UserUpdateView, the admin (including bulk actions) or a
+password change are picked up by every worker on its next request.
+Access tokens revoked via logout are rejected using accounts.revocation.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+from .revocation import is_revoked
+
+# Only what request handling needs; the password hash is never cached and
+# stays a deferred field on the returned instance.
+CACHED_FIELDS = (
+    'id', 'email', 'full_name', 'is_active', 'is_staff', 'is_superuser',
+    'date_joined', 'last_login',
+)
+
+# from_db() expects values in concrete-field order
+_FIELD_ORDER = [f.attname for f in User._meta.concrete_fields if f.attname in CACHED_FIELDS]
+
+SHARED_TTL = 60 * 5     # bounds staleness if a version bump is ever missed
+LOCAL_TTL = 30
+LOCAL_MAX_ENTRIES = 1024
+
+
+def _version_key(user_id):
+    return f'auth:user-version:{user_id}'
+
+
+def _user_key(user_id, version):
+    return f'auth:user:{user_id}:{version}'
+
+
+# ===================================================================
+# PER-USER VERSION
+# ===================================================================
+def get_user_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key, 0)
+    return version
+
+
+def bump_user_version(user_id):
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+# ===================================================================
+# PER-PROCESS LRU
+# ===================================================================
+class _LocalLRU:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_local = _LocalLRU(LOCAL_MAX_ENTRIES)
+
+
+# ===================================================================
+# RESOLUTION
+# ===================================================================
+def _build_user(values):
+    return User.from_db(DEFAULT_DB_ALIAS, _FIELD_ORDER, values)
+
+
+def resolve_user(user_id):
+    """Return a User for user_id (or None), hitting the DB only on a cache miss."""
+    version = get_user_version(user_id)
+    local_key = (user_id, version)
+
+    values = _local.get(local_key)
+    if values is None:
+        shared_key = _user_key(user_id, version)
+        values = cache.get(shared_key)
+        if values is None:
+            row = User.objects.filter(pk=user_id).values_list(*_FIELD_ORDER).first()
+            if row is None:
+                return None
+            values = tuple(row)
+            cache.set(shared_key, values, SHARED_TTL)
+        _local.set(local_key, values, LOCAL_TTL)
+
+    # Fresh instance per request so callers can't mutate a shared object
+    return _build_user(values)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if is_revoked(token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken(_("Token is blacklisted"))
+        return token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        # CHECK_REVOKE_TOKEN compares against the password hash, which is not cached
+        if api_settings.USER_ID_FIELD != 'id' or api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        user = resolve_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
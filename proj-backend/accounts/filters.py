@@ -0,0 +1,35 @@
+# accounts/filters.py
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django_filters import rest_framework as filters
+
+from .models import User
+
+
+class UserFilter(filters.FilterSet):
+    """
+    ?search=   case-insensitive prefix of email or full name (lower() indexes)
+    ?is_staff= true/false
+    ?joined_after= / ?joined_before=   ISO dates or datetimes on date_joined
+    """
+    search = filters.CharFilter(method='filter_search')
+    joined_after = filters.IsoDateTimeFilter(field_name='date_joined', lookup_expr='gte')
+    joined_before = filters.IsoDateTimeFilter(field_name='date_joined', lookup_expr='lt')
+
+    class Meta:
+        model = User
+        fields = ['is_staff']
+
+    def filter_search(self, queryset, name, value):
+        return prefix_search(queryset, value)
+
+
+def prefix_search(queryset, term):
+    """Users whose email or full name starts with `term`, ignoring case."""
+    term = term.strip().lower()
+    if not term:
+        return queryset
+    # Must match the indexed expressions exactly: LOWER(email), LOWER(full_name)
+    return queryset.alias(
+        email_lower=Lower('email'), full_name_lower=Lower('full_name'),
+    ).filter(Q(email_lower__startswith=term) | Q(full_name_lower__startswith=term))
@@ -0,0 +1,156 @@
+# accounts/hashing.py
+"""
+Bounded pool for password hashing.
+
+PBKDF2 is deliberately slow and CPU-bound. Running it on the request thread
+lets a login burst stall every worker, so login/register hand it to a small
+thread pool (hashlib releases the GIL while hashing). Once more than
+AUTH_HASH_MAX_PENDING hashes are queued or running, new ones are refused
+with Overloaded and the view answers 429 instead of piling up.
+
+Login runs the whole of django.contrib.auth.authenticate() on the pool
+(pooled_authenticate), so AUTHENTICATION_BACKENDS, user_can_authenticate,
+the user_login_failed signal and hash upgrades all apply as usual.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db import close_old_connections
+
+from backend.metrics import PASSWORD_HASH_PENDING
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when the hashing queue is full."""
+
+
+class HashStats:
+    """Rolling window of hash durations (ms) for logs/benchmarks."""
+
+    def __init__(self, window=1000):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def record(self, ms):
+        with self._lock:
+            self._samples.append(ms)
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {'count': 0, 'rejected': self.rejected}
+        pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+        return {
+            'count': len(samples),
+            'rejected': self.rejected,
+            'p50_ms': round(pick(0.50), 2),
+            'p95_ms': round(pick(0.95), 2),
+            'max_ms': round(samples[-1], 2),
+        }
+
+
+class HashingPool:
+    def __init__(self, workers, max_pending):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.stats = HashStats()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pwhash')
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def _admit(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.stats.rejected += 1
+                logger.warning("Password hashing queue full (%d pending); shedding request", self._pending)
+                raise Overloaded()
+            self._pending += 1
+        PASSWORD_HASH_PENDING.inc()
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+        PASSWORD_HASH_PENDING.dec()
+
+    def _timed(self, submitted, timings, fn, args):
+        # Pool threads keep their own DB connections; give them the age and
+        # health checks a request thread gets around each request
+        close_old_connections()
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            close_old_connections()
+            done = time.perf_counter()
+            hash_ms = (done - started) * 1000
+            self.stats.record(hash_ms)
+            if timings is not None:
+                timings['hash-wait'] = (started - submitted) * 1000
+                timings['hash'] = hash_ms
+
+    def call(self, fn, *args, timings=None):
+        """Run fn(*args) on the pool and block until it finishes."""
+        self._admit()
+        try:
+            future = self._executor.submit(self._timed, time.perf_counter(), timings, fn, args)
+            return future.result()
+        finally:
+            self._release()
+
+    async def acall(self, fn, *args, timings=None):
+        """Await fn(*args) on the pool without blocking the event loop."""
+        self._admit()
+        try:
+            future = self._executor.submit(self._timed, time.perf_counter(), timings, fn, args)
+            return await asyncio.wrap_future(future)
+        finally:
+            self._release()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hash_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    workers=settings.AUTH_HASH_WORKERS,
+                    max_pending=settings.AUTH_HASH_MAX_PENDING,
+                )
+    return _pool
+
+
+def _authenticate(request, credentials):
+    return authenticate(request, **credentials)
+
+
+def pooled_authenticate(request, timings=None, **credentials):
+    """authenticate() on the hashing pool. May raise Overloaded."""
+    return get_hash_pool().call(_authenticate, request, credentials, timings=timings)
+
+
+async def apooled_authenticate(request, timings=None, **credentials):
+    """Awaitable pooled_authenticate(). May raise Overloaded."""
+    return await get_hash_pool().acall(_authenticate, request, credentials, timings=timings)
+
+
+def server_timing(timings):
+    """Format collected timings as a Server-Timing header value."""
+    return ', '.join(f'{name};dur={ms:.1f}' for name, ms in timings.items())
@@ -0,0 +1,20 @@
+# accounts/indexes.py
+from django.db import models
+
+
+class PatternIndex(models.Index):
+    """
+    Expression index that can serve `LIKE 'prefix%'`.
+
+    On PostgreSQL a plain b-tree only supports LIKE under the C collation, so
+    the expressions are indexed with text_pattern_ops there. Other backends
+    get an ordinary expression index.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        index = self
+        if schema_editor.connection.vendor == 'postgresql' and self.expressions:
+            from django.contrib.postgres.indexes import OpClass
+            index = self.clone()
+            index.expressions = tuple(OpClass(e, name='text_pattern_ops') for e in self.expressions)
+        return super(PatternIndex, index).create_sql(model, schema_editor, using=using, **kwargs)
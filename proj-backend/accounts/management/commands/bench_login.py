@@ -0,0 +1,100 @@
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, RequestFactory
+
+from accounts.async_views import AsyncLoginView
+from accounts.hashing import get_hash_pool
+from accounts.models import User
+from accounts.views import LoginView
+
+EMAIL = 'bench-login@cloudtech.invalid'
+PASSWORD = 'bench-login-password'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure login throughput and latency at several concurrency levels, "
+        "for the async (ASGI) and/or sync (WSGI) login view."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', default='1,4,16,64',
+                            help="Comma-separated concurrency levels.")
+        parser.add_argument('--requests', type=int, default=200, help="Logins per level.")
+        parser.add_argument('--mode', choices=['async', 'sync', 'both'], default='both')
+
+    def handle(self, *args, **options):
+        levels = [int(x) for x in options['concurrency'].split(',') if x]
+        total = options['requests']
+        body = json.dumps({'email': EMAIL, 'password': PASSWORD})
+
+        user = User.objects.filter(email=EMAIL).first() or User.objects.create_user(EMAIL, PASSWORD)
+        pool = get_hash_pool()
+        self.stdout.write(
+            f"hash pool: {pool.workers} workers, max {pool.max_pending} pending; {total} logins per level"
+        )
+        try:
+            for mode in (['async', 'sync'] if options['mode'] == 'both' else [options['mode']]):
+                for level in levels:
+                    run = self._run_async if mode == 'async' else self._run_sync
+                    elapsed, results = run(body, level, total)
+                    self._report(mode, level, elapsed, results)
+        finally:
+            user.delete()
+        self.stdout.write(f"hash stats: {pool.stats.snapshot()}")
+
+    def _run_async(self, body, level, total):
+        view = AsyncLoginView.as_view()
+        factory = AsyncRequestFactory()
+
+        async def one():
+            request = factory.post('/api/accounts/login/', body, content_type='application/json')
+            started = time.perf_counter()
+            response = await view(request)
+            return response.status_code, (time.perf_counter() - started) * 1000
+
+        async def main():
+            semaphore = asyncio.Semaphore(level)
+
+            async def bounded():
+                async with semaphore:
+                    return await one()
+
+            return await asyncio.gather(*(bounded() for _ in range(total)))
+
+        started = time.perf_counter()
+        results = asyncio.run(main())
+        return time.perf_counter() - started, results
+
+    def _run_sync(self, body, level, total):
+        view = LoginView.as_view()
+        factory = RequestFactory()
+
+        def one(_):
+            request = factory.post('/api/accounts/login/', body, content_type='application/json')
+            started = time.perf_counter()
+            response = view(request)
+            return response.status_code, (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            results = list(executor.map(one, range(total)))
+        return time.perf_counter() - started, results
+
+    def _report(self, mode, level, elapsed, results):
+        ok = sorted(ms for code, ms in results if code == 200)
+        shed = sum(1 for code, _ in results if code == 429)
+        other = len(results) - len(ok) - shed
+        line = f"  {mode:<5} c={level:<4} {len(ok) / elapsed:8.1f} logins/s"
+        if ok:
+            p99 = ok[min(len(ok) - 1, int(0.99 * len(ok)))]
+            line += f"   p50 {statistics.median(ok):7.1f} ms   p99 {p99:7.1f} ms"
+        line += f"   429s {shed}"
+        if other:
+            line += f"   errors {other}"
+        self.stdout.write(line)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.revocation import compact
+
+
+class Command(BaseCommand):
+    help = "Delete revoked-token entries whose tokens have already expired (run periodically)."
+
+    def handle(self, *args, **options):
+        deleted = compact()
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted} expired revocation(s)."))
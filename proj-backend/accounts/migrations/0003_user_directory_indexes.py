@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:55
+
+import accounts.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_revoked_tokens'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=accounts.indexes.PatternIndex(django.db.models.functions.text.Lower('email'), name='user_email_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=accounts.indexes.PatternIndex(django.db.models.functions.text.Lower('full_name'), name='user_full_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ),
+    ]
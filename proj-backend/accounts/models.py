@@ -1,9 +1,33 @@
 # accounts/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.utils import timezone
+from .indexes import PatternIndex
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    # Bulk paths (admin "delete selected", bulk_update, .update(is_active=False))
+    # skip User.save()/delete(), so they invalidate cached principals here
+    def update(self, **kwargs):
+        pks = list(self.values_list('pk', flat=True))
+        rows = super().update(**kwargs)
+        _invalidate_cached_principals(pks)
+        return rows
+
+    def delete(self):
+        pks = list(self.values_list('pk', flat=True))
+        result = super().delete()
+        _invalidate_cached_principals(pks)
+        return result
+
+
+def _invalidate_cached_principals(pks):
+    from .authentication import bump_user_version
+    if pks:
+        transaction.on_commit(lambda: [bump_user_version(pk) for pk in pks])
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError("Users must have an email address")
@@ -33,9 +57,32 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
+    class Meta:
+        indexes = [
+            # 🔍 Prefix search on the user directory (accounts.filters.UserFilter)
+            PatternIndex(Lower('email'), name='user_email_lower_idx'),
+            PatternIndex(Lower('full_name'), name='user_full_name_lower_idx'),
+            models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
+    # Any change (UserUpdateView, admin, set_password + save) invalidates the
+    # cached principal used by CachedJWTAuthentication
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._invalidate_cached_principal()
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        self._invalidate_cached_principal(pk)
+        return result
+
+    def _invalidate_cached_principal(self, pk=None):
+        _invalidate_cached_principals([pk or self.pk])
+
 import uuid
 from datetime import timedelta
 from django.utils import timezone
@@ -53,3 +100,13 @@ class EmailOTP(models.Model):
 
     def __str__(self):
         return f"OTP for {self.user.email} ({self.code})"
+
+
+class RevokedToken(models.Model):
+    """Revoked JWT ids; rows are useless once the token expires and get compacted."""
+    jti = models.CharField(max_length=64, primary_key=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.jti} (until {self.expires_at})"
@@ -0,0 +1,134 @@
+# accounts/revocation.py
+"""
+JWT revocation keyed by `jti`.
+
+Revoked ids live in the compact RevokedToken table (jti + expiry). Each
+worker mirrors the live ids in an in-memory Bloom filter, so the common
+"not revoked" answer costs a few hash probes and no round trip. Only a
+filter hit (a real revocation or a rare false positive) is confirmed
+against the table. Workers pull other workers' revocations with a small
+delta query every SYNC_INTERVAL seconds and rebuild the filter from scratch
+every REBUILD_INTERVAL, which also drops expired entries. Writes to the
+filter (revoke, sync, rebuild) hold one lock; lookups don't need it.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import RevokedToken
+
+FALSE_POSITIVE_RATE = 0.01
+MIN_CAPACITY = 10_000
+SYNC_INTERVAL = 2          # seconds between delta pulls from the table
+SYNC_OVERLAP = timedelta(seconds=30)   # re-read window for late-committing rows
+REBUILD_INTERVAL = 60 * 15
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=FALSE_POSITIVE_RATE):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(self.size // 8 + 1)
+        self.count = 0
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key):
+        fresh = False
+        for pos in self._positions(key):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                fresh = True
+        # Re-adding a known key (sync overlap) must not inflate the count
+        if fresh:
+            self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class _WorkerState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.watermark = None
+        self.synced_at = 0.0
+        self.built_at = 0.0
+
+    def rebuild(self):
+        now = timezone.now()
+        live = RevokedToken.objects.filter(expires_at__gt=now)
+        bloom = BloomFilter(max(MIN_CAPACITY, live.count() * 2))
+        for jti in live.values_list('jti', flat=True).iterator(chunk_size=5000):
+            bloom.add(jti)
+        self.bloom = bloom
+        self.watermark = now
+        self.synced_at = self.built_at = time.monotonic()
+
+    def sync(self):
+        now = timezone.now()
+        fresh = RevokedToken.objects.filter(
+            revoked_at__gte=self.watermark - SYNC_OVERLAP, expires_at__gt=now
+        ).values_list('jti', flat=True)
+        for jti in fresh:
+            self.bloom.add(jti)
+        self.watermark = now
+        self.synced_at = time.monotonic()
+
+    def _stale(self, now):
+        return self.bloom is None or now - self.built_at > REBUILD_INTERVAL \
+            or self.bloom.count > self.bloom.capacity
+
+    def _refresh(self):
+        # Under self.lock; another thread may have refreshed while we waited
+        now = time.monotonic()
+        if self._stale(now):
+            self.rebuild()
+        elif now - self.synced_at > SYNC_INTERVAL:
+            self.sync()
+
+    def current(self):
+        now = time.monotonic()
+        if self._stale(now) or now - self.synced_at > SYNC_INTERVAL:
+            with self.lock:
+                self._refresh()
+        return self.bloom
+
+    def add(self, jti):
+        # Same lock as sync() and rebuild(): a concurrent |= on the shared
+        # bytes can't drop the bit, and it can't land on a filter being replaced
+        with self.lock:
+            self._refresh()
+            self.bloom.add(jti)
+
+
+_state = _WorkerState()
+
+
+def is_revoked(jti):
+    if not jti:
+        return False
+    if jti not in _state.current():
+        return False
+    return RevokedToken.objects.filter(jti=jti, expires_at__gt=timezone.now()).exists()
+
+
+def revoke(jti, expires_at):
+    RevokedToken.objects.get_or_create(jti=jti, defaults={'expires_at': expires_at})
+    _state.add(jti)
+
+
+def compact(now=None):
+    """Delete entries whose tokens have expired anyway. Returns rows removed."""
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=now or timezone.now()).delete()
+    return deleted
@@ -1,5 +1,9 @@
 from rest_framework import serializers
-from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .tokens import RevocableRefreshToken
+from .hashing import get_hash_pool, pooled_authenticate
 
 User = get_user_model()
 
@@ -12,22 +16,32 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ['email', 'full_name', 'password']
 
     def create(self, validated_data):
-        return User.objects.create_user(**validated_data)
+        # Hash on the bounded pool (may raise hashing.Overloaded)
+        password = validated_data.pop('password')
+        encoded = get_hash_pool().call(make_password, password, timings=self.context.get('timings'))
+        user = User(**validated_data)
+        user.email = User.objects.normalize_email(user.email)
+        user.password = encoded
+        user.save()
+        return user
 
 
 # ---------------- Login ----------------
-class LoginSerializer(serializers.Serializer):
+class CredentialsSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
 
+
+class LoginSerializer(CredentialsSerializer):
     def validate(self, data):
-        email = data.get('email')
-        password = data.get('password')
-        user = authenticate(username=email, password=password)
-        if not user:
+        # authenticate() on the bounded pool (may raise hashing.Overloaded);
+        # inactive users are refused by the backend
+        user = pooled_authenticate(
+            self.context.get('request'), timings=self.context.get('timings'),
+            email=data.get('email'), password=data.get('password'),
+        )
+        if user is None:
             raise serializers.ValidationError("Invalid credentials")
-        if not user.is_active:
-            raise serializers.ValidationError("User account is disabled.")
         data['user'] = user
         return data
 
@@ -50,3 +64,12 @@ class UserSerializer(serializers.ModelSerializer):
             user.set_password(password)
             user.save()
         return user
+
+
+# ---------------- Token refresh / logout ----------------
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RevocableRefreshToken
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField()
@@ -1,3 +1,248 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.signals import user_login_failed
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import authentication
+from .async_views import AsyncLoginView, AsyncRegisterView
+from .hashing import get_hash_pool
+from .models import RevokedToken, User
+from .revocation import BloomFilter, _WorkerState, compact, is_revoked, revoke
+from .tokens import RevocableRefreshToken
+
+# Principals and versions are cached; keep each test run's cache to itself
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def clear_principal_cache():
+    # User ids are reused between tests; cached principals must not be
+    cache.clear()
+    authentication._local.clear()
+
+
+# ===================================================================
+# JTI REVOCATION (accounts/revocation.py, accounts/tokens.py)
+# ===================================================================
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000)
+        keys = [f'jti-{i}' for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+
+    def test_re_adding_does_not_count(self):
+        bloom = BloomFilter(100)
+        bloom.add('a')
+        bloom.add('a')
+        self.assertEqual(bloom.count, 1)
+
+
+class WorkerStateTests(SimpleTestCase):
+    def fresh_state(self):
+        state = _WorkerState()
+        state.bloom = BloomFilter(100)
+        state.built_at = state.synced_at = time.monotonic()
+        return state
+
+    def test_concurrent_callers_rebuild_once(self):
+        state = _WorkerState()
+        rebuilds = []
+
+        def rebuild():
+            rebuilds.append(1)
+            time.sleep(0.1)
+            state.bloom = BloomFilter(100)
+            state.built_at = state.synced_at = time.monotonic()
+
+        with mock.patch.object(state, 'rebuild', side_effect=rebuild):
+            threads = [threading.Thread(target=state.current) for _ in range(5)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(len(rebuilds), 1)
+
+    def test_add_waits_for_a_refresh_in_progress(self):
+        state = self.fresh_state()
+        with state.lock:
+            adder = threading.Thread(target=state.add, args=['jti-1'])
+            adder.start()
+            adder.join(0.1)
+            self.assertTrue(adder.is_alive())
+            state.bloom = BloomFilter(100)  # the refresh swaps in a new filter
+        adder.join()
+        self.assertIn('jti-1', state.bloom)
+
+
+class RevocationStoreTests(TestCase):
+    def test_revoke_and_expire(self):
+        now = timezone.now()
+        self.assertFalse(is_revoked('live'))
+        revoke('live', now + timedelta(hours=1))
+        revoke('stale', now - timedelta(seconds=1))
+        self.assertTrue(is_revoked('live'))
+        # Past its expiry the token is rejected anyway; the entry no longer counts
+        self.assertFalse(is_revoked('stale'))
+        self.assertEqual(compact(), 1)
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['live'])
+
+
+# Login authenticates on the hashing pool's threads, which only see committed rows
+@override_settings(CACHES=LOCMEM_CACHES)
+class RefreshRotationTests(TransactionTestCase):
+    def setUp(self):
+        clear_principal_cache()
+        User.objects.create_user('staff@example.com', 'correct horse', is_staff=True)
+        self.client = APIClient()
+        response = self.client.post(
+            '/api/accounts/login/', {'email': 'staff@example.com', 'password': 'correct horse'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.tokens = response.data
+
+    def refresh(self, token):
+        return self.client.post('/api/token/refresh/', {'refresh': token}, format='json')
+
+    def test_rotation_revokes_the_old_refresh_token(self):
+        response = self.refresh(self.tokens['refresh'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], self.tokens['refresh'])
+
+        self.assertEqual(self.refresh(self.tokens['refresh']).status_code, 401)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+
+    def test_logout_revokes_refresh_and_access(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}")
+        self.assertEqual(self.client.get('/api/accounts/users/').status_code, 200)
+
+        response = self.client.post('/api/accounts/logout/', {'refresh': self.tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get('/api/accounts/users/').status_code, 401)
+        self.client.credentials()
+        self.assertEqual(self.refresh(self.tokens['refresh']).status_code, 401)
+
+
+# ===================================================================
+# LOGIN (accounts/serializers.py, accounts/hashing.py)
+# ===================================================================
+@override_settings(CACHES=LOCMEM_CACHES)
+class LoginTests(TransactionTestCase):
+    def setUp(self):
+        clear_principal_cache()
+        self.user = User.objects.create_user('jane@example.com', 'correct horse')
+
+    def login(self, password='correct horse'):
+        return APIClient().post(
+            '/api/accounts/login/', {'email': 'jane@example.com', 'password': password}, format='json'
+        )
+
+    def test_logged_in_signal_updates_last_login(self):
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_failed_login_signal(self):
+        failures = []
+        handler = lambda sender, credentials, **kwargs: failures.append(credentials)
+        user_login_failed.connect(handler)
+        self.addCleanup(user_login_failed.disconnect, handler)
+        self.assertEqual(self.login('wrong').status_code, 400)
+        self.assertEqual(failures, [{'email': 'jane@example.com', 'password': '********************'}])
+
+    def test_inactive_user_refused(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.login().status_code, 400)
+
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher',
+    ])
+    def test_hash_upgraded(self):
+        self.user.password = make_password('correct horse', hasher='md5')
+        self.user.save()
+        self.assertEqual(self.login().status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+    async def test_async_view(self):
+        view = AsyncLoginView.as_view()
+        factory = AsyncRequestFactory()
+
+        def post(password):
+            return view(factory.post('/api/accounts/login/', {'email': 'jane@example.com', 'password': password},
+                                     content_type='application/json'))
+
+        self.assertEqual((await post('wrong')).status_code, 400)
+        response = await post('correct horse')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', json.loads(response.content))
+
+    def test_pool_threads_recycle_connections(self):
+        # Register hashes on the pool too; every pooled call is wrapped
+        with mock.patch('accounts.hashing.close_old_connections') as close:
+            self.assertEqual(self.login().status_code, 200)
+            get_hash_pool().call(make_password, 'x')
+        self.assertEqual(close.call_count, 4)
+
+
+# ===================================================================
+# CACHED PRINCIPALS (accounts/authentication.py)
+# ===================================================================
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedPrincipalTests(TestCase):
+    def setUp(self):
+        clear_principal_cache()
+        self.user = User.objects.create_user('staff@example.com', 'correct horse', is_staff=True)
+        self.client = APIClient()
+        refresh = RevocableRefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        # Warm the principal cache
+        self.assertEqual(self.client.get('/api/accounts/users/').status_code, 200)
+
+    def test_save_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_staff = False
+            self.user.save()
+        self.assertEqual(self.client.get('/api/accounts/users/').status_code, 403)
+
+    def test_bulk_update_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/accounts/users/').status_code, 401)
+
+    def test_queryset_delete_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).delete()
+        self.assertEqual(self.client.get('/api/accounts/users/').status_code, 401)
+
+
+# ===================================================================
+# REGISTRATION RATE LIMIT (accounts/async_views.py)
+# ===================================================================
+class AsyncRegisterThrottleTests(SimpleTestCase):
+    async def test_rate_checked_off_the_event_loop(self):
+        loops = []
+
+        def check_rate(scope, keys):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return 30.0
+
+        view = AsyncRegisterView.as_view()
+        request = AsyncRequestFactory().post('/api/accounts/register/', {}, content_type='application/json')
+        with mock.patch('accounts.async_views.check_rate', check_rate):
+            response = await view(request)
+        self.assertEqual((response.status_code, response['Retry-After']), (429, '30'))
+        self.assertEqual(loops, [None])
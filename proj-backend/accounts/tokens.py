@@ -0,0 +1,27 @@
+# accounts/tokens.py
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .revocation import is_revoked, revoke
+
+
+class RevocableRefreshToken(RefreshToken):
+    """
+    Refresh token backed by accounts.revocation instead of the
+    token_blacklist app, so BLACKLIST_AFTER_ROTATION actually revokes.
+    """
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if is_revoked(self.payload.get(api_settings.JTI_CLAIM)):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        revoke(self.payload[api_settings.JTI_CLAIM], datetime_from_epoch(self.payload['exp']))
+
+    def outstand(self):
+        # Nothing to track: only revoked ids are stored
+        return None
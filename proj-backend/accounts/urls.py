@@ -1,11 +1,17 @@
 # accounts/urls.py
+from django.conf import settings
 from django.urls import path
-from .views import RegisterView, LoginView
+from .views import RegisterView, LoginView, LogoutView
 from .views import UserListView, UserUpdateView
 
+# Under backend.asgi login/register are served by the async views
+if settings.ASYNC_AUTH_VIEWS:
+    from .async_views import AsyncLoginView as LoginView, AsyncRegisterView as RegisterView
+
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),  # direct login without OTP
+    path('logout/', LogoutView.as_view(), name='logout'),
     path('users/', UserListView.as_view(), name='user-list'),
     path('users/<int:id>/', UserUpdateView.as_view(), name='user-update'),
 ]
@@ -2,39 +2,89 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from .serializers import RegisterSerializer, LoginSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.exceptions import Throttled
+from django.contrib.auth.signals import user_logged_in
+from .serializers import RegisterSerializer, LoginSerializer, LogoutSerializer
+from .tokens import RevocableRefreshToken
+from .revocation import revoke
+from .hashing import Overloaded, server_timing
+from backend.throttling import TokenBucketThrottle
+from purchases.claims import claim_guest_orders, device_ids_from
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
 from rest_framework.generics import ListAPIView, RetrieveUpdateAPIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from .models import User
 from .serializers import UserSerializer
+from .filters import UserFilter
+from backend.pagination import KeysetPagination
 
 
 class RegisterView(APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'register'
 
     def post(self, request):
-        serializer = RegisterSerializer(data=request.data)
+        timings = {}
+        serializer = RegisterSerializer(data=request.data, context={'timings': timings})
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
-        return Response({"detail": "User created"}, status=status.HTTP_201_CREATED)
+        try:
+            user = serializer.save()
+        except Overloaded:
+            raise Throttled(wait=1)
+        claimed = claim_guest_orders(user, device_ids_from(request.META))
+        response = Response(
+            {"detail": "User created", "claimed_orders": claimed}, status=status.HTTP_201_CREATED
+        )
+        response['Server-Timing'] = server_timing(timings)
+        return response
 
 
 class LoginView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request):
-        serializer = LoginSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        timings = {}
+        serializer = LoginSerializer(data=request.data, context={'request': request, 'timings': timings})
+        try:
+            serializer.is_valid(raise_exception=True)
+        except Overloaded:
+            raise Throttled(wait=1)
         user = serializer.validated_data['user']
 
         # Create JWT tokens directly
-        refresh = RefreshToken.for_user(user)
+        refresh = RevocableRefreshToken.for_user(user)
+        user_logged_in.send(sender=user.__class__, request=request, user=user)
         data = {
             "access": str(refresh.access_token),
             "refresh": str(refresh),
+            "claimed_orders": claim_guest_orders(user, device_ids_from(request.META)),
         }
-        return Response(data, status=status.HTTP_200_OK)
+        response = Response(data, status=status.HTTP_200_OK)
+        response['Server-Timing'] = server_timing(timings)
+        return response
+
+
+class LogoutView(APIView):
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        """Revoke the given refresh token (and the calling access token, if any)."""
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            refresh = RevocableRefreshToken(serializer.validated_data['refresh'])
+        except TokenError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        refresh.blacklist()
+
+        access = request.auth
+        if access is not None and jwt_settings.JTI_CLAIM in access:
+            revoke(access[jwt_settings.JTI_CLAIM], datetime_from_epoch(access['exp']))
+
+        return Response({"detail": "Logged out"}, status=status.HTTP_200_OK)
 
 
 # -------------------------
@@ -42,9 +92,13 @@ class LoginView(APIView):
 # -------------------------
 
 class UserListView(ListAPIView):
-    queryset = User.objects.all()
+    """Newest first, 50 per page; follow `next`. See UserFilter for ?search= etc."""
+    queryset = User.objects.only('id', 'email', 'full_name', 'is_staff', 'is_superuser')
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-id',)
+    filterset_class = UserFilter
 
 
 class UserUpdateView(RetrieveUpdateAPIView):
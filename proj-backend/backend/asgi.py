@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Serve login/register from accounts.async_views (see settings.ASYNC_AUTH_VIEWS)
+os.environ.setdefault('ASYNC_AUTH_VIEWS', 'true')
+# ...and catalog/testimonial reads from the async views (settings.ASYNC_CATALOG_VIEWS)
+os.environ.setdefault('ASYNC_CATALOG_VIEWS', 'true')
 
 application = get_asgi_application()
@@ -0,0 +1,115 @@
+# backend/async_views.py
+"""
+Async read endpoints for the ASGI deployment (settings.ASYNC_CATALOG_VIEWS).
+
+async_routes(ViewSet) returns list and detail URL views for a DRF viewset.
+GET and HEAD are served on the event loop with the async ORM, and any
+other method goes to the viewset itself in a thread, so writes behave
+exactly as before. Reads go through the viewset's own filter backends,
+serializers and serializer context, so the JSON is the same as the sync
+views'. They run without DRF authentication; the catalog reads are
+AllowAny.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.http import Http404, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+CHUNK_SIZE = 500
+
+LIST_ACTIONS = {'get': 'list', 'post': 'create'}
+DETAIL_ACTIONS = {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+
+
+def json_response(data, status=200):
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def viewset_for(viewset_class, request, action, **kwargs):
+    """An instance of `viewset_class` set up as DRF would for `action`, without running it."""
+    view = viewset_class()
+    view.request = Request(request, authenticators=())
+    view.args, view.kwargs = (), kwargs
+    view.format_kwarg = None
+    view.action = action
+    return view
+
+
+async def alist_rows(view, queryset=None):
+    """The list action's rows, fetched in chunks with aiterator()."""
+    queryset = view.filter_queryset(view.get_queryset() if queryset is None else queryset)
+    return [row async for row in queryset.aiterator(chunk_size=CHUNK_SIZE)]
+
+
+async def alist(view, queryset=None):
+    """The list action's response body."""
+    return view.get_serializer(await alist_rows(view, queryset), many=True).data
+
+
+async def aget_object(view, queryset=None):
+    """The retrieve action's object; Http404 as get_object() would raise it."""
+    queryset = view.filter_queryset(view.get_queryset() if queryset is None else queryset)
+    lookup = view.lookup_url_kwarg or view.lookup_field
+    try:
+        return await queryset.aget(**{view.lookup_field: view.kwargs[lookup]})
+    except (ObjectDoesNotExist, TypeError, ValueError, ValidationError):
+        raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+
+
+async def aretrieve(view, queryset=None):
+    """The retrieve action's response body."""
+    return view.get_serializer(await aget_object(view, queryset)).data
+
+
+def _error(exc):
+    # Same body as DRF's exception handler
+    if isinstance(exc, Http404):
+        exc = NotFound(*exc.args)
+    detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(detail, status=exc.status_code)
+
+
+def read_or_fallback(read, fallback):
+    """
+    One URL view: `read` (async, returning data or a response) for GET/HEAD,
+    the sync `fallback` view in a thread otherwise.
+    """
+    view_attrs = {name: getattr(fallback, name) for name in ('cls', 'initkwargs', 'actions') if hasattr(fallback, name)}
+    fallback = sync_to_async(fallback)
+
+    async def view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await fallback(request, *args, **kwargs)
+        try:
+            result = await read(request, **kwargs)
+        except (APIException, Http404) as exc:
+            return _error(exc)
+        return result if isinstance(result, HttpResponse) else json_response(result)
+
+    # As the viewset's own view has them, for statement timeouts and view names
+    view.__dict__.update(view_attrs)
+    return csrf_exempt(view)
+
+
+def async_routes(viewset_class, list_read=alist, detail_read=aretrieve):
+    """
+    (list view, detail view) for `viewset_class`. The optional *_read
+    coroutines take the prepared viewset and return the response body, in
+    place of alist()/aretrieve().
+    """
+    list_actions = {m: a for m, a in LIST_ACTIONS.items() if hasattr(viewset_class, a)}
+    detail_actions = {m: a for m, a in DETAIL_ACTIONS.items() if hasattr(viewset_class, a)}
+
+    async def read_list(request):
+        return await list_read(viewset_for(viewset_class, request, 'list'))
+
+    async def read_detail(request, **kwargs):
+        return await detail_read(viewset_for(viewset_class, request, 'retrieve', **kwargs))
+
+    return (
+        read_or_fallback(read_list, viewset_class.as_view(list_actions)),
+        read_or_fallback(read_detail, viewset_class.as_view(detail_actions)),
+    )
@@ -0,0 +1,329 @@
+# backend/cache.py
+"""
+Two-tier cache backend: a small in-process LRU (L1) in front of a shared
+store (L2: Redis, or the file cache on a single host).
+
+Reads try L1, then L2, and copy L2 hits into L1. Writes go to both. L1
+entries live at most L1_TIMEOUT seconds, which bounds how long a worker can
+serve a value another worker has replaced. Ints (version counters) are never
+copied into L1, so a bump is seen by every worker on its next read. Atomic
+operations (add, incr, decr) always run on L2, so version keys and locks
+behave as they would on L2 alone: atomic across workers only when L2 is
+Redis. An error is logged at startup when DEBUG is off and it isn't.
+
+get_or_set() adds stampede protection:
+
+  * probabilistic early refresh ("XFetch"): a read may recompute an entry
+    shortly before it expires, with a probability that rises as expiry
+    nears and with how long the value took to build. One request refreshes
+    early instead of every request missing at once;
+  * a per-key single-flight lock in L2: only the request holding it
+    rebuilds. The others keep serving the current value or, on a cold miss,
+    wait up to LOCK_WAIT for it to appear.
+
+Per-process hit/miss counters are available from stats(); each lookup is
+also reported to backend.instrumentation for the current request and
+counted in backend.metrics.
+
+The async methods (aget, aset, aadd, adelete) answer L1 hits on the event
+loop and await only L2.
+
+    CACHES = {"default": {
+        "BACKEND": "backend.cache.TieredCache",
+        "OPTIONS": {
+            "L1_MAX_ENTRIES": 1000, "L1_TIMEOUT": 5,
+            "L2": {"BACKEND": "django.core.cache.backends.redis.RedisCache",
+                   "LOCATION": "redis://..."},
+        },
+    }}
+
+Tests can use LocMemCache as the L2 stand-in.
+"""
+import logging
+import math
+import pickle
+import random
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.utils.module_loading import import_string
+
+from .instrumentation import record_cache_lookup
+from .metrics import CACHE_LOOKUPS
+
+L1_MAX_ENTRIES = 1000
+L1_TIMEOUT = 5              # seconds an entry may be served from process memory
+EARLY_REFRESH_BETA = 1.0    # >1 refreshes earlier, <1 later
+LOCK_TIMEOUT = 30           # upper bound on one rebuild
+LOCK_WAIT = 5               # how long a cold miss waits for the rebuilding request
+POLL_INTERVAL = 0.05
+
+# What L2 holds for every non-int value: the value plus when it expires
+# (epoch seconds, None for never) and how long it took to build. Ints are
+# stored bare so L2's atomic incr/decr keep working.
+Entry = namedtuple('Entry', 'value expires delta')
+
+_MISSING = object()
+
+logger = logging.getLogger(__name__)
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = dict(params.get('OPTIONS') or {})
+        l2 = dict(options.pop('L2'))
+        self.l2 = import_string(l2['BACKEND'])(l2.get('LOCATION', ''), l2)
+        self.l1_max_entries = options.get('L1_MAX_ENTRIES', L1_MAX_ENTRIES)
+        self.l1_timeout = options.get('L1_TIMEOUT', L1_TIMEOUT)
+        self.beta = options.get('EARLY_REFRESH_BETA', EARLY_REFRESH_BETA)
+        self._l1 = OrderedDict()
+        self._l1_lock = threading.Lock()
+        self._stats = Counter()
+        self._stats_lock = threading.Lock()
+        # LocMemCache is atomic within its one process: the tests' stand-in
+        if not settings.DEBUG and not isinstance(self.l2, (RedisCache, LocMemCache)):
+            logger.error(
+                "Shared cache tier is %s, not Redis: cache locks and version keys "
+                "are not atomic across workers. Set CACHE_URL=redis://...",
+                type(self.l2).__name__,
+            )
+
+    # --- keys: L2's format, so raw L2 clients (throttling) agree -----------
+    def make_key(self, key, version=None):
+        return self.l2.make_key(key, version=version)
+
+    def validate_key(self, key):
+        self.l2.validate_key(key)
+
+    # --- L1 ------------------------------------------------------------------
+    def _l1_get(self, key):
+        with self._l1_lock:
+            item = self._l1.get(key)
+            if item is None:
+                return None
+            pickled, expires, delta, deadline = item
+            if deadline <= time.time():
+                del self._l1[key]
+                return None
+            self._l1.move_to_end(key)
+        return Entry(pickle.loads(pickled), expires, delta)
+
+    def _l1_set(self, key, entry):
+        if type(entry.value) is int:
+            return  # version counters: always read from L2
+        # Pickled, as LocMemCache does: callers can't mutate a shared copy
+        pickled = pickle.dumps(entry.value, pickle.HIGHEST_PROTOCOL)
+        deadline = time.time() + self.l1_timeout
+        if entry.expires is not None:
+            deadline = min(deadline, entry.expires)
+        with self._l1_lock:
+            self._l1[key] = (pickled, entry.expires, entry.delta, deadline)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, key):
+        with self._l1_lock:
+            self._l1.pop(key, None)
+
+    # --- entries -------------------------------------------------------------
+    def _ttl(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    @staticmethod
+    def _wrap(value, ttl, delta=0.0):
+        if type(value) is int:
+            return value
+        return Entry(value, None if ttl is None else time.time() + ttl, delta)
+
+    @staticmethod
+    def _unwrap(raw):
+        return raw if isinstance(raw, Entry) else Entry(raw, None, 0.0)
+
+    def _get_entry(self, key, version):
+        full_key = self.make_and_validate_key(key, version=version)
+        entry = self._l1_get(full_key)
+        if entry is not None:
+            self._count('l1_hits')
+            return entry
+        raw = self.l2.get(key, _MISSING, version=version)
+        if raw is _MISSING:
+            self._count('misses')
+            return None
+        self._count('l2_hits')
+        entry = self._unwrap(raw)
+        self._l1_set(full_key, entry)
+        return entry
+
+    async def _aget_entry(self, key, version):
+        full_key = self.make_and_validate_key(key, version=version)
+        entry = self._l1_get(full_key)
+        if entry is not None:
+            self._count('l1_hits')
+            return entry
+        raw = await self.l2.aget(key, _MISSING, version=version)
+        if raw is _MISSING:
+            self._count('misses')
+            return None
+        self._count('l2_hits')
+        entry = self._unwrap(raw)
+        self._l1_set(full_key, entry)
+        return entry
+
+    def _count(self, lookup):
+        self._bump(lookup)
+        record_cache_lookup(lookup != 'misses')
+        CACHE_LOOKUPS.inc(lookup)
+
+    def _should_refresh(self, entry):
+        if entry.expires is None or not entry.delta:
+            return False
+        # XFetch: -log(u) is exponentially distributed, so early refreshes are
+        # rare far from expiry and near-certain within ~delta of it
+        jitter = -entry.delta * self.beta * math.log(1.0 - random.random())
+        return time.time() + jitter >= entry.expires
+
+    # --- BaseCache -------------------------------------------------------------
+    def get(self, key, default=None, version=None):
+        entry = self._get_entry(key, version)
+        return default if entry is None else entry.value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._set(key, value, timeout, version)
+
+    def _set(self, key, value, timeout, version, delta=0.0):
+        ttl = self._ttl(timeout)
+        raw = self._wrap(value, ttl, delta)
+        self.l2.set(key, raw, ttl, version=version)
+        full_key = self.make_and_validate_key(key, version=version)
+        if ttl is not None and ttl <= 0:
+            self._l1_delete(full_key)
+        else:
+            self._l1_set(full_key, self._unwrap(raw))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        raw = self._wrap(value, ttl)
+        added = self.l2.add(key, raw, ttl, version=version)
+        if added:
+            self._l1_set(self.make_and_validate_key(key, version=version), self._unwrap(raw))
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l1_delete(self.make_and_validate_key(key, version=version))
+        return self.l2.touch(key, self._ttl(timeout), version=version)
+
+    def delete(self, key, version=None):
+        self._l1_delete(self.make_and_validate_key(key, version=version))
+        return self.l2.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        if self._l1_get(self.make_and_validate_key(key, version=version)) is not None:
+            return True
+        return self.l2.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._l1_delete(self.make_and_validate_key(key, version=version))
+        return self.l2.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        self._l1_delete(self.make_and_validate_key(key, version=version))
+        return self.l2.decr(key, delta, version=version)
+
+    def clear(self):
+        with self._l1_lock:
+            self._l1.clear()
+        self.l2.clear()
+
+    def close(self, **kwargs):
+        self.l2.close(**kwargs)
+
+    # --- async: L1 on the event loop, L2 awaited -------------------------------
+    async def aget(self, key, default=None, version=None):
+        entry = await self._aget_entry(key, version)
+        return default if entry is None else entry.value
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        raw = self._wrap(value, ttl)
+        await self.l2.aset(key, raw, ttl, version=version)
+        full_key = self.make_and_validate_key(key, version=version)
+        if ttl is not None and ttl <= 0:
+            self._l1_delete(full_key)
+        else:
+            self._l1_set(full_key, self._unwrap(raw))
+
+    async def aadd(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        raw = self._wrap(value, ttl)
+        added = await self.l2.aadd(key, raw, ttl, version=version)
+        if added:
+            self._l1_set(self.make_and_validate_key(key, version=version), self._unwrap(raw))
+        return added
+
+    async def adelete(self, key, version=None):
+        self._l1_delete(self.make_and_validate_key(key, version=version))
+        return await self.l2.adelete(key, version=version)
+
+    # --- stampede-protected read-through -------------------------------------
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        entry = self._get_entry(key, version)
+        if entry is not None and not self._should_refresh(entry):
+            return entry.value
+        if not callable(default):
+            if entry is None:
+                self.add(key, default, timeout, version=version)
+            return self.get(key, default, version=version)
+
+        lock_key = f'{key}:lock'
+        if self.l2.add(lock_key, 1, LOCK_TIMEOUT, version=version):
+            if entry is not None:
+                self._bump('early_refreshes')
+            try:
+                return self._rebuild(key, default, timeout, version)
+            finally:
+                self.l2.delete(lock_key, version=version)
+
+        if entry is not None:
+            return entry.value  # someone else is refreshing it
+        # Cold miss while another request rebuilds: wait for its result
+        self._bump('lock_waits')
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            raw = self.l2.get(key, _MISSING, version=version)
+            if raw is not _MISSING:
+                return self._unwrap(raw).value
+        self._bump('lock_timeouts')
+        return self._rebuild(key, default, timeout, version)
+
+    def _rebuild(self, key, default, timeout, version):
+        started = time.monotonic()
+        value = default()
+        self._bump('rebuilds')
+        self._set(key, value, timeout, version, delta=time.monotonic() - started)
+        return value
+
+    # --- counters ------------------------------------------------------------
+    def _bump(self, counter):
+        # Counter += is a read-modify-write; worker threads share this instance
+        with self._stats_lock:
+            self._stats[counter] += 1
+
+    def stats(self):
+        """This process's counters since start, plus the L1 size and hit ratio."""
+        stats = dict.fromkeys(
+            ('l1_hits', 'l2_hits', 'misses', 'rebuilds', 'early_refreshes', 'lock_waits', 'lock_timeouts'), 0,
+        )
+        with self._stats_lock:
+            stats.update(self._stats)
+        lookups = stats['l1_hits'] + stats['l2_hits'] + stats['misses']
+        stats['hit_ratio'] = (stats['l1_hits'] + stats['l2_hits']) / lookups if lookups else None
+        stats['l1_entries'] = len(self._l1)
+        return stats
@@ -0,0 +1,127 @@
+# backend/db.py
+"""
+Per-endpoint statement timeouts.
+
+Each request falls in a class with its own PostgreSQL statement_timeout
+(settings.DB_STATEMENT_TIMEOUTS, milliseconds): "admin" for the admin site,
+"read" for GET/HEAD/OPTIONS, "write" otherwise. A view can name another
+class with a `statement_timeout_class` attribute, or a viewset action with
+the @action kwarg of the same name (slow aggregates use "report").
+
+The timeout is applied lazily, by an execute wrapper, just before the
+request's first query (the class is worked out then, from the resolved
+view), and only when the connection isn't already at that value.
+Persistent connections therefore pay one SET when the class
+changes rather than one per request, and requests that never touch the
+database pay nothing. It is a session setting: behind a
+transaction-mode pooler (PgBouncer) it may apply to another client's
+server connection, so use direct connections with it.
+
+The middleware is async-capable, so under ASGI it doesn't push requests
+through a thread. Connections are per thread, and under ASGI the queries
+run in other threads than the middleware, so the wrapper is installed on
+every connection (install_execute_wrapper) and finds the current request
+through a ContextVar, which sync_to_async carries into those threads.
+"""
+import weakref
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+
+# DB-API connection -> statement_timeout (ms) last SET on it. Keyed by the raw
+# connection, so a reconnect starts with no entry.
+_applied = weakref.WeakKeyDictionary()
+
+# The request whose queries are running, while StatementTimeoutMiddleware handles it
+_request = ContextVar('statement_timeout_request', default=None)
+
+
+def install_execute_wrapper(wrapper):
+    """Run `wrapper` around every query, on every connection of every thread. Idempotent."""
+    def install(connection, **kwargs):
+        if wrapper not in connection.execute_wrappers:
+            # First, so connection.execute_wrapper() blocks still pop their own
+            connection.execute_wrappers.insert(0, wrapper)
+
+    for db in connections.all(initialized_only=True):
+        install(db)
+    connection_created.connect(install, weak=False, dispatch_uid=f'execute_wrapper:{id(wrapper)}')
+
+
+def timeout_class(request, view_func):
+    initkwargs = getattr(view_func, 'initkwargs', None) or {}
+    name = initkwargs.get('statement_timeout_class') or getattr(
+        getattr(view_func, 'cls', None), 'statement_timeout_class', None
+    )
+    if name:
+        return name
+    if request.path_info.startswith('/admin/'):
+        return 'admin'
+    return 'read' if request.method in ('GET', 'HEAD', 'OPTIONS') else 'write'
+
+
+def apply_statement_timeout(db, ms):
+    """SET statement_timeout on `db` (a DatabaseWrapper) unless it is already `ms`."""
+    raw = db.connection
+    if raw is None or _applied.get(raw) == ms:
+        return
+    with raw.cursor() as cursor:
+        cursor.execute(f'SET statement_timeout = {int(ms)}')
+    if not db.in_atomic_block:
+        _applied[raw] = ms
+    # Inside a transaction a rollback would undo the SET; leave it unrecorded
+    # so the next request sets it again
+
+
+def _request_timeout(request):
+    if not hasattr(request, 'statement_timeout'):
+        timeouts = settings.DB_STATEMENT_TIMEOUTS
+        match = getattr(request, 'resolver_match', None)
+        name = timeout_class(request, match.func if match else None)
+        request.statement_timeout = timeouts.get(name, timeouts.get('write'))
+    return request.statement_timeout
+
+
+def _statement_timeout(execute, sql, params, many, context):
+    request = _request.get()
+    if request is not None:
+        ms = _request_timeout(request)
+        if ms is not None:
+            apply_statement_timeout(context['connection'], ms)
+    return execute(sql, params, many, context)
+
+
+class StatementTimeoutMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(getattr(settings, 'DB_STATEMENT_TIMEOUTS', None)) and connection.vendor == 'postgresql'
+        if self.enabled:
+            install_execute_wrapper(_statement_timeout)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        token = _request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _request.reset(token)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        token = _request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _request.reset(token)
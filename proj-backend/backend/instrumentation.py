@@ -0,0 +1,266 @@
+# backend/instrumentation.py
+"""
+Per-request instrumentation: where did the time go?
+
+For an instrumented request InstrumentationMiddleware records
+
+  * db          query count and time (an execute wrapper on every
+                connection, see backend.db.install_execute_wrapper)
+  * cache       TieredCache hits and misses
+  * serialize   time in DRF serializers' .data (the outermost call)
+  * cloudinary  time building Cloudinary URLs, part of serialize
+  * render      time rendering the response
+  * total
+
+and reports them two ways:
+
+  * a Server-Timing header when the user is staff, as far as the view
+    already resolved the user (browser devtools show it;
+    INSTRUMENTATION_SERVER_TIMING turns it off);
+  * one JSON log line on the "backend.instrumentation" logger for a
+    fraction INSTRUMENTATION_SAMPLE_RATE (0..1) of requests.
+
+Only requests that are sampled or carry credentials (a possible staff
+user: Authorization header or session cookie) are instrumented. For the
+rest the hooks cost one ContextVar lookup each.
+"""
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import LazyObject
+
+from .db import install_execute_wrapper
+
+logger = logging.getLogger(__name__)
+
+# The RequestMetrics of the request being instrumented, if any
+_current = ContextVar('request_metrics', default=None)
+
+# Generic (non-viewset) DRF views: HTTP method -> the action it performs
+GENERIC_ACTIONS = {'post': 'create', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+
+
+class RequestMetrics:
+    __slots__ = (
+        'sampled', 'started', 'queries', 'db_ms', 'cache_hits', 'cache_misses',
+        'serialize_ms', 'serializing', 'cloudinary_urls', 'cloudinary_ms', 'render_ms', 'total_ms',
+    )
+
+    def __init__(self, sampled):
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.queries = self.cache_hits = self.cache_misses = self.cloudinary_urls = 0
+        self.db_ms = self.serialize_ms = self.cloudinary_ms = self.render_ms = self.total_ms = 0.0
+        self.serializing = False
+
+    def server_timing(self):
+        return ', '.join((
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'serialize;dur={self.serialize_ms:.1f}',
+            f'cloudinary;dur={self.cloudinary_ms:.1f};desc="{self.cloudinary_urls} urls"',
+            f'render;dur={self.render_ms:.1f}',
+            f'total;dur={self.total_ms:.1f}',
+        ))
+
+    def as_dict(self):
+        return {
+            'total_ms': round(self.total_ms, 2),
+            'db_queries': self.queries,
+            'db_ms': round(self.db_ms, 2),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'serialize_ms': round(self.serialize_ms, 2),
+            'cloudinary_urls': self.cloudinary_urls,
+            'cloudinary_ms': round(self.cloudinary_ms, 2),
+            'render_ms': round(self.render_ms, 2),
+        }
+
+
+def _time_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_ms += (time.perf_counter() - started) * 1000
+        metrics.queries += 1
+
+
+def record_cache_lookup(hit):
+    """Called by backend.cache for each lookup."""
+    metrics = _current.get()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def resolved_user(request):
+    """
+    The request's user if it has already been loaded, else None. DRF sets
+    .user on the HttpRequest once it has authenticated; AuthenticationMiddleware's
+    lazy user is only used once evaluated (it caches itself in _cached_user).
+    Evaluating it here would cost a query and, under ASGI, raise
+    SynchronousOnlyOperation on the event loop.
+    """
+    user = getattr(request, 'user', None)
+    if isinstance(user, LazyObject):
+        return getattr(request, '_cached_user', None)
+    return user
+
+
+def view_name(request):
+    """'ProductViewSet.list', 'OrderListCreateView.create', or the view function's dotted path."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    cls = getattr(match.func, 'cls', None)
+    if cls is None:
+        return match._func_path
+    method = request.method.lower()
+    actions = getattr(match.func, 'actions', None)
+    if actions:
+        action = actions.get(method, method)
+    elif method == 'get':
+        action = 'list' if hasattr(cls, 'list') else 'retrieve' if hasattr(cls, 'retrieve') else 'get'
+    else:
+        action = GENERIC_ACTIONS.get(method, method) if hasattr(cls, 'get_serializer') else method
+    return f'{cls.__name__}.{action}'
+
+
+# --- hooks into DRF and Cloudinary ---------------------------------------------
+def _timed_serializer_data(prop):
+    fget = prop.fget
+
+    def data(self):
+        metrics = _current.get()
+        if metrics is None or metrics.serializing:
+            return fget(self)
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return fget(self)
+        finally:
+            metrics.serializing = False
+            metrics.serialize_ms += (time.perf_counter() - started) * 1000
+
+    return property(data)
+
+
+def _timed_build_url(build_url):
+    def wrapper(self, **options):
+        metrics = _current.get()
+        if metrics is None:
+            return build_url(self, **options)
+        started = time.perf_counter()
+        try:
+            return build_url(self, **options)
+        finally:
+            metrics.cloudinary_ms += (time.perf_counter() - started) * 1000
+            metrics.cloudinary_urls += 1
+
+    return wrapper
+
+
+_installed = False
+
+
+def install():
+    """Time queries, serializer .data and Cloudinary URL building. Idempotent."""
+    global _installed
+    if _installed:
+        return
+    install_execute_wrapper(_time_query)
+    from rest_framework.serializers import BaseSerializer
+    # Serializer.data and ListSerializer.data call super().data, so this
+    # times every top-level serialization; nested serializers don't use .data
+    BaseSerializer.data = _timed_serializer_data(BaseSerializer.data)
+    try:
+        from cloudinary import CloudinaryResource
+    except ImportError:
+        pass
+    else:
+        CloudinaryResource.build_url = _timed_build_url(CloudinaryResource.build_url)
+    _installed = True
+
+
+# --- middleware ------------------------------------------------------------------
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'INSTRUMENTATION_SAMPLE_RATE', 0.0)
+        self.server_timing = getattr(settings, 'INSTRUMENTATION_SERVER_TIMING', True)
+        install()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _start(self, request):
+        sampled = bool(self.sample_rate) and random.random() < self.sample_rate
+        if not sampled and not (self.server_timing and (
+            'HTTP_AUTHORIZATION' in request.META or settings.SESSION_COOKIE_NAME in request.COOKIES
+        )):
+            return None
+        return RequestMetrics(sampled)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = self._start(request)
+        if metrics is None:
+            return self.get_response(request)
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = self._start(request)
+        if metrics is None:
+            return await self.get_response(request)
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics)
+
+    def process_template_response(self, request, response):
+        # DRF responses render after the view returns; time that too
+        metrics = _current.get()
+        if metrics is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                metrics.render_ms += (time.perf_counter() - started) * 1000
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def _finish(self, request, response, metrics):
+        metrics.total_ms = (time.perf_counter() - metrics.started) * 1000
+        user = resolved_user(request)
+        if self.server_timing and user is not None and user.is_staff:
+            response['Server-Timing'] = metrics.server_timing()
+        if metrics.sampled:
+            logger.info(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': view_name(request),
+                'status': response.status_code,
+                **metrics.as_dict(),
+            }))
+        return response
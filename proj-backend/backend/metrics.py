@@ -0,0 +1,444 @@
+# backend/metrics.py
+"""
+Prometheus metrics, served at /metrics in the text exposition format.
+
+Recording is lock-free. Each thread adds to its own shard (a dict that
+only that thread writes), so a counter increment or histogram observation
+is a few dict operations with no lock. A daemon thread in each process
+merges the shards every METRICS_FLUSH_INTERVAL seconds. It writes the
+result to METRICS_DIR/<pid>-<start>.json with an atomic rename; the start
+time keeps a process that reuses an old pid from overwriting the exited
+one's file. A scrape reaches one gunicorn worker, which flushes its own
+snapshot and then sums every process's file. Counters and histograms of
+workers that have exited stay in the totals, so they don't go backwards
+when a worker is replaced. Their gauges are dropped.
+
+METRICS_DIR must be shared by the workers and outlives the server (the
+default under the temp directory survives restarts). The on_starting hook
+in gunicorn.conf.py calls reset() in the master, so totals start from
+zero with each server start, which Prometheus reads as a counter reset.
+
+Some values are read when /metrics is scraped instead (email outbox
+depth, cache hit ratio).
+
+The endpoint answers only with METRICS_TOKEN as a bearer token, or to
+anyone when DEBUG is on.
+"""
+import atexit
+import glob
+import json
+import os
+import secrets
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from .db import install_execute_wrapper
+from .instrumentation import view_name
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_registry = {}              # name -> metric, in definition order
+_local = threading.local()
+_shards = []                # (thread, shard) of every thread that has recorded
+_retired = {}               # merged shards of threads that have exited
+_flush_lock = threading.Lock()
+_flusher = None
+_started = time.time_ns()   # with the pid, names this process's file
+
+
+def _shard():
+    try:
+        return _local.shard
+    except AttributeError:
+        shard = _local.shard = {}
+        _shards.append((threading.current_thread(), shard))
+        return shard
+
+
+def _add(total, key, value):
+    if isinstance(value, list):
+        row = total.get(key)
+        if row is None:
+            total[key] = list(value)
+        else:
+            for i, v in enumerate(value):
+                row[i] += v
+    else:
+        total[key] = total.get(key, 0) + value
+
+
+# --- metric types --------------------------------------------------------------
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # Scrape-time value: callback(aggregated samples) -> {label values: value}
+        self.callback = callback
+        _registry[name] = self
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        shard = _shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Summed across live processes. inc()/dec() only: a per-thread set() wouldn't add up."""
+    type = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        shard = _shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        shard = _shard()
+        key = (self.name, labels)
+        row = shard.get(key)
+        if row is None:
+            # One count per bucket plus +Inf (not cumulative), then the sum
+            row = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        row[bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+
+# --- collection across threads and processes -------------------------------------
+def _snapshot():
+    """This process's totals: retired shards plus every live thread's."""
+    total = {}
+    with _flush_lock:
+        for entry in list(_shards):
+            thread, shard = entry
+            if not thread.is_alive():
+                # Its thread can't write any more: fold it in for good
+                for key, value in shard.copy().items():
+                    _add(_retired, key, value)
+                _shards.remove(entry)
+        for key, value in _retired.items():
+            _add(total, key, value)
+    for _, shard in list(_shards):
+        # dict.copy() runs under the GIL: a consistent view of the shard
+        for key, value in shard.copy().items():
+            _add(total, key, value)
+    return total
+
+
+def _path():
+    return os.path.join(settings.METRICS_DIR, f'{os.getpid()}-{_started}.json')
+
+
+def flush():
+    """Write this process's snapshot to METRICS_DIR."""
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    samples = [[name, list(labels), value] for (name, labels), value in _snapshot().items()]
+    path = _path()
+    with open(f'{path}.tmp', 'w') as f:
+        json.dump({'pid': os.getpid(), 'started': _started, 'samples': samples}, f)
+    os.replace(f'{path}.tmp', path)
+
+
+def reset():
+    """Remove every process's file. For the server master, before any worker starts."""
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json*')):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def aggregate():
+    """Sum of every process's last snapshot. Gauges count only for live processes."""
+    snapshots = []
+    for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue    # vanished or replaced meanwhile
+    # Of the files sharing a pid, only the latest process can still be running
+    latest = {}
+    for data in snapshots:
+        latest[data['pid']] = max(latest.get(data['pid'], 0), data.get('started', 0))
+    total = {}
+    for data in snapshots:
+        pid = data['pid']
+        if data.get('started', 0) != latest[pid]:
+            alive = False
+        else:
+            alive = (pid, data.get('started')) == (os.getpid(), _started) or _alive(pid)
+        for name, labels, value in data['samples']:
+            metric = _registry.get(name)
+            if metric is None or (metric.type == 'gauge' and not alive):
+                continue
+            _add(total, (name, tuple(labels)), value)
+    return total
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(settings.METRICS_FLUSH_INTERVAL)
+        try:
+            flush()
+        except OSError:
+            pass
+
+
+def start_flusher():
+    global _flusher
+    if _flusher is None or not _flusher.is_alive():
+        _flusher = threading.Thread(target=_flush_periodically, name='metrics-flush', daemon=True)
+        _flusher.start()
+
+
+def _after_fork():
+    # A forked worker starts from zero; its parent's counts are in the parent's file
+    global _local, _flusher, _started
+    _local = threading.local()
+    _started = time.time_ns()
+    _shards.clear()
+    _retired.clear()
+    if _flusher is not None:
+        _flusher = None
+        start_flusher()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(lambda: _flusher is not None and flush())
+
+
+# --- exposition ---------------------------------------------------------------------
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def exposition():
+    """The text exposition of every metric, aggregated across processes."""
+    samples = aggregate()
+    by_metric = {}
+    for (name, labels), value in samples.items():
+        by_metric.setdefault(name, {})[labels] = value
+
+    lines = []
+    for metric in _registry.values():
+        values = by_metric.get(metric.name, {})
+        if metric.callback is not None:
+            values = metric.callback(samples)
+        elif not values and not metric.labelnames and metric.type != 'histogram':
+            values = {(): 0}
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for labels, value in sorted(values.items()):
+            if metric.type != 'histogram':
+                lines.append(f'{metric.name}{_labels(metric.labelnames, labels)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip((*metric.buckets, float('inf')), value):
+                cumulative += count
+                le = _labels(metric.labelnames, labels, [('le', _number(float(bound)))])
+                lines.append(f'{metric.name}_bucket{le} {cumulative}')
+            lines.append(f'{metric.name}_sum{_labels(metric.labelnames, labels)} {_number(value[-1])}')
+            lines.append(f'{metric.name}_count{_labels(metric.labelnames, labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        given = request.META.get('HTTP_AUTHORIZATION', '').removeprefix('Bearer ')
+        if not secrets.compare_digest(given.encode(), token.encode()):
+            raise Http404
+    elif not settings.DEBUG:
+        raise Http404
+    flush()
+    return HttpResponse(exposition(), content_type=CONTENT_TYPE)
+
+
+# --- scrape-time values -----------------------------------------------------------
+def _outbox_depth(samples):
+    from django.db.models import Count, Q
+    from django.utils import timezone
+    from contact.models import EmailOutbox
+
+    pending = Q(status=EmailOutbox.PENDING)
+    counts = EmailOutbox.objects.filter(status__in=[EmailOutbox.PENDING, EmailOutbox.DEAD]).aggregate(
+        pending=Count('pk', filter=pending),
+        due=Count('pk', filter=pending & Q(next_attempt_at__lte=timezone.now())),
+        dead=Count('pk', filter=Q(status=EmailOutbox.DEAD)),
+    )
+    return {(state,): count for state, count in counts.items()}
+
+
+def _cache_hit_ratio(samples):
+    lookups = {labels[0]: value for (name, labels), value in samples.items() if name == CACHE_LOOKUPS.name}
+    total = sum(lookups.values())
+    if not total:
+        return {}
+    return {(): (lookups.get('l1_hits', 0) + lookups.get('l2_hits', 0)) / total}
+
+
+# --- the metrics -------------------------------------------------------------------
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request latency by resolved view and status class.',
+    ['view', 'status'], buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+)
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Duration of each database query.',
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 5),
+)
+DB_QUERIES = Histogram(
+    'db_queries_per_request', 'Database queries per request, by resolved view.',
+    ['view'], buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+CACHE_LOOKUPS = Counter(
+    'cache_lookups_total', 'Default cache lookups by result (l1_hits, l2_hits, misses).', ['result'],
+)
+Gauge('cache_hit_ratio', 'Share of cache lookups answered from L1 or L2.', callback=_cache_hit_ratio)
+Gauge(
+    'email_outbox_messages', 'Outbox rows: pending, due for delivery now, dead.', ['state'],
+    callback=_outbox_depth,
+)
+PASSWORD_HASH_PENDING = Gauge('password_hash_pending', 'Password hashes queued or running.')
+IMAGE_JOBS_PENDING = Gauge('testimonial_image_jobs_pending', 'Testimonial photos waiting for WebP variants.')
+UPLOAD_RECEIVE_DURATION = Histogram(
+    'upload_receive_duration_seconds', 'Time to receive and check a multipart image upload, by outcome.',
+    ['outcome'], buckets=(.05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60),
+)
+CLOUDINARY_UPLOAD_DURATION = Histogram(
+    'cloudinary_upload_duration_seconds', 'Duration of each upload to Cloudinary.',
+    buckets=(.1, .25, .5, 1, 2.5, 5, 10, 30, 60),
+)
+
+
+# --- hooks ----------------------------------------------------------------------------
+# Queries run by the current request, while MetricsMiddleware handles it
+_request_queries = ContextVar('request_queries', default=None)
+
+
+def _observe_query(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_QUERY_DURATION.observe(time.perf_counter() - started)
+        queries = _request_queries.get()
+        if queries is not None:
+            queries[0] += 1
+
+
+def _timed_upload(upload):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return upload(*args, **kwargs)
+        finally:
+            CLOUDINARY_UPLOAD_DURATION.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+_installed = False
+
+
+def install():
+    """Observe every query and Cloudinary upload, and start flushing. Idempotent."""
+    global _installed
+    if _installed:
+        return
+    install_execute_wrapper(_observe_query)
+    try:
+        import cloudinary.uploader
+    except ImportError:
+        pass
+    else:
+        # CloudinaryField and the media storage both go through upload()
+        cloudinary.uploader.upload = _timed_upload(cloudinary.uploader.upload)
+    start_flusher()
+    _installed = True
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        queries = [0]
+        token = _request_queries.set(queries)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._observe(request, response, started, queries[0])
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        queries = [0]
+        token = _request_queries.set(queries)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self._observe(request, response, started, queries[0])
+        return response
+
+    @staticmethod
+    def _observe(request, response, started, queries):
+        view = view_name(request) or 'unmatched'
+        REQUEST_DURATION.observe(time.perf_counter() - started, view, f'{response.status_code // 100}xx')
+        DB_QUERIES.observe(queries, view)
@@ -0,0 +1,78 @@
+# backend/middleware.py
+"""
+Sessionless profile for the JSON API.
+
+Everything under API_PATH_PREFIX is authenticated with JWT by DRF and is
+csrf-exempt, so loading a session, resolving request.user from it, and
+setting up CSRF/message state is wasted work (and, with a session cookie
+present, a django_session read). These subclasses of the stock middleware
+pass API requests straight through and behave exactly as before for
+everything else (the admin, the home page). Being subclasses, they still
+satisfy the admin's middleware system checks.
+
+AsyncWhiteNoiseMiddleware is WhiteNoise made async-capable, so ASGI requests
+that aren't for static files don't go through a thread on its account.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+def is_api_request(request):
+    return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+
+class APIBypassMixin:
+    def __call__(self, request):
+        if is_api_request(request):
+            # A coroutine under ASGI, a response under WSGI; either way the caller handles it
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class APISessionMiddleware(APIBypassMixin, SessionMiddleware):
+    pass
+
+
+class APICsrfViewMiddleware(APIBypassMixin, CsrfViewMiddleware):
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_api_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class APIAuthenticationMiddleware(APIBypassMixin, AuthenticationMiddleware):
+    pass
+
+
+class APIMessageMiddleware(APIBypassMixin, MessageMiddleware):
+    pass
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            # Opens the file: blocking
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,134 @@
+# backend/pagination.py
+"""
+Keyset ("seek") pagination.
+
+Pages are addressed by the ordering values of the last row served, not by
+an offset, so page 10,000 costs the same index range scan as page 1 and
+rows inserted meanwhile never shift a page. The ordering must end in a
+unique field (usually `id`) so every row has a distinct position. Clients
+follow the opaque `next` link; there is no total count.
+"""
+import base64
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    ordering = ('-id',)
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_ordering(self, view):
+        return getattr(view, 'keyset_ordering', self.ordering)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    # --- cursor encoding -------------------------------------------------
+    @staticmethod
+    def _cursor_value(value):
+        # Full isoformat: DjangoJSONEncoder would cut datetimes to milliseconds
+        # and the seek would then skip rows sharing that millisecond
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        return str(value)
+
+    def encode_cursor(self, values):
+        raw = json.dumps([self._cursor_value(v) for v in values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, model, ordering, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(name.lstrip('-')).to_python(value)
+                for name, value in zip(ordering, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    # --- seek predicate --------------------------------------------------
+    @staticmethod
+    def after(ordering, values):
+        """Rows strictly after `values` in `ordering`, as (a > x) OR (a = x AND b > y) ..."""
+        clauses = []
+        for i, name in enumerate(ordering):
+            field = name.lstrip('-')
+            op = 'lt' if name.startswith('-') else 'gt'
+            equal = [Q(**{prev.lstrip('-'): value}) for prev, value in zip(ordering[:i], values[:i])]
+            clauses.append(reduce(and_, equal + [Q(**{f'{field}__{op}': values[i]})]))
+        # Redundant bound on the leading column so the planner can range-scan its index
+        first = ordering[0]
+        bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": values[0]})
+        return bound & reduce(or_, clauses)
+
+    # --- BasePagination --------------------------------------------------
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        return self._take_page(list(self._page_query(queryset, request, view, page_size)), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views: the page is fetched with the async ORM."""
+        page_size = self.get_page_size(request)
+        return self._take_page([row async for row in self._page_query(queryset, request, view, page_size)],
+                               page_size)
+
+    def _page_query(self, queryset, request, view, page_size):
+        self.request = request
+        self.page_ordering = ordering = tuple(self.get_ordering(view))
+        queryset = queryset.order_by(*ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            values = self.decode_cursor(queryset.model, ordering, cursor)
+            queryset = queryset.filter(self.after(ordering, values))
+        # One extra row tells whether there is a next page
+        return queryset[:page_size + 1]
+
+    def _take_page(self, rows, page_size):
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        values = [getattr(self.last, name.lstrip('-')) for name in self.page_ordering]
+        return replace_query_param(self.base_url(self.request), self.cursor_query_param, self.encode_cursor(values))
+
+    def base_url(self, request):
+        """URL the next link is built from: the request's own, filters included."""
+        return request.build_absolute_uri()
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,91 @@
+# backend/search.py
+"""
+Ranked full-text search for the staff inboxes (contact messages, repair
+descriptions).
+
+Models list their searchable text as SEARCH_FIELDS = {field: weight}, with
+weights 'A' (strongest) to 'D'. On PostgreSQL the query is
+`to_tsvector(...) @@ websearch_to_tsquery(...)`, ranked with ts_rank and
+served by a GIN expression index (added in migrations with
+search_index_operation, which must be given the same fields and weights).
+Other backends fall back to matching every word with icontains, ranked by
+the summed weights of the fields that matched: unindexed and meant for
+development databases.
+"""
+import re
+from functools import reduce
+from operator import add, and_, or_
+
+from django.db import connections, migrations
+from django.db.models import Case, FloatField, Q, Value, When
+from rest_framework.pagination import PageNumberPagination
+
+SEARCH_CONFIG = 'english'
+MAX_TERMS = 10
+
+# ts_rank's default weights for D, C, B, A
+WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2, 'D': 0.1}
+
+
+class SearchPagination(PageNumberPagination):
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+
+
+def search_vector(fields):
+    """Weighted tsvector over `fields` ({name: weight}); PostgreSQL only."""
+    from django.contrib.postgres.search import SearchVector
+    return reduce(add, [
+        SearchVector(name, weight=weight, config=SEARCH_CONFIG) for name, weight in fields.items()
+    ])
+
+
+def text_search(queryset, term, fields):
+    """Rows of `queryset` matching `term`, annotated with `rank` and best first."""
+    term = term.strip()
+    if not term:
+        return queryset.none()
+    if connections[queryset.db].vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        vector = search_vector(fields)
+        query = SearchQuery(term, search_type='websearch', config=SEARCH_CONFIG)
+        # Filter on the exact indexed expression so the GIN index applies
+        queryset = queryset.alias(search=vector).filter(search=query).annotate(rank=SearchRank(vector, query))
+    else:
+        words = re.findall(r'\w+', term)[:MAX_TERMS]
+        if not words:
+            return queryset.none()
+        queryset = queryset.filter(reduce(and_, [
+            reduce(or_, [Q(**{f'{name}__icontains': word}) for name in fields]) for word in words
+        ])).annotate(rank=reduce(add, [
+            Case(When(**{f'{name}__icontains': word}, then=Value(WEIGHTS[weight])),
+                 default=Value(0.0), output_field=FloatField())
+            for word in words for name, weight in fields.items()
+        ]))
+    return queryset.order_by('-rank', '-pk')
+
+
+# ===================================================================
+# MIGRATIONS
+# ===================================================================
+def search_index_operation(app_label, model_name, index_name, fields):
+    """
+    Migration operation creating the GIN index text_search() uses, on
+    PostgreSQL only (other backends have no equivalent and search unindexed).
+    """
+    def _index():
+        from django.contrib.postgres.indexes import GinIndex
+        return GinIndex(search_vector(fields), name=index_name)
+
+    def forwards(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            model = apps.get_model(app_label, model_name)
+            schema_editor.execute(_index().create_sql(model, schema_editor), params=None)
+
+    def backwards(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            model = apps.get_model(app_label, model_name)
+            schema_editor.execute(_index().remove_sql(model, schema_editor))
+
+    return migrations.RunPython(forwards, backwards)
@@ -1,5 +1,6 @@
 # backend/settings.py
 import os
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 import environ
@@ -61,17 +62,28 @@ INSTALLED_APPS = [
 # MIDDLEWARE
 # ===================================================================
 MIDDLEWARE = [
+    # Outermost, so its total covers the rest of the stack (backend/instrumentation.py)
+    "backend.instrumentation.InstrumentationMiddleware",
+    # Latency/query histograms for /metrics (backend/metrics.py)
+    "backend.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "backend.db.StatementTimeoutMiddleware",
+    "backend.middleware.AsyncWhiteNoiseMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    # Session/CSRF/auth/messages are skipped under API_PATH_PREFIX (JWT only)
+    "backend.middleware.APISessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "backend.middleware.APICsrfViewMiddleware",
+    "backend.middleware.APIAuthenticationMiddleware",
+    "backend.middleware.APIMessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+API_PATH_PREFIX = "/api/"
+
+# Only the admin uses sessions; keep them out of the database
+SESSION_ENGINE = env("SESSION_ENGINE", default="django.contrib.sessions.backends.signed_cookies")
+
 # ===================================================================
 # URLS & TEMPLATES
 # ===================================================================
@@ -105,18 +117,73 @@ DATABASES = {
     )
 }
 
+# Keep connections open across requests (no TLS handshake per request) and
+# check them before reuse, so one the server dropped is replaced, not failed on
+DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_CONN_MAX_AGE", default=600)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# A transaction-mode pooler (Neon's "-pooler" host, pgbouncer) hands each
+# transaction its own server connection, so named cursors can't be used
+DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = env.bool(
+    "DB_DISABLE_SERVER_SIDE_CURSORS", default="-pooler" in (DATABASES["default"].get("HOST") or "")
+)
+
+# statement_timeout per endpoint class, in ms; 0 means none (backend/db.py)
+DB_STATEMENT_TIMEOUTS = {
+    "read": env.int("DB_TIMEOUT_READ_MS", default=5_000),
+    "write": env.int("DB_TIMEOUT_WRITE_MS", default=15_000),
+    "report": env.int("DB_TIMEOUT_REPORT_MS", default=30_000),
+    "admin": env.int("DB_TIMEOUT_ADMIN_MS", default=60_000),
+}
+
+# ===================================================================
+# CACHE
+# ===================================================================
+# Per-process LRU in front of a shared store (backend/cache.py). CACHE_URL
+# picks the shared tier: redis://host:6379/0 in production, since cache locks
+# and version keys need its atomic add/incr; the file cache (default) for
+# development, locmemcache:// in tests. An error is logged when DEBUG is off
+# and the shared tier isn't Redis.
+CACHES = {
+    "default": {
+        "BACKEND": "backend.cache.TieredCache",
+        "OPTIONS": {
+            "L1_MAX_ENTRIES": env.int("CACHE_L1_MAX_ENTRIES", default=1000),
+            "L1_TIMEOUT": env.int("CACHE_L1_TIMEOUT", default=5),
+            "L2": env.cache_url("CACHE_URL", default="filecache:///tmp/cloudtech-cache"),
+        },
+    }
+}
+
 # ===================================================================
 # REST FRAMEWORK & JWT
 # ===================================================================
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
-        "rest_framework.authentication.SessionAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.AllowAny"],
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    # Token buckets for public writes (backend/throttling.py): "burst/period",
+    # applied per IP, per X-Device-ID and per user
+    "DEFAULT_THROTTLE_RATES": {
+        "contact": "5/min",
+        "testimonials": "5/min",
+        "orders": "20/min",
+        "register": "20/hour",
+        "repair-uploads": "30/hour",
+    },
 }
 
+# Photo upload caps, enforced while the body streams in (backend/uploads.py)
+UPLOAD_MAX_FILE_BYTES = env.int("UPLOAD_MAX_FILE_BYTES", default=15 * 1024 * 1024)
+UPLOAD_MAX_REQUEST_BYTES = env.int("UPLOAD_MAX_REQUEST_BYTES", default=60 * 1024 * 1024)
+
+# Cache holding the rate-limit buckets. Must be Redis (CACHE_URL=redis://...)
+# in production: otherwise each worker keeps its own buckets and allows the
+# full rate, and an error is logged (backend/throttling.py)
+RATE_LIMIT_CACHE = "default"
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(hours=2),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
@@ -126,10 +193,26 @@ SIMPLE_JWT = {
     "ALGORITHM": "HS256",
     "SIGNING_KEY": SECRET_KEY,
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Rotation revokes the old refresh token via accounts.revocation
+    "TOKEN_REFRESH_SERIALIZER": "accounts.serializers.RevocableTokenRefreshSerializer",
 }
 
 AUTH_USER_MODEL = "accounts.User"
 
+# Password hashing pool (accounts/hashing.py): PBKDF2 runs on these threads;
+# beyond AUTH_HASH_MAX_PENDING queued hashes, login/register answer 429.
+AUTH_HASH_WORKERS = env.int("AUTH_HASH_WORKERS", default=os.cpu_count() or 2)
+AUTH_HASH_MAX_PENDING = env.int("AUTH_HASH_MAX_PENDING", default=AUTH_HASH_WORKERS * 8)
+
+# Processes that build testimonial WebP variants (testimonials/image_pipeline.py)
+TESTIMONIAL_IMAGE_WORKERS = env.int("TESTIMONIAL_IMAGE_WORKERS", default=2)
+
+# backend/asgi.py turns this on so login/register use the async views
+ASYNC_AUTH_VIEWS = env.bool("ASYNC_AUTH_VIEWS", default=False)
+
+# ...and this, so catalog/testimonial reads do (backend/async_views.py)
+ASYNC_CATALOG_VIEWS = env.bool("ASYNC_CATALOG_VIEWS", default=False)
+
 # ===================================================================
 # CORS & CSRF
 # ===================================================================
@@ -149,6 +232,7 @@ CORS_ALLOW_HEADERS = list(default_headers) + [
     "x-csrftoken",
     "x-requested-with",
     "x-device-id",
+    "idempotency-key",
 ]
 
 CSRF_TRUSTED_ORIGINS = CORS_ALLOWED_ORIGINS
@@ -186,6 +270,8 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = "apikey"
 EMAIL_HOST_PASSWORD = env("SENDGRID_API_KEY")
 DEFAULT_FROM_EMAIL = env("EMAIL_FROM", default="no-reply@cloudtechstore.net")
+# Only the outbox dispatcher (contact/outbox.py) talks to SMTP; never hang it
+EMAIL_TIMEOUT = 30
 
 # ===================================================================
 # PASSWORD & INTERNATIONALIZATION
@@ -207,17 +293,37 @@ APPEND_SLASH = True
 
 SITE_URL = env("SITE_URL", default="https://cloudtech-c4ft.onrender.com")
 
+# Per-request timings (backend/instrumentation.py): Server-Timing header for
+# staff, and a JSON log line for this fraction of requests (0 = none)
+INSTRUMENTATION_SERVER_TIMING = env.bool("INSTRUMENTATION_SERVER_TIMING", default=True)
+INSTRUMENTATION_SAMPLE_RATE = env.float("INSTRUMENTATION_SAMPLE_RATE", default=0.0)
+
+# /metrics (backend/metrics.py): each worker writes its counters to
+# METRICS_DIR every METRICS_FLUSH_INTERVAL seconds; scrapes need
+# "Authorization: Bearer $METRICS_TOKEN" (no token: DEBUG only)
+METRICS_DIR = env("METRICS_DIR", default=os.path.join(tempfile.gettempdir(), "cloudtech-metrics"))
+METRICS_FLUSH_INTERVAL = env.float("METRICS_FLUSH_INTERVAL", default=5.0)
+METRICS_TOKEN = env("METRICS_TOKEN", default="")
+
 import os
 
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "formatters": {
+        "message": {"format": "%(message)s"},
+    },
     "handlers": {
         "file": {
             "level": "ERROR",
             "class": "logging.FileHandler",
             "filename": os.path.join(BASE_DIR, "django_errors.log"),
         },
+        # One JSON object per line on stderr, for the log collector
+        "instrumentation": {
+            "class": "logging.StreamHandler",
+            "formatter": "message",
+        },
     },
     "loggers": {
         "django": {
@@ -225,6 +331,11 @@ LOGGING = {
             "level": "ERROR",
             "propagate": True,
         },
+        "backend.instrumentation": {
+            "handlers": ["instrumentation"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
 
@@ -0,0 +1,315 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from . import metrics, throttling
+from .cache import TieredCache
+from .db import apply_statement_timeout, timeout_class
+from .middleware import APISessionMiddleware
+from .uploads import file_digest
+
+
+def tiered_cache(l2_location='tiered-l2'):
+    # Caches with the same LocMem location share their L2, as workers share Redis
+    return TieredCache('', {'OPTIONS': {
+        'L2': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': l2_location},
+    }})
+
+
+# ===================================================================
+# TIERED CACHE (backend/cache.py)
+# ===================================================================
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = tiered_cache()
+        self.cache.clear()
+
+    def test_add_only_when_absent(self):
+        self.assertTrue(self.cache.add('k', 'first'))
+        self.assertFalse(self.cache.add('k', 'second'))
+        self.assertEqual(self.cache.get('k'), 'first')
+
+    def test_add_respects_another_workers_value(self):
+        other = tiered_cache()
+        self.assertTrue(other.add('k', 'theirs'))
+        self.assertFalse(self.cache.add('k', 'mine'))
+        self.assertEqual(self.cache.get('k'), 'theirs')
+
+    def test_add_int_keeps_incr_atomic(self):
+        self.assertTrue(self.cache.add('n', 1))
+        self.assertEqual(self.cache.incr('n'), 2)
+        self.assertEqual(self.cache.get('n'), 2)
+
+    def test_get_or_set_single_flight(self):
+        calls = []
+        started = threading.Event()
+
+        def build():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return 'value'
+
+        results = []
+        first = threading.Thread(target=lambda: results.append(self.cache.get_or_set('k', build, 60)))
+        first.start()
+        started.wait()
+        waiters = [
+            threading.Thread(target=lambda: results.append(self.cache.get_or_set('k', build, 60)))
+            for _ in range(4)
+        ]
+        for t in waiters:
+            t.start()
+        for t in [first, *waiters]:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['value'] * 5)
+        self.assertEqual(self.cache.stats()['lock_waits'], 4)
+
+    def test_get_or_set_serves_stale_while_refreshing(self):
+        self.cache.set('k', 'old', 60)
+        self.cache.l2.add('k:lock', 1)  # another worker is refreshing
+        with mock.patch.object(TieredCache, '_should_refresh', return_value=True):
+            self.assertEqual(self.cache.get_or_set('k', lambda: 'new', 60), 'old')
+
+    def test_version_bump_seen_by_other_workers_at_once(self):
+        other = tiered_cache()
+        self.cache.set('version', 1)
+        self.assertEqual(other.get('version'), 1)
+        self.cache.incr('version')
+        self.assertEqual(other.get('version'), 2)
+
+    def test_non_redis_shared_tier_logged(self):
+        with self.assertLogs('backend.cache', 'ERROR'):
+            TieredCache('', {'OPTIONS': {
+                'L2': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp/t'},
+            }})
+        with self.assertNoLogs('backend.cache', 'ERROR'):
+            tiered_cache()
+
+
+# ===================================================================
+# SESSIONLESS API PATH (backend/middleware.py)
+# ===================================================================
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SessionlessAPITests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user('staff@example.com', 'correct horse', is_staff=True)
+
+    def test_api_requests_skip_the_session(self):
+        seen = []
+        middleware = APISessionMiddleware(lambda request: seen.append(request) or HttpResponse())
+        factory = RequestFactory()
+        middleware(factory.get('/api/health'))
+        middleware(factory.get('/admin/'))
+        self.assertEqual([hasattr(request, 'session') for request in seen], [False, True])
+
+    def test_session_cookie_is_ignored_on_the_api(self):
+        self.client.force_login(self.staff)
+        # Without JWT the admin's session doesn't authenticate API calls
+        self.assertEqual(self.client.get('/api/accounts/users/').status_code, 401)
+        self.assertEqual(self.client.get('/admin/').status_code, 200)
+
+    def test_csrf_only_outside_the_api(self):
+        client = Client(enforce_csrf_checks=True)
+        response = client.post('/api/contact-messages/', {
+            'name': 'Jane', 'email': 'jane@example.com', 'subject': 'Hi', 'message': 'Hello',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        login = client.post('/admin/login/', {'username': 'staff@example.com', 'password': 'correct horse'})
+        self.assertEqual(login.status_code, 403)
+
+
+# ===================================================================
+# THROTTLING (backend/throttling.py)
+# ===================================================================
+class BrokenRedis:
+    calls = 0
+
+    def register_script(self, script):
+        BrokenRedis.calls += 1
+        raise ConnectionError('redis is down')
+
+
+class TokenBucketFallbackTests(SimpleTestCase):
+    def setUp(self):
+        BrokenRedis.calls = 0
+        self.limiter = throttling.TokenBucketLimiter('default')
+        patcher = mock.patch.object(throttling, '_redis_client', return_value=BrokenRedis())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_falls_back_to_local_buckets(self):
+        with self.assertLogs('backend.throttling', 'WARNING'):
+            waits = [self.limiter.take(['a'], 2, 2 / 60) for _ in range(3)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertGreater(waits[2], 0)
+
+    def test_backs_off_redis_after_an_error(self):
+        with self.assertLogs('backend.throttling', 'WARNING'):
+            self.limiter.take(['a'], 5, 1)
+        self.limiter.take(['a'], 5, 1)
+        self.assertEqual(BrokenRedis.calls, 1)
+
+        with mock.patch.object(throttling.time, 'monotonic',
+                               return_value=time.monotonic() + throttling.REDIS_RETRY_AFTER + 1):
+            with self.assertLogs('backend.throttling', 'WARNING'):
+                self.limiter.take(['a'], 5, 1)
+        self.assertEqual(BrokenRedis.calls, 2)
+
+    def test_local_buckets_are_all_or_nothing(self):
+        buckets = throttling.LocalBuckets()
+        self.assertEqual(buckets.take(['ip'], 1, 1 / 60), 0.0)
+        # 'ip' is empty, so 'device' must not be drawn from either
+        self.assertGreater(buckets.take(['ip', 'device'], 1, 1 / 60), 0)
+        self.assertEqual(buckets.take(['device'], 1, 1 / 60), 0.0)
+
+
+class RateLimitStoreTests(SimpleTestCase):
+    def test_missing_redis_is_reported(self):
+        self.addCleanup(setattr, throttling, '_limiter', throttling._limiter)
+        throttling._limiter = None
+        with self.assertLogs('backend.throttling', 'ERROR') as logs:
+            throttling.get_limiter()
+        self.assertIn('rate limits apply per process', logs.output[0])
+
+
+# ===================================================================
+# PHOTO UPLOADS (backend/uploads.py)
+# ===================================================================
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class UploadParserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_other_multipart_endpoints_take_any_file(self):
+        attachment = SimpleUploadedFile('notes.txt', b'plain text', content_type='text/plain')
+        response = APIClient().post('/api/contact-messages/', {
+            'name': 'Jane', 'email': 'jane@example.com', 'subject': 'Hi', 'message': 'Hello',
+            'attachment': attachment,
+        }, format='multipart')
+        self.assertEqual(response.status_code, 201)
+
+    def test_digest_without_the_image_handler(self):
+        uploaded = SimpleUploadedFile('a.png', b'photo bytes')
+        self.assertEqual(file_digest(uploaded), hashlib.sha256(b'photo bytes').hexdigest())
+        self.assertEqual(uploaded.read(), b'photo bytes')
+
+
+# ===================================================================
+# STATEMENT TIMEOUTS (backend/db.py)
+# ===================================================================
+class StatementTimeoutClassTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def resolve_class(self, method, path):
+        request = getattr(self.factory, method)(path)
+        return timeout_class(request, resolve(path).func)
+
+    def test_by_method(self):
+        self.assertEqual(self.resolve_class('get', '/api/products/'), 'read')
+        self.assertEqual(self.resolve_class('post', '/api/contact-messages/'), 'write')
+
+    def test_admin_site(self):
+        self.assertEqual(self.resolve_class('get', '/admin/'), 'admin')
+
+    def test_view_attribute(self):
+        self.assertEqual(self.resolve_class('get', '/api/contact-messages/search/'), 'report')
+
+    def test_action_kwarg(self):
+        self.assertEqual(self.resolve_class('get', '/api/fixrequests/repairs/stats/'), 'report')
+        # statement_timeout_class = None on the viewset falls back to the method
+        self.assertEqual(self.resolve_class('get', '/api/fixrequests/repairs/'), 'read')
+
+    def test_set_only_when_changed(self):
+        raw = mock.MagicMock()
+        cursor = raw.cursor.return_value.__enter__.return_value
+        db = mock.Mock(connection=raw, in_atomic_block=False)
+        apply_statement_timeout(db, 5000)
+        apply_statement_timeout(db, 5000)
+        apply_statement_timeout(db, 30000)
+        self.assertEqual(
+            [c.args[0] for c in cursor.execute.call_args_list],
+            ['SET statement_timeout = 5000', 'SET statement_timeout = 30000'],
+        )
+
+
+# ===================================================================
+# INSTRUMENTATION (backend/instrumentation.py)
+# ===================================================================
+@override_settings(ALLOWED_HOSTS=['*'],
+                   CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user('staff@example.com', 'correct horse', is_staff=True)
+
+    async def test_session_request_under_asgi(self):
+        # The lazy session user must not be loaded on the event loop
+        await self.async_client.aforce_login(self.staff)
+        self.assertEqual((await self.async_client.get('/')).status_code, 200)
+        self.assertEqual((await self.async_client.get('/no-such-page/')).status_code, 404)
+
+    async def test_staff_header_once_the_view_loaded_the_user(self):
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get('/admin/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+    def test_staff_header_under_wsgi(self):
+        self.client.force_login(self.staff)
+        self.assertIn('Server-Timing', self.client.get('/admin/'))
+        self.assertNotIn('Server-Timing', self.client.get('/'))
+
+
+# ===================================================================
+# METRICS FILES (backend/metrics.py)
+# ===================================================================
+class MetricsFileTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = directory.name
+        settings_override = override_settings(METRICS_DIR=self.dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def write_exited(self, pid, started):
+        # An exited process's last snapshot
+        samples = [
+            ['cache_lookups_total', ['misses'], 3],
+            ['password_hash_pending', [], 2],
+        ]
+        with open(os.path.join(self.dir, f'{pid}-{started}.json'), 'w') as f:
+            json.dump({'pid': pid, 'started': started, 'samples': samples}, f)
+
+    def test_reused_pid_keeps_the_exited_totals(self):
+        self.write_exited(os.getpid(), metrics._started - 1)
+        metrics.flush()
+        self.assertEqual(len(os.listdir(self.dir)), 2)
+
+        total = metrics.aggregate()
+        self.assertGreaterEqual(total[('cache_lookups_total', ('misses',))], 3)
+        # Its gauge went with it, though the pid is alive again
+        self.assertLess(total.get(('password_hash_pending', ()), 0), 2)
+
+    def test_reset_empties_the_directory(self):
+        self.write_exited(os.getpid(), 1)
+        metrics.flush()
+        metrics.reset()
+        self.assertEqual(os.listdir(self.dir), [])
+        self.assertEqual(metrics.aggregate(), {})
@@ -0,0 +1,219 @@
+# backend/throttling.py
+"""
+Token-bucket rate limiting for public write endpoints.
+
+Each request draws one token from up to three buckets: its client IP, its
+X-Device-ID (when sent) and its user (when authenticated). It is allowed
+only if every bucket has a token. A scope's rate, e.g. "5/min", sets both
+the burst size (5) and the refill speed (5 tokens per minute).
+
+When the rate-limit cache is Redis, one Lua script checks and draws from
+all of a request's buckets atomically, so concurrent workers can't
+overspend. Production needs Redis: without it, or while it is unreachable,
+buckets are kept per process, so with N workers a client gets up to N times
+the configured rate. get_limiter() logs an error when DEBUG is off and the
+cache isn't Redis.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'throttle'
+LOCAL_MAX_KEYS = 50_000
+REDIS_RETRY_AFTER = 30      # seconds on the local fallback after a Redis error
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """'5/min' -> (capacity 5, refill 5/60 tokens per second)."""
+    num, period = rate.split('/')
+    capacity = int(num)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+# ===================================================================
+# IN-PROCESS BUCKETS
+# ===================================================================
+class LocalBuckets:
+    def __init__(self, max_keys=LOCAL_MAX_KEYS):
+        self.max_keys = max_keys
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, keys, capacity, refill):
+        """Draw one token from every bucket, or none. Returns seconds to wait (0 if allowed)."""
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            wait = 0.0
+            for key in keys:
+                state = self._data.get(key)
+                tokens = capacity if state is None else min(capacity, state[0] + (now - state[1]) * refill)
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / refill)
+                levels.append(tokens)
+            if wait:
+                return wait
+
+            for key, tokens in zip(keys, levels):
+                self._data[key] = (tokens - 1, now)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_keys:
+                self._data.popitem(last=False)
+            return 0.0
+
+
+# ===================================================================
+# REDIS BUCKETS (one atomic script per decision)
+# ===================================================================
+# KEYS: buckets; ARGV: capacity, refill per second, ttl. Uses the server
+# clock so workers with skewed clocks agree. Returns the wait as a string
+# (Lua numbers would be truncated to integers).
+TAKE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = capacity
+  if state[1] then
+    tokens = math.min(capacity, tonumber(state[1]) + (now - tonumber(state[2])) * refill)
+  end
+  if tokens < 1 then
+    wait = math.max(wait, (1 - tokens) / refill)
+  end
+  levels[i] = tokens
+end
+if wait > 0 then
+  return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+  redis.call('HSET', key, 'tokens', tostring(levels[i] - 1), 'ts', tostring(now))
+  redis.call('EXPIRE', key, ARGV[3])
+end
+return '0'
+"""
+
+
+def _redis_client(cache):
+    """The raw redis-py client behind a Django RedisCache (or a TieredCache's shared tier), or None."""
+    from django.core.cache.backends.redis import RedisCache
+    from .cache import TieredCache
+    if isinstance(cache, TieredCache):
+        cache = cache.l2
+    if isinstance(cache, RedisCache):
+        return cache._cache.get_client(write=True)
+    return None
+
+
+class TokenBucketLimiter:
+    def __init__(self, cache_alias):
+        self.cache = caches[cache_alias]
+        self.local = LocalBuckets()
+        self._script = None
+        self._redis_down_until = 0.0
+
+    def take(self, keys, capacity, refill):
+        if time.monotonic() >= self._redis_down_until:
+            client = _redis_client(self.cache)
+            if client is not None:
+                try:
+                    return self._take_redis(client, keys, capacity, refill)
+                except Exception:
+                    logger.warning("Rate limit store unavailable; using per-process buckets", exc_info=True)
+                    self._redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+        return self.local.take(keys, capacity, refill)
+
+    def _take_redis(self, client, keys, capacity, refill):
+        if self._script is None:
+            self._script = client.register_script(TAKE_SCRIPT)
+        # Idle buckets are full again after capacity/refill seconds
+        ttl = int(capacity / refill) + 1
+        wait = self._script(
+            keys=[self.cache.make_and_validate_key(k) for k in keys],
+            args=[capacity, refill, ttl],
+            client=client,
+        )
+        return float(wait)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = TokenBucketLimiter(settings.RATE_LIMIT_CACHE)
+                if not settings.DEBUG and _redis_client(_limiter.cache) is None:
+                    logger.error(
+                        "RATE_LIMIT_CACHE %r is not Redis: rate limits apply per process, "
+                        "so each worker allows the full rate", settings.RATE_LIMIT_CACHE,
+                    )
+    return _limiter
+
+
+# ===================================================================
+# DRF THROTTLE
+# ===================================================================
+def _digest(value):
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=12).hexdigest()
+
+
+# Client IP as DRF resolves it (honours NUM_PROXIES)
+_client_ip = BaseThrottle().get_ident
+
+
+def bucket_keys(scope, request, user=None):
+    """Bucket keys for a Django request: IP, plus X-Device-ID and user when present."""
+    keys = [f'{KEY_PREFIX}:{scope}:ip:{_digest(_client_ip(request) or "")}']
+    device_id = request.META.get('HTTP_X_DEVICE_ID', '').strip()
+    if device_id:
+        keys.append(f'{KEY_PREFIX}:{scope}:device:{_digest(device_id)}')
+    if user is not None and user.is_authenticated:
+        keys.append(f'{KEY_PREFIX}:{scope}:user:{user.pk}')
+    return keys
+
+
+def check_rate(scope, keys):
+    """Draw from the scope's buckets. Returns seconds to wait, 0 if allowed."""
+    rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+    if rate is None:
+        return 0.0
+    capacity, refill = parse_rate(rate)
+    return get_limiter().take(keys, capacity, refill)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Rate limits POSTs by `view.throttle_scope`, using the rate in
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'].
+    """
+    methods = ('POST',)
+
+    def allow_request(self, request, view):
+        self._wait = 0.0
+        if request.method not in self.methods:
+            return True
+
+        keys = bucket_keys(view.throttle_scope, request, request.user)
+        self._wait = check_rate(view.throttle_scope, keys)
+        return not self._wait
+
+    def wait(self):
+        return self._wait
@@ -0,0 +1,167 @@
+# backend/uploads.py
+"""
+Bounded, streaming handling for photo uploads.
+
+Django's default handlers keep files up to 2.5 MB in worker memory and
+only learn a file's size and type once it has been fully received.
+ImageUploadHandler instead:
+
+  * refuses a request whose declared size exceeds UPLOAD_MAX_REQUEST_BYTES
+    before reading any of it, and stops reading as soon as a file passes
+    UPLOAD_MAX_FILE_BYTES or the running total passes the request cap
+    (413);
+  * checks the first bytes of every file against known image signatures
+    and rejects anything else immediately (415), so non-images never
+    reach Cloudinary;
+  * streams every chunk straight to a temporary file while computing its
+    SHA-256, so memory per request stays at about one chunk whatever the
+    file size. The digest is available as `uploaded_file.sha256`.
+
+Photo upload views opt in with ImageMultiPartParser in their
+parser_classes (IMAGE_UPLOAD_PARSERS also keeps JSON and form bodies);
+other multipart endpoints keep DRF's stock parser.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+
+from .metrics import UPLOAD_RECEIVE_DURATION
+
+SNIFF_BYTES = 32
+
+# ISO-BMFF brands used by HEIC/HEIF (iPhone photos) and AVIF
+_FTYP_BRANDS = {b'heic', b'heix', b'hevc', b'hevx', b'heim', b'heis', b'mif1', b'msf1', b'avif', b'avis'}
+
+
+def sniff_image(head):
+    """Return the image type for the file's first bytes, or None."""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[4:8] == b'ftyp' and head[8:12] in _FTYP_BRANDS:
+        return 'avif' if head[8:12] in (b'avif', b'avis') else 'heic'
+    return None
+
+
+def _megabytes(n):
+    return f'{n / (1024 * 1024):.3g} MB'
+
+
+class UploadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Upload too large.'
+    default_code = 'upload_too_large'
+
+
+class NotAnImage(APIException):
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+    default_detail = 'Only JPEG, PNG, GIF, WebP, HEIC or AVIF images can be uploaded.'
+    default_code = 'not_an_image'
+
+
+class ImageUploadHandler(FileUploadHandler):
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_file = settings.UPLOAD_MAX_FILE_BYTES
+        self.max_request = settings.UPLOAD_MAX_REQUEST_BYTES
+        self.received = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > self.max_request:
+            raise UploadTooLarge(f'Request body exceeds {_megabytes(self.max_request)}.')
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.file = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset,
+                                          self.content_type_extra)
+        self.hasher = hashlib.sha256()
+        self.size = 0
+        self.head = b''
+        self.image_type = None
+
+    def _reject(self, error):
+        self.file.close()   # deletes the temp file
+        raise error
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        self.received += len(raw_data)
+        if self.size > self.max_file:
+            self._reject(UploadTooLarge(
+                f'"{self.file_name}" exceeds {_megabytes(self.max_file)}.'
+            ))
+        if self.received > self.max_request:
+            self._reject(UploadTooLarge(f'Request body exceeds {_megabytes(self.max_request)}.'))
+
+        if self.image_type is None:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= SNIFF_BYTES:
+                self._sniff()
+
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        # Consumed: no later handler keeps a copy
+
+    def _sniff(self):
+        self.image_type = sniff_image(self.head)
+        if self.image_type is None:
+            self._reject(NotAnImage(f'"{self.file_name}" is not a supported image.'))
+
+    def file_complete(self, file_size):
+        if self.image_type is None:
+            self._sniff()   # files shorter than SNIFF_BYTES
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.hasher.hexdigest()
+        self.file.image_type = self.image_type
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            self.file.close()
+
+
+class ImageMultiPartParser(MultiPartParser):
+    """MultiPartParser that accepts only images, via ImageUploadHandler."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context['request']
+        # Read by MultiPartParser.parse() in place of settings.FILE_UPLOAD_HANDLERS
+        request.upload_handlers = [ImageUploadHandler(request._request)]
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            result = super().parse(stream, media_type, parser_context)
+            outcome = 'ok'
+            return result
+        except (UploadTooLarge, NotAnImage) as exc:
+            outcome = exc.default_code
+            raise
+        finally:
+            UPLOAD_RECEIVE_DURATION.observe(time.perf_counter() - started, outcome)
+
+
+IMAGE_UPLOAD_PARSERS = [JSONParser, FormParser, ImageMultiPartParser]
+
+
+def file_digest(uploaded_file):
+    """SHA-256 of an uploaded file: ImageUploadHandler's, or read from the file."""
+    digest = getattr(uploaded_file, 'sha256', None)
+    if digest is None:
+        hasher = hashlib.sha256()
+        for chunk in uploaded_file.chunks():
+            hasher.update(chunk)
+        uploaded_file.seek(0)
+        digest = hasher.hexdigest()
+    return digest
@@ -4,6 +4,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path, include
 from . import views
+from .metrics import metrics_view
 from django.http import JsonResponse
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
@@ -23,6 +24,8 @@ urlpatterns = [
     path('api/fixrequests/', include('fixrequests.urls')),
 
     path('api/health', health_check, name='health'),
+    path('api/health/cache', views.cache_stats, name='cache-stats'),
+    path('metrics', metrics_view, name='metrics'),
     path('api/accounts/', include('accounts.urls')),
      path('api/orders/', include('purchases.urls')), 
     path('api/purchases/', include('purchases.urls')),
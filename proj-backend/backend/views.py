@@ -1,4 +1,16 @@
+from django.core.cache import cache
 from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
 def home(request):
     return HttpResponse("Backend is running 🚀")
+
+
+# Hit/miss counters of the default cache, for the worker that serves the request
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    stats = cache.stats() if hasattr(cache, 'stats') else {}
+    return Response(stats)
@@ -1,3 +1,15 @@
 from django.contrib import admin
+from .models import EmailOutbox
+from .outbox import requeue_dead
 
-# Register your models here.
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    readonly_fields = ('attempts', 'last_error', 'created_at', 'sent_at')
+    actions = ['requeue']
+
+    @admin.action(description="Requeue selected dead emails")
+    def requeue(self, request, queryset):
+        self.message_user(request, f"Requeued {requeue_dead(queryset)} email(s).")
@@ -0,0 +1,17 @@
+# contact/filters.py
+from django_filters import rest_framework as filters
+
+from .models import ContactMessage
+
+
+class ContactMessageFilter(filters.FilterSet):
+    """
+    ?replied= true/false
+    ?created_after= / ?created_before=   ISO dates or datetimes
+    """
+    created_after = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt')
+
+    class Meta:
+        model = ContactMessage
+        fields = ['replied']
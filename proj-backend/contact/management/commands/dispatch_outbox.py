@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from contact.outbox import BATCH_SIZE, dispatch_batch, requeue_dead
+
+
+class Command(BaseCommand):
+    help = "Deliver queued emails from the outbox in batches over one SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running, polling every --interval seconds.")
+        parser.add_argument('--interval', type=float, default=5.0)
+        parser.add_argument('--requeue-dead', action='store_true',
+                            help="Reset dead-lettered emails to pending first.")
+
+    def handle(self, *args, **options):
+        if options['requeue_dead']:
+            self.stdout.write(f"Requeued {requeue_dead()} dead email(s).")
+
+        while True:
+            totals = [0, 0, 0]
+            # Drain everything that is due, one batch (one connection) at a time
+            while True:
+                counts = dispatch_batch(options['batch_size'])
+                totals = [t + c for t, c in zip(totals, counts)]
+                if sum(counts) < options['batch_size']:
+                    break
+            if any(totals) or not options['loop']:
+                sent, retried, dead = totals
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sent {sent}, retrying {retried}, dead-lettered {dead}."
+                ))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:07
+
+from django.db import migrations, models
+
+from backend.search import search_index_operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contact', '0002_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['created_at', 'id'], name='contact_created_idx'),
+        ),
+        # GIN over the weighted tsvector; PostgreSQL only
+        search_index_operation('contact', 'contactmessage', 'contact_search_idx', {'subject': 'A', 'message': 'B'}),
+    ]
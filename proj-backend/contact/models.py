@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class ContactMessage(models.Model):
     name = models.CharField(max_length=100)
@@ -8,5 +9,49 @@ class ContactMessage(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     replied = models.BooleanField(default=False)
 
+    # 🔎 Staff search (backend/search.py): field -> weight
+    SEARCH_FIELDS = {'subject': 'A', 'message': 'B'}
+
+    class Meta:
+        indexes = [
+            # Inbox, newest first (keyset-paginated)
+            models.Index(fields=['created_at', 'id'], name='contact_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.subject}"
+
+
+class EmailOutbox(models.Model):
+    """
+    Outgoing email, written in the same transaction as whatever caused it and
+    delivered later by `manage.py dispatch_outbox` (see contact/outbox.py).
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    DEAD = 'dead'   # gave up after MAX_ATTEMPTS; requeue from the admin
+    STATUS_CHOICES = [(PENDING, 'Pending'), (SENT, 'Sent'), (DEAD, 'Dead')]
+
+    # ✉️ Message
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField()
+    reply_to = models.JSONField(default=list, blank=True)
+
+    # 🔁 Delivery state
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_attempt_at'], condition=models.Q(status='pending'),
+                         name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)} ({self.status})"
@@ -0,0 +1,128 @@
+# contact/outbox.py
+"""
+Transactional email outbox.
+
+Views call enqueue() inside their transaction instead of talking to SMTP,
+so a request never waits on SendGrid and an SMTP outage can't fail a
+request whose data is already saved. `manage.py dispatch_outbox` delivers
+due rows in batches over a single SMTP connection, retries failures with
+exponential backoff and marks a row dead after MAX_ATTEMPTS.
+
+Rows are leased before sending (next_attempt_at pushed out by LEASE), so
+several dispatchers can run at once and a crashed one only delays its
+batch rather than losing it. Each message is marked sent as soon as SMTP
+accepts it, so a crash re-sends at most the message in flight.
+"""
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 30           # seconds before the first retry, doubling after
+BACKOFF_MAX = 60 * 60
+LEASE = timedelta(minutes=5)
+
+
+def enqueue(subject, body, to, from_email=None, reply_to=None):
+    """Queue an email. Call inside the transaction that makes it necessary."""
+    return EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+        reply_to=list(reply_to or []),
+    )
+
+
+def backoff(attempts):
+    """Delay before retry number `attempts`, with ±10% jitter."""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.9, 1.1))
+
+
+def _lease_batch(batch_size):
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects
+            .filter(status=EmailOutbox.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        if batch:
+            EmailOutbox.objects.filter(pk__in=[m.pk for m in batch]).update(next_attempt_at=now + LEASE)
+    return batch
+
+
+def _failed(message, error, now):
+    message.attempts += 1
+    message.last_error = f"{type(error).__name__}: {error}"[:2000]
+    if message.attempts >= MAX_ATTEMPTS:
+        message.status = EmailOutbox.DEAD
+    else:
+        message.next_attempt_at = now + backoff(message.attempts)
+
+
+def _reconnect(connection):
+    # The SMTP session may be unusable after an error
+    connection.close()
+    try:
+        connection.open()
+    except Exception:
+        pass    # send() will try to connect again itself
+
+
+def dispatch_batch(batch_size=BATCH_SIZE, connection=None):
+    """Send one batch of due messages. Returns (sent, retried, dead)."""
+    batch = _lease_batch(batch_size)
+    if not batch:
+        return 0, 0, 0
+
+    connection = connection or get_connection(fail_silently=False)
+    now = timezone.now()
+    try:
+        connection.open()
+    except Exception as e:
+        for message in batch:
+            _failed(message, e, now)
+    else:
+        try:
+            for message in batch:
+                email = EmailMessage(
+                    message.subject, message.body, message.from_email, message.to,
+                    reply_to=message.reply_to or None, connection=connection,
+                )
+                try:
+                    email.send()
+                except Exception as e:
+                    _failed(message, e, now)
+                    _reconnect(connection)
+                else:
+                    message.status = EmailOutbox.SENT
+                    message.sent_at = timezone.now()
+                    # Right away, not with the batch: a crash must not re-send it
+                    EmailOutbox.objects.filter(pk=message.pk).update(
+                        status=message.status, sent_at=message.sent_at,
+                    )
+        finally:
+            connection.close()
+
+    failed = [m for m in batch if m.status != EmailOutbox.SENT]
+    EmailOutbox.objects.bulk_update(failed, ['status', 'attempts', 'next_attempt_at', 'last_error'])
+    dead = sum(1 for m in failed if m.status == EmailOutbox.DEAD)
+    return len(batch) - len(failed), len(failed) - dead, dead
+
+
+def requeue_dead(queryset=None):
+    """Give dead messages a fresh set of attempts. Returns how many."""
+    queryset = queryset if queryset is not None else EmailOutbox.objects.all()
+    return queryset.filter(status=EmailOutbox.DEAD).update(
+        status=EmailOutbox.PENDING, attempts=0, next_attempt_at=timezone.now(),
+    )
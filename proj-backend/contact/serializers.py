@@ -4,4 +4,5 @@ from .models import ContactMessage
 class ContactMessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = ContactMessage
-        fields = ['id', 'name', 'email', 'subject', 'message', 'created_at']
+        fields = ['id', 'name', 'email', 'subject', 'message', 'created_at', 'replied']
+        read_only_fields = ['replied']
@@ -1,3 +1,109 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+
+from .models import ContactMessage, EmailOutbox
+from .outbox import MAX_ATTEMPTS, dispatch_batch, enqueue, requeue_dead
+
+
+class BouncingBackend(EmailBackend):
+    """locmem, but refuses mail to bounce@ addresses and crashes on crash@ ones."""
+
+    def send_messages(self, messages):
+        for message in messages:
+            if any(to.startswith('crash@') for to in message.to):
+                raise SystemExit('dispatcher killed')
+            if any(to.startswith('bounce@') for to in message.to):
+                raise ConnectionError('550 mailbox unavailable')
+        return super().send_messages(messages)
+
+
+# ===================================================================
+# EMAIL OUTBOX (contact/outbox.py); the test runner uses the locmem backend
+# ===================================================================
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class EmailOutboxTests(TestCase):
+    def test_contact_message_is_queued_then_dispatched(self):
+        response = APIClient().post('/api/contact-messages/', {
+            'name': 'Jane', 'email': 'jane@example.com', 'subject': 'Hello', 'message': 'Hi there',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(EmailOutbox.objects.get().status, EmailOutbox.PENDING)
+
+        call_command('dispatch_outbox', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].reply_to, ['jane@example.com'])
+        message = EmailOutbox.objects.get()
+        self.assertEqual(message.status, EmailOutbox.SENT)
+        self.assertIsNotNone(message.sent_at)
+
+    def test_failure_is_retried_with_backoff(self):
+        enqueue('Hi', 'Body', ['ok@example.com'])
+        bounced = enqueue('Hi', 'Body', ['bounce@example.com'])
+
+        self.assertEqual(dispatch_batch(connection=BouncingBackend()), (1, 1, 0))
+        self.assertEqual([m.to for m in mail.outbox], [['ok@example.com']])
+        bounced.refresh_from_db()
+        self.assertEqual((bounced.status, bounced.attempts), (EmailOutbox.PENDING, 1))
+        self.assertIn('550 mailbox unavailable', bounced.last_error)
+        self.assertGreater(bounced.next_attempt_at, timezone.now() + timedelta(seconds=20))
+
+        # Not due yet
+        self.assertEqual(dispatch_batch(connection=BouncingBackend()), (0, 0, 0))
+
+    def test_dead_lettered_after_max_attempts(self):
+        message = enqueue('Hi', 'Body', ['bounce@example.com'])
+        EmailOutbox.objects.filter(pk=message.pk).update(attempts=MAX_ATTEMPTS - 1)
+
+        self.assertEqual(dispatch_batch(connection=BouncingBackend()), (0, 0, 1))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (EmailOutbox.DEAD, MAX_ATTEMPTS))
+
+        self.assertEqual(requeue_dead(), 1)
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (EmailOutbox.PENDING, 0))
+
+    def test_sent_messages_survive_a_crash_mid_batch(self):
+        first = enqueue('Hi', 'Body', ['ok@example.com'])
+        enqueue('Hi', 'Body', ['crash@example.com'])
+
+        with self.assertRaises(SystemExit):
+            dispatch_batch(connection=BouncingBackend())
+        first.refresh_from_db()
+        self.assertEqual(first.status, EmailOutbox.SENT)
+
+
+# ===================================================================
+# STAFF SEARCH (backend/search.py); SQLite takes the icontains fallback
+# ===================================================================
+class ContactSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('staff@example.com', 'x', is_staff=True))
+        ContactMessage.objects.create(name='A', email='a@example.com', subject='Hello', message='My screen is broken')
+        ContactMessage.objects.create(name='B', email='b@example.com', subject='Broken screen', message='Please help')
+        ContactMessage.objects.create(name='C', email='c@example.com', subject='Screen', message='Works fine')
+
+    def search(self, q, **params):
+        response = self.client.get('/api/contact-messages/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['name'] for row in response.data['results']]
+
+    def test_every_word_must_match_subject_ranks_first(self):
+        self.assertEqual(self.search('broken screen'), ['B', 'A'])
+
+    def test_blank_query_matches_nothing(self):
+        self.assertEqual(self.search('  '), [])
+
+    def test_staff_only(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/contact-messages/search/', {'q': 'screen'}).status_code, 401)
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import ContactMessageListCreateView
+from .views import ContactMessageListCreateView, ContactMessageSearchView
 
 urlpatterns = [
     path('contact-messages/', ContactMessageListCreateView.as_view(), name='contact-messages'),
+    path('contact-messages/search/', ContactMessageSearchView.as_view(), name='contact-messages-search'),
 ]
@@ -1,25 +1,35 @@
 from rest_framework import generics, permissions
-from rest_framework.response import Response
-from django.core.mail import send_mail
-from django.conf import settings
+from django.db import transaction
+from backend.pagination import KeysetPagination
+from backend.search import SearchPagination, text_search
+from backend.throttling import TokenBucketThrottle
+from .filters import ContactMessageFilter
 from .models import ContactMessage
+from .outbox import enqueue
 from .serializers import ContactMessageSerializer
 
+ADMIN_EMAIL = 'jiranijourneys@gmail.com'  # Change to your admin email
+
 
 class ContactMessageListCreateView(generics.ListCreateAPIView):
-    queryset = ContactMessage.objects.all().order_by('-created_at')
+    queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+    filterset_class = ContactMessageFilter
 
     # ✅ Anyone can send a message — no authentication required
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'contact'
 
     def perform_create(self, serializer):
-        message = serializer.save()
-
-        # ✅ Automatically send email notification to admin
-        send_mail(
-            subject=f"📩 New Contact Message from {message.name}",
-            message=f"""
+        # ✅ Save + queue the admin notification atomically; dispatch_outbox sends it
+        with transaction.atomic():
+            message = serializer.save()
+            enqueue(
+                subject=f"📩 New Contact Message from {message.name}",
+                body=f"""
 You have received a new message from {message.name} ({message.email}).
 
 Subject: {message.subject}
@@ -29,8 +39,19 @@ Message:
 --------------------
 Reply directly to this email to contact the sender.
             """,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=['jiranijourneys@gmail.com'],  # Change to your admin email
-            fail_silently=False,
-        )
-        return Response(serializer.data)
+                to=[ADMIN_EMAIL],
+                reply_to=[message.email],
+            )
+
+
+# 🔎 Staff inbox search: ?q= (web-search syntax on PostgreSQL), ranked, paginated
+class ContactMessageSearchView(generics.ListAPIView):
+    serializer_class = ContactMessageSerializer
+    permission_classes = [permissions.IsAdminUser]
+    pagination_class = SearchPagination
+    filterset_class = ContactMessageFilter
+    statement_timeout_class = 'report'
+
+    def get_queryset(self):
+        term = self.request.query_params.get('q', '')
+        return text_search(ContactMessage.objects.all(), term, ContactMessage.SEARCH_FIELDS)
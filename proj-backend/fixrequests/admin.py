@@ -3,13 +3,23 @@ from django.contrib import admin
 # Register your models here.
 # fixrequests/admin.py
 from django.contrib import admin
-from .models import RepairRequest, RepairImage
+from .models import RepairRequest, RepairImage, RepairStatusChange
 
 class RepairImageInline(admin.TabularInline):
     model = RepairImage
     extra = 1
 
+class RepairStatusChangeInline(admin.TabularInline):
+    model = RepairStatusChange
+    fields = ['from_status', 'to_status', 'changed_at']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 @admin.register(RepairRequest)
 class RepairRequestAdmin(admin.ModelAdmin):
     list_display = ['client_name', 'device_type', 'status', 'cover_image', 'created_at']
-    inlines = [RepairImageInline]
+    inlines = [RepairImageInline, RepairStatusChangeInline]
@@ -0,0 +1,19 @@
+# fixrequests/filters.py
+from django_filters import rest_framework as filters
+
+from .models import RepairRequest
+
+
+class RepairRequestFilter(filters.FilterSet):
+    """
+    ?status=PENDING (repeatable)   ?device_type= (case-insensitive)
+    ?created_after= / ?created_before=   ISO dates or datetimes
+    """
+    status = filters.MultipleChoiceFilter(choices=RepairRequest.STATUS_CHOICES)
+    device_type = filters.CharFilter(lookup_expr='iexact')
+    created_after = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt')
+
+    class Meta:
+        model = RepairRequest
+        fields = ['status', 'device_type']
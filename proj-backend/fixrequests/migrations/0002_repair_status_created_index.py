@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixrequests', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='repairrequest',
+            index=models.Index(fields=['status', 'created_at'], name='repair_status_created_idx'),
+        ),
+    ]
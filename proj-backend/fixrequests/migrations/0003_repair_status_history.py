@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:04
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+CHUNK_SIZE = 2000
+
+
+def backfill(apps, schema_editor):
+    """
+    One history row per existing repair. Their real transition times are
+    unknown, so a repair that has left PENDING is taken to have entered its
+    current status at updated_at (its last edit).
+    """
+    RepairRequest = apps.get_model('fixrequests', 'RepairRequest')
+    RepairStatusChange = apps.get_model('fixrequests', 'RepairStatusChange')
+    last_pk = None
+    while True:
+        qs = RepairRequest.objects.order_by('pk')
+        if last_pk is not None:
+            qs = qs.filter(pk__gt=last_pk)
+        chunk = list(qs.only('pk', 'status', 'created_at', 'updated_at')[:CHUNK_SIZE])
+        if not chunk:
+            break
+        RepairStatusChange.objects.bulk_create([
+            RepairStatusChange(
+                repair_request_id=repair.pk,
+                to_status=repair.status,
+                changed_at=repair.created_at if repair.status == 'PENDING' else repair.updated_at,
+            )
+            for repair in chunk
+        ])
+        last_pk = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixrequests', '0002_repair_status_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepairStatusChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('PENDING', 'Pending'), ('IN_PROGRESS', 'In Progress'), ('COMPLETED', 'Completed'), ('REJECTED', 'Rejected')], max_length=50, null=True)),
+                ('to_status', models.CharField(choices=[('PENDING', 'Pending'), ('IN_PROGRESS', 'In Progress'), ('COMPLETED', 'Completed'), ('REJECTED', 'Rejected')], max_length=50)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('repair_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_changes', to='fixrequests.repairrequest')),
+            ],
+            options={
+                'ordering': ['changed_at'],
+                'indexes': [models.Index(fields=['repair_request', 'to_status', 'changed_at'], name='repair_change_lookup_idx')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:07
+
+from django.db import migrations
+
+from backend.search import search_index_operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixrequests', '0003_repair_status_history'),
+    ]
+
+    operations = [
+        # GIN over the weighted tsvector; PostgreSQL only
+        search_index_operation('fixrequests', 'repairrequest', 'repair_search_idx', {'issue_description': 'A', 'device_type': 'B'}),
+    ]
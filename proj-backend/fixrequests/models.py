@@ -1,5 +1,6 @@
 # fixrequests/models.py
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 import uuid
 from cloudinary.models import CloudinaryField
 
@@ -27,12 +28,69 @@ class RepairRequest(models.Model):
 
     cover_image = CloudinaryField('image', blank=True, null=True)  # First uploaded image
 
+    # Staff search (backend/search.py): field -> weight
+    SEARCH_FIELDS = {'issue_description': 'A', 'device_type': 'B'}
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Technicians' queue: WHERE status = ? ORDER BY created_at DESC
+            models.Index(fields=['status', 'created_at'], name='repair_status_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.client_name} — {self.device_type} ({self.status})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() can log transitions
+        instance._stored_status = dict(zip(field_names, values)).get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        previous = getattr(self, '_stored_status', None)
+        created = self._state.adding
+        # The row and its history entry commit together or not at all
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if created or self.status != previous:
+                RepairStatusChange.objects.create(
+                    repair_request=self, from_status=None if created else previous, to_status=self.status,
+                )
+        self._stored_status = self.status
+        self._invalidate_stats()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._invalidate_stats()
+        return result
+
+    def _invalidate_stats(self):
+        from .stats import invalidate_stats
+        transaction.on_commit(invalidate_stats)
+
+
+# ===================================================================
+# STATUS HISTORY
+# ===================================================================
+class RepairStatusChange(models.Model):
+    """One row per status a repair enters; written by RepairRequest.save()."""
+    repair_request = models.ForeignKey(RepairRequest, on_delete=models.CASCADE, related_name='status_changes')
+    from_status = models.CharField(max_length=50, choices=RepairRequest.STATUS_CHOICES, blank=True, null=True)
+    to_status = models.CharField(max_length=50, choices=RepairRequest.STATUS_CHOICES)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['changed_at']
+        indexes = [
+            # ⏱️ Completion time: latest COMPLETED change per repair
+            models.Index(fields=['repair_request', 'to_status', 'changed_at'], name='repair_change_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.from_status or '—'} → {self.to_status} at {self.changed_at:%Y-%m-%d %H:%M}"
+
 
 # ===================================================================
 # REPAIR IMAGES
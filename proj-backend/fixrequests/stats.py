@@ -0,0 +1,104 @@
+# fixrequests/stats.py
+"""
+Aggregate repair metrics for the operations dashboard.
+
+Everything comes from grouped queries (no rows are loaded) and the result
+is cached as one entry. RepairRequest.save()/delete() drop it on commit;
+STATS_TTL bounds how stale the aging buckets get when nothing changes.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Avg, Case, Count, DurationField, ExpressionWrapper, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import RepairRequest, RepairStatusChange
+
+STATS_KEY = 'fixrequests:repair-stats'
+STATS_TTL = 60 * 5
+
+OPEN_STATUSES = ('PENDING', 'IN_PROGRESS')
+
+# (label, upper bound on age); the last bucket is open-ended
+AGE_BUCKETS = [
+    ('<1d', timedelta(days=1)),
+    ('1-3d', timedelta(days=3)),
+    ('3-7d', timedelta(days=7)),
+    ('7-14d', timedelta(days=14)),
+    ('14-30d', timedelta(days=30)),
+    ('30d+', None),
+]
+
+
+def invalidate_stats():
+    cache.delete(STATS_KEY)
+
+
+def _status_counts():
+    counts = dict(RepairRequest.objects.order_by().values_list('status').annotate(n=Count('id')))
+    return {status: counts.get(status, 0) for status, _ in RepairRequest.STATUS_CHOICES}
+
+
+def _completion():
+    """(completed repairs, average seconds from creation to their latest COMPLETED transition)."""
+    completed_at = Subquery(
+        RepairStatusChange.objects
+        .filter(repair_request=OuterRef('pk'), to_status='COMPLETED')
+        .order_by('-changed_at')
+        .values('changed_at')[:1]
+    )
+    result = (
+        RepairRequest.objects
+        .filter(status='COMPLETED')
+        # Rows set COMPLETED with queryset.update() have no history; their last edit is the best guess
+        .annotate(completed_at=Coalesce(completed_at, F('updated_at')))
+        .aggregate(
+            n=Count('id'),
+            avg=Avg(ExpressionWrapper(F('completed_at') - F('created_at'), output_field=DurationField())),
+        )
+    )
+    return result['n'], result['avg'].total_seconds() if result['avg'] is not None else None
+
+
+def _aging(now):
+    """Open repairs per status, bucketed by age since creation."""
+    whens = [
+        When(created_at__gt=now - upper, then=Value(label))
+        for label, upper in AGE_BUCKETS if upper is not None
+    ]
+    rows = (
+        RepairRequest.objects
+        .filter(status__in=OPEN_STATUSES)
+        .annotate(bucket=Case(*whens, default=Value(AGE_BUCKETS[-1][0])))
+        .order_by()
+        .values_list('status', 'bucket')
+        .annotate(n=Count('id'))
+    )
+    histogram = {status: {label: 0 for label, _ in AGE_BUCKETS} for status in OPEN_STATUSES}
+    for status, bucket, n in rows:
+        histogram[status][bucket] = n
+    return histogram
+
+
+def compute_stats():
+    now = timezone.now()
+    completed, avg_seconds = _completion()
+    return {
+        'counts': _status_counts(),
+        'completed': completed,
+        'avg_completion_seconds': avg_seconds,
+        'aging': _aging(now),
+        'buckets': [label for label, _ in AGE_BUCKETS],
+        'generated_at': now.isoformat(),
+    }
+
+
+def repair_stats():
+    """Return (stats dict, cache hit?)."""
+    stats = cache.get(STATS_KEY)
+    if stats is not None:
+        return stats, True
+    stats = compute_stats()
+    cache.set(STATS_KEY, stats, STATS_TTL)
+    return stats, False
@@ -1,3 +1,185 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from cloudinary import CloudinaryResource
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+
+from .models import RepairImage, RepairRequest, RepairStatusChange
+
+
+def make_repair(status='PENDING', age=timedelta(0), images=0, device_type='Phone'):
+    repair = RepairRequest.objects.create(status=status, device_type=device_type)
+    # created_at is auto_now_add; backdate through the queryset
+    RepairRequest.objects.filter(pk=repair.pk).update(created_at=timezone.now() - age)
+    for _ in range(images):
+        RepairImage.objects.create(repair_request=repair)
+    return repair
+
+
+# ===================================================================
+# REPAIR QUEUE (fixrequests/views.py, fixrequests/filters.py)
+# ===================================================================
+class RepairQueueTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_pages_follow_next_newest_first(self):
+        repairs = [make_repair(age=timedelta(hours=i)) for i in range(5)]
+        seen = []
+        url = '/api/fixrequests/repairs/?page_size=2'
+        while url:
+            page = self.client.get(url).json()
+            seen += [row['id'] for row in page['results']]
+            url = page['next']
+        self.assertEqual(seen, [str(r.pk) for r in repairs])
+
+    def test_images_prefetched_per_page(self):
+        for _ in range(3):
+            make_repair(images=2)
+        with self.assertNumQueries(2):
+            rows = self.client.get('/api/fixrequests/repairs/').json()['results']
+        self.assertEqual([len(row['images']) for row in rows], [2, 2, 2])
+
+    def test_filters(self):
+        make_repair('PENDING')
+        make_repair('COMPLETED')
+        make_repair('REJECTED', device_type='Laptop')
+        rows = self.client.get('/api/fixrequests/repairs/?status=PENDING&status=REJECTED').json()['results']
+        self.assertEqual(sorted(row['status'] for row in rows), ['PENDING', 'REJECTED'])
+        rows = self.client.get('/api/fixrequests/repairs/?device_type=laptop').json()['results']
+        self.assertEqual([row['status'] for row in rows], ['REJECTED'])
+
+        old = make_repair(age=timedelta(days=10))
+        after = (timezone.now() - timedelta(days=1)).isoformat()
+        rows = self.client.get('/api/fixrequests/repairs/', {'created_after': after}).json()['results']
+        self.assertNotIn(str(old.pk), [row['id'] for row in rows])
+        self.assertEqual(len(rows), 3)
+
+
+# ===================================================================
+# STAFF SEARCH (backend/search.py); SQLite takes the icontains fallback
+# ===================================================================
+class RepairSearchTests(TestCase):
+    def test_ranked_by_field_weight_staff_only(self):
+        by_device = RepairRequest.objects.create(device_type='iPhone', issue_description='Battery drains')
+        by_issue = RepairRequest.objects.create(device_type='Laptop', issue_description='iPhone sync fails')
+        RepairRequest.objects.create(device_type='Laptop', issue_description='Fan noise')
+        client = APIClient()
+        self.assertEqual(client.get('/api/fixrequests/repairs/search/', {'q': 'iphone'}).status_code, 401)
+
+        client.force_authenticate(User.objects.create_user('staff@example.com', 'x', is_staff=True))
+        rows = client.get('/api/fixrequests/repairs/search/', {'q': 'iphone'}).json()['results']
+        # issue_description weighs A, device_type B
+        self.assertEqual([row['id'] for row in rows], [str(by_issue.pk), str(by_device.pk)])
+
+
+# ===================================================================
+# PHOTO UPLOADS (fixrequests/views.py, backend/uploads.py)
+# ===================================================================
+PNG = b'\x89PNG\r\n\x1a\n' + b'\0' * 64
+
+
+def photo(content=PNG, name='photo.png'):
+    return SimpleUploadedFile(name, content, content_type='image/png')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class RepairUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.repair = make_repair()
+        self.url = f'/api/fixrequests/repairs/{self.repair.pk}/upload_images/'
+        # No Cloudinary round trips
+        patcher = mock.patch('cloudinary.uploader.upload_resource',
+                             side_effect=lambda file, **options: CloudinaryResource(file.name, format='png'))
+        self.upload = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, *files):
+        return APIClient().post(self.url, {'images': list(files)}, format='multipart')
+
+    def test_same_photo_twice_uploaded_once(self):
+        response = self.post(photo(), photo(name='copy.png'), photo(PNG + b'other'))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(self.upload.call_count, 2)
+
+    def test_non_image_refused(self):
+        response = self.post(photo(b'%PDF-1.7' + b'\0' * 64, 'doc.png'))
+        self.assertEqual(response.status_code, 415)
+        self.assertFalse(RepairImage.objects.exists())
+
+    @override_settings(UPLOAD_MAX_FILE_BYTES=32)
+    def test_oversized_photo_refused(self):
+        self.assertEqual(self.post(photo()).status_code, 413)
+
+
+# ===================================================================
+# OPERATIONS DASHBOARD (fixrequests/stats.py, RepairStatusChange)
+# ===================================================================
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class RepairStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('staff@example.com', 'x', is_staff=True))
+
+    def stats(self):
+        response = self.client.get('/api/fixrequests/repairs/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_staff_only(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/fixrequests/repairs/stats/').status_code, 401)
+        self.client.force_authenticate(User.objects.create_user('jane@example.com', 'x'))
+        self.assertEqual(self.client.get('/api/fixrequests/repairs/stats/').status_code, 403)
+
+    def test_counts_completion_and_aging(self):
+        make_repair('PENDING', age=timedelta(days=2))
+        make_repair('IN_PROGRESS', age=timedelta(days=20))
+        with self.captureOnCommitCallbacks(execute=True):
+            repair = make_repair('PENDING', age=timedelta(hours=6))
+            repair.refresh_from_db()
+            repair.status = 'COMPLETED'
+            repair.save()
+
+        stats = self.stats().data
+        self.assertEqual(stats['counts'], {'PENDING': 1, 'IN_PROGRESS': 1, 'COMPLETED': 1, 'REJECTED': 0})
+        self.assertEqual(stats['completed'], 1)
+        self.assertAlmostEqual(stats['avg_completion_seconds'], 6 * 3600, delta=60)
+        self.assertEqual(stats['aging']['PENDING']['1-3d'], 1)
+        self.assertEqual(stats['aging']['IN_PROGRESS']['14-30d'], 1)
+
+    def test_cached_until_a_repair_changes(self):
+        repair = make_repair()
+        self.assertEqual(self.stats()['X-Cache'], 'MISS')
+        self.assertEqual(self.stats()['X-Cache'], 'HIT')
+        with self.captureOnCommitCallbacks(execute=True):
+            repair.status = 'REJECTED'
+            repair.save()
+        response = self.stats()
+        self.assertEqual((response['X-Cache'], response.data['counts']['REJECTED']), ('MISS', 1))
+
+    def test_history_written_with_the_save(self):
+        repair = make_repair()
+        repair.status = 'IN_PROGRESS'
+        with mock.patch.object(RepairStatusChange.objects, 'create', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                repair.save()
+        repair.refresh_from_db()
+        self.assertEqual(repair.status, 'PENDING')
+
+        repair.status = 'IN_PROGRESS'
+        repair.save()
+        self.assertEqual(
+            list(repair.status_changes.values_list('from_status', 'to_status')),
+            [(None, 'PENDING'), ('PENDING', 'IN_PROGRESS')],
+        )
@@ -1,23 +1,61 @@
 # fixrequests/views.py
 from rest_framework import viewsets, status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from backend.pagination import KeysetPagination
+from backend.search import SearchPagination, text_search
+from backend.throttling import TokenBucketThrottle
+from backend.uploads import ImageMultiPartParser, file_digest
+from .filters import RepairRequestFilter
 from .models import RepairRequest, RepairImage
 from .serializers import RepairRequestSerializer, RepairImageSerializer
+from .stats import repair_stats
 
 class RepairRequestViewSet(viewsets.ModelViewSet):
-    queryset = RepairRequest.objects.all()
+    # Images for a whole page come in one extra query, not one per repair
+    queryset = RepairRequest.objects.prefetch_related('images')
     serializer_class = RepairRequestSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ('-created_at', 'id')
+    filterset_class = RepairRequestFilter
+    throttle_scope = 'repair-uploads'  # only upload_images is throttled
+    statement_timeout_class = None  # per action (backend/db.py)
+
+    # Dashboard aggregates: counts by status, time to complete, aging of open repairs
+    @action(detail=False, methods=['GET'], permission_classes=[IsAdminUser], statement_timeout_class='report')
+    def stats(self, request):
+        stats, hit = repair_stats()
+        response = Response(stats)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+    # Staff search over issue descriptions: ?q=, ranked, filters as on the list
+    @action(detail=False, methods=['GET'], permission_classes=[IsAdminUser], pagination_class=SearchPagination,
+            statement_timeout_class='report')
+    def search(self, request):
+        term = request.query_params.get('q', '')
+        queryset = self.filter_queryset(text_search(self.get_queryset(), term, RepairRequest.SEARCH_FIELDS))
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     # Endpoint for uploading images
-    @action(detail=True, methods=['POST'])
+    @action(detail=True, methods=['POST'], throttle_classes=[TokenBucketThrottle],
+            parser_classes=[ImageMultiPartParser])
     def upload_images(self, request, pk=None):
         repair_request = self.get_object()
         files = request.FILES.getlist('images')
         primary = request.data.get('is_primary', 'false').lower() == 'true'
         images = []
+        seen = set()
 
         for file in files:
+            # Same photo picked twice: upload it once
+            digest = file_digest(file)
+            if digest in seen:
+                continue
+            seen.add(digest)
             img = RepairImage.objects.create(
                 repair_request=repair_request,
                 image=file,
@@ -0,0 +1,9 @@
+# gunicorn.conf.py (read by gunicorn from the working directory)
+import os
+
+
+def on_starting(server):
+    # Per-worker metric files outlive the server; start each run's totals from zero
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    from backend import metrics
+    metrics.reset()
@@ -0,0 +1,37 @@
+# products/async_views.py
+"""
+Async catalog reads for the ASGI deployment (see backend/async_views.py).
+Writes to the same URLs still go to the viewsets.
+"""
+from django.core.cache import cache
+
+from backend.async_views import aget_object, alist_rows, async_routes
+from .cache import PRODUCT_LIST_TTL, aproduct_version, product_cache_key, product_detail_key
+from .views import BrandViewSet, CategoryViewSet, GlobalOptionViewSet, ProductViewSet, product_queryset
+
+
+# Read through the same cache entries as ProductViewSet.list()/retrieve()
+async def _product_list(view):
+    key = product_cache_key(view.request.query_params, await aproduct_version())
+    rows = await cache.aget(key)
+    if rows is None:
+        rows = await alist_rows(view, product_queryset(view.request.query_params))
+        await cache.aset(key, rows, PRODUCT_LIST_TTL)
+    return view.get_serializer(rows, many=True).data
+
+
+async def _product_detail(view):
+    key = product_detail_key(view.kwargs['pk'], view.request.query_params, await aproduct_version())
+    product = await cache.aget(key)
+    if product is None:
+        product = await aget_object(view, product_queryset(view.request.query_params))
+        await cache.aset(key, product, PRODUCT_LIST_TTL)
+    return view.get_serializer(product).data
+
+
+product_list, product_detail = async_routes(
+    ProductViewSet, list_read=_product_list, detail_read=_product_detail,
+)
+category_list, category_detail = async_routes(CategoryViewSet)
+brand_list, brand_detail = async_routes(BrandViewSet)
+option_list, option_detail = async_routes(GlobalOptionViewSet)
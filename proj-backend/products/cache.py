@@ -0,0 +1,58 @@
+# products/cache.py
+"""
+Cache keys for the catalog reads (products/views.py, products/async_views.py).
+
+List and detail entries are keyed by a catalog-wide version, which the
+handlers in products/signals.py bump after any change to a product, its
+images, variants, categories, brand, tags or options commits. A bump makes
+every cached list and detail unreachable at once; the old entries expire
+on their own.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY = 'products:version'
+PRODUCT_LIST_TTL = 60 * 5
+
+
+def product_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY, 0)
+    return version
+
+
+async def aproduct_version():
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, time.time_ns(), None)
+        version = await cache.aget(VERSION_KEY, 0)
+    return version
+
+
+def invalidate_products():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def _params_digest(params):
+    # A digest of the sorted query params rather than hash(), which differs
+    # per process and would keep workers from sharing entries
+    query_params_tuple = tuple(sorted(params.items()))
+    return hashlib.blake2b(repr(query_params_tuple).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def product_cache_key(params, version, listing='list'):
+    """The entry for one listing ("list", "featured") and query string: its final rows, prefetches included."""
+    return f'products:{listing}:{version}:{_params_digest(params)}'
+
+
+def product_detail_key(pk, params, version):
+    """The detail entry for one product; the query string's filters decide whether it is found."""
+    return f'products:detail:{version}:{pk}:{_params_digest(params)}'
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.asgi import get_asgi_application
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+# Each deployment runs as one fresh process, configured through its
+# environment as backend/wsgi.py and backend/asgi.py would be
+DEPLOYMENTS = [
+    ('wsgi', {'ASYNC_AUTH_VIEWS': 'false', 'ASYNC_CATALOG_VIEWS': 'false'}),
+    ('asgi', {'ASYNC_AUTH_VIEWS': 'true', 'ASYNC_CATALOG_VIEWS': 'true'}),
+]
+
+
+def _summary(samples, wall):
+    samples.sort()
+    return {
+        'p50': statistics.median(samples),
+        'p99': samples[int(0.99 * (len(samples) - 1))],
+        'rps': len(samples) / wall,
+    }
+
+
+class Command(BaseCommand):
+    help = ("Compare throughput and p50/p99 latency of the catalog reads served by one WSGI process "
+            "(a fixed pool of request threads, as gunicorn's gthread worker) and one ASGI process "
+            "(async views on an event loop) as concurrency rises. Peak RSS is reported per process.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', action='append', dest='paths',
+                            help="Path to request, repeatable. Default: the catalog and testimonial reads.")
+        parser.add_argument('--requests', type=int, default=400, help="Requests per concurrency level.")
+        parser.add_argument('--concurrency', default='1,8,32,64', help="Comma-separated client counts.")
+        parser.add_argument('--threads', type=int, default=4, help="WSGI request threads per process.")
+        parser.add_argument('--worker', choices=[name for name, _ in DEPLOYMENTS],
+                            help="Internal: run one deployment, print JSON.")
+
+    def handle(self, *args, **options):
+        options['paths'] = options['paths'] or [
+            '/api/products/', '/api/categories/', '/api/brands/', '/api/testimonials/feed/',
+        ]
+        levels = [int(c) for c in options['concurrency'].split(',')]
+        if options['worker']:
+            run = self._run_asgi if options['worker'] == 'asgi' else self._run_wsgi
+            self.stdout.write(json.dumps(run(options, levels)))
+            return
+
+        self.stdout.write(
+            f"{', '.join(options['paths'])}: {options['requests']} requests per level, "
+            f"WSGI with {options['threads']} threads"
+        )
+        results = {}
+        for name, overrides in DEPLOYMENTS:
+            args = [sys.executable, sys.argv[0], 'bench_asgi', '--worker', name,
+                    '--requests', str(options['requests']), '--concurrency', options['concurrency'],
+                    '--threads', str(options['threads'])]
+            for path in options['paths']:
+                args += ['--path', path]
+            result = subprocess.run(args, env=dict(os.environ, **overrides), capture_output=True, text=True)
+            if result.returncode:
+                self.stdout.write(self.style.ERROR(f"  {name} failed:\n{result.stderr.strip()}"))
+                return
+            results[name] = json.loads(result.stdout.strip().splitlines()[-1])
+
+        for level in levels:
+            self.stdout.write(f"  {level:>4} clients")
+            for name, _ in DEPLOYMENTS:
+                r = results[name]['levels'][str(level)]
+                self.stdout.write(
+                    f"    {name}  {r['rps']:8.1f} req/s   p50 {r['p50']:8.2f} ms   p99 {r['p99']:8.2f} ms"
+                )
+        for name, _ in DEPLOYMENTS:
+            self.stdout.write(f"  {name} peak RSS {results[name]['rss_mb']:.1f} MB")
+
+    @staticmethod
+    def _paths(options, total):
+        paths = options['paths']
+        return [paths[i % len(paths)] for i in range(total)]
+
+    @staticmethod
+    def _rss_mb():
+        # ru_maxrss is KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    # --- WSGI: `threads` handler threads, clients queue for them -------------
+    def _run_wsgi(self, options, levels):
+        handler = WSGIHandler()
+        factory = RequestFactory(SERVER_NAME='localhost')
+        slots = threading.Semaphore(options['threads'])
+
+        def request(path):
+            url = urlsplit(path)
+            environ = factory._base_environ(PATH_INFO=url.path, QUERY_STRING=url.query, REQUEST_METHOD='GET')
+            started = time.perf_counter()
+            with slots:
+                response = handler(environ, lambda status, headers: None)
+                b''.join(response)
+                response.close()
+            if response.status_code >= 400:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+            return (time.perf_counter() - started) * 1000
+
+        for path in options['paths']:
+            request(path)
+
+        out = {}
+        for level in levels:
+            paths = self._paths(options, options['requests'])
+            samples, lock = [], threading.Lock()
+
+            def client(mine):
+                timings = [request(path) for path in mine]
+                with lock:
+                    samples.extend(timings)
+
+            started = time.perf_counter()
+            clients = [threading.Thread(target=client, args=(paths[i::level],)) for i in range(level)]
+            for t in clients:
+                t.start()
+            for t in clients:
+                t.join()
+            out[level] = _summary(samples, time.perf_counter() - started)
+        return {'levels': out, 'rss_mb': self._rss_mb()}
+
+    # --- ASGI: one event loop, clients are tasks ------------------------------
+    def _run_asgi(self, options, levels):
+        application = get_asgi_application()
+
+        async def request(path):
+            url = urlsplit(path)
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+                'method': 'GET', 'scheme': 'http', 'root_path': '',
+                'path': url.path, 'raw_path': url.path.encode(), 'query_string': url.query.encode(),
+                'headers': [(b'host', b'localhost')],
+                'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+            }
+            sent = []
+
+            async def receive():
+                if not sent:
+                    sent.append(None)
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await asyncio.Future()   # no disconnect; cancelled when the response is done
+
+            status = []
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            started = time.perf_counter()
+            await application(scope, receive, send)
+            if status[0] >= 400:
+                raise RuntimeError(f"{path} returned {status[0]}")
+            return (time.perf_counter() - started) * 1000
+
+        async def run():
+            for path in options['paths']:
+                await request(path)
+            out = {}
+            for level in levels:
+                paths = self._paths(options, options['requests'])
+                samples = []
+
+                async def client(mine):
+                    for path in mine:
+                        samples.append(await request(path))
+
+                started = time.perf_counter()
+                await asyncio.gather(*(client(paths[i::level]) for i in range(level)))
+                out[level] = _summary(samples, time.perf_counter() - started)
+            return out
+
+        return {'levels': asyncio.run(run()), 'rss_mb': self._rss_mb()}
@@ -0,0 +1,107 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+
+# Connection settings per scenario, applied through the environment of a
+# fresh process (settings are read once per process)
+SCENARIOS = [
+    ('new connection per request', {'DB_CONN_MAX_AGE': '0'}),
+    ('persistent + health checks', {'DB_CONN_MAX_AGE': '600'}),
+]
+# Bypass the cache so every request reaches the database
+NO_CACHE = {'CACHE_URL': 'dummycache://', 'CACHE_L1_TIMEOUT': '0'}
+
+
+class Command(BaseCommand):
+    help = ("Report p50/p99 latency of /api/products/ with a new connection per request and with "
+            "persistent connections. Point DATABASE_URL at a local PostgreSQL.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help="Requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Threads issuing requests.")
+        parser.add_argument('--path', default='/api/products/')
+        parser.add_argument('--with-cache', action='store_true', help="Leave the cache on.")
+        parser.add_argument('--worker', action='store_true', help="Internal: run one scenario, print JSON.")
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.stdout.write(json.dumps(self._run(options)))
+            return
+        if connection.vendor != 'postgresql':
+            raise CommandError("DATABASE_URL must point at PostgreSQL for this comparison.")
+
+        self.stdout.write(
+            f"{options['path']}: {options['requests']} requests per scenario, "
+            f"{options['concurrency']} threads"
+        )
+        for name, overrides in SCENARIOS:
+            env = dict(os.environ, **overrides, **({} if options['with_cache'] else NO_CACHE))
+            args = [sys.executable, sys.argv[0], 'bench_db_connections', '--worker',
+                    '--requests', str(options['requests']), '--concurrency', str(options['concurrency']),
+                    '--path', options['path']]
+            result = subprocess.run(args, env=env, capture_output=True, text=True)
+            if result.returncode:
+                self.stdout.write(self.style.ERROR(f"  {name:<28} failed:\n{result.stderr.strip()}"))
+                continue
+            r = json.loads(result.stdout.strip().splitlines()[-1])
+            self.stdout.write(
+                f"  {name:<28} p50 {r['p50']:7.2f} ms   p99 {r['p99']:7.2f} ms   "
+                f"{r['rps']:7.1f} req/s   {r['connections']} connections opened"
+            )
+
+    def _run(self, options):
+        handler = WSGIHandler()
+        factory = RequestFactory(SERVER_NAME='localhost')
+        path, total, threads = options['path'], options['requests'], options['concurrency']
+
+        opened = []
+        connection_created.connect(lambda **kwargs: opened.append(1), weak=False)
+
+        def request():
+            environ = factory._base_environ(PATH_INFO=path, REQUEST_METHOD='GET')
+            started = time.perf_counter()
+            response = handler(environ, lambda status, headers: None)
+            b''.join(response)
+            response.close()    # request_finished: where CONN_MAX_AGE is applied
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code >= 400:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+            return elapsed
+
+        for _ in range(min(20, total)):
+            request()
+        opened.clear()
+
+        samples, lock = [], threading.Lock()
+
+        def worker(count):
+            mine = [request() for _ in range(count)]
+            with lock:
+                samples.extend(mine)
+
+        started = time.perf_counter()
+        pool = [threading.Thread(target=worker, args=(total // threads + (i < total % threads),))
+                for i in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        wall = time.perf_counter() - started
+
+        samples.sort()
+        return {
+            'p50': statistics.median(samples),
+            'p99': samples[int(0.99 * (len(samples) - 1))],
+            'rps': len(samples) / wall,
+            'connections': len(opened),
+        }
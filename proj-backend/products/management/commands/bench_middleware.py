@@ -0,0 +1,102 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+
+EMAIL = 'bench-middleware@cloudtech.invalid'
+
+# The stack before the sessionless API profile
+LEGACY_MIDDLEWARE = [
+    "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+LEGACY_AUTHENTICATION = [
+    "accounts.authentication.CachedJWTAuthentication",
+    "rest_framework.authentication.SessionAuthentication",
+]
+
+
+class Command(BaseCommand):
+    help = "Compare per-request middleware overhead on /api/ before and after the sessionless profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per scenario.")
+        parser.add_argument('--rounds', type=int, default=5,
+                            help="Alternating before/after rounds; the best median is reported.")
+        parser.add_argument('--path', default='/api/health', help="API path to request.")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=EMAIL).first() or User.objects.create_user(EMAIL, 'x' * 16)
+        token = str(AccessToken.for_user(user))
+
+        # A browser that has been in the admin sends its session cookie to the API too
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+
+        rest_framework = dict(settings.REST_FRAMEWORK, DEFAULT_AUTHENTICATION_CLASSES=LEGACY_AUTHENTICATION)
+        legacy = override_settings(
+            MIDDLEWARE=LEGACY_MIDDLEWARE,
+            SESSION_ENGINE='django.contrib.sessions.backends.db',
+            REST_FRAMEWORK=rest_framework,
+        )
+        scenarios = [
+            ('anonymous', {}),
+            ('jwt', {'HTTP_AUTHORIZATION': f'Bearer {token}'}),
+            ('jwt + session cookie', {
+                'HTTP_AUTHORIZATION': f'Bearer {token}',
+                'HTTP_COOKIE': f'{settings.SESSION_COOKIE_NAME}={session.session_key}',
+            }),
+        ]
+
+        self.stdout.write(f"{options['path']}, {options['requests']} requests per scenario (best median µs/request)")
+        try:
+            for name, headers in scenarios:
+                before, after = [], []
+                # Interleave so drift (CPU frequency, GC, caches) hits both sides alike
+                for _ in range(options['rounds']):
+                    with legacy:
+                        before.append(self._measure(options['path'], headers, options['requests']))
+                    after.append(self._measure(options['path'], headers, options['requests']))
+                before, after = min(before), min(after)
+                self.stdout.write(
+                    f"  {name:<22} before {before:8.1f}   after {after:8.1f}   saved {before - after:8.1f}"
+                )
+        finally:
+            session.delete()
+            user.delete()
+
+    def _measure(self, path, headers, total):
+        handler = BaseHandler()
+        handler.load_middleware()
+        factory = RequestFactory(SERVER_NAME='localhost')
+
+        for _ in range(min(100, total)):
+            handler.get_response(factory.get(path, **headers))
+
+        samples = []
+        for _ in range(total):
+            request = factory.get(path, **headers)
+            started = time.perf_counter()
+            response = handler.get_response(request)
+            samples.append((time.perf_counter() - started) * 1_000_000)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+        return statistics.median(samples)
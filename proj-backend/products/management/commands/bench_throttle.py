@@ -0,0 +1,70 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from rest_framework.request import Request
+
+from backend.throttling import TokenBucketThrottle, _redis_client, get_limiter
+
+BUDGET_US = 100
+
+
+class _View:
+    throttle_scope = 'bench'
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request cost of the token-bucket throttle (budget: 100 µs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+        parser.add_argument('--clients', type=int, default=1000, help="Distinct IPs / device ids.")
+
+    def handle(self, *args, **options):
+        total, clients = options['requests'], options['clients']
+        factory = RequestFactory()
+        requests = [
+            Request(factory.post('/api/contact/', REMOTE_ADDR=f'10.0.{i // 256}.{i % 256}',
+                                 HTTP_X_DEVICE_ID=f'device-{i}'))
+            for i in range(clients)
+        ]
+        for request in requests:
+            # Anonymous; skip running the authenticators
+            request._user, request._auth = AnonymousUser(), None
+
+        backend = 'redis' if _redis_client(get_limiter().cache) is not None else 'in-process'
+        self.stdout.write(f"{total} checks over {clients} clients, {backend} buckets")
+
+        rest_framework = dict(settings.REST_FRAMEWORK)
+        scenarios = [('allowed', '1000000/s'), ('throttled', '1/d')]
+        failed = False
+        for name, rate in scenarios:
+            rest_framework['DEFAULT_THROTTLE_RATES'] = {'bench': rate}
+            with override_settings(REST_FRAMEWORK=rest_framework):
+                samples = self._measure(requests, total)
+            p50 = statistics.median(samples)
+            p99 = samples[int(0.99 * len(samples))]
+            ok = p99 < BUDGET_US
+            failed = failed or not ok
+            self.stdout.write(
+                f"  {name:<10} mean {statistics.fmean(samples):6.1f} µs   p50 {p50:6.1f} µs   "
+                f"p99 {p99:6.1f} µs   {'OK' if ok else 'OVER BUDGET'}"
+            )
+        if failed:
+            self.stdout.write(self.style.ERROR(f"p99 above the {BUDGET_US} µs budget"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Within the {BUDGET_US} µs budget"))
+
+    def _measure(self, requests, total):
+        view = _View()
+        samples = []
+        for i in range(total):
+            request = requests[i % len(requests)]
+            started = time.perf_counter()
+            TokenBucketThrottle().allow_request(request, view)
+            samples.append((time.perf_counter() - started) * 1_000_000)
+        samples.sort()
+        return samples
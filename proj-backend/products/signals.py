@@ -0,0 +1,35 @@
+# products/signals.py
+"""
+Invalidate the cached catalog reads (products/cache.py) when anything they
+serialize changes: saves and deletes, including the per-row signals a
+queryset delete() sends, and edits to the many-to-many relations.
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .cache import invalidate_products
+from .models import Brand, Category, GlobalOption, Product, ProductImage, ProductVariant, Tag
+
+CATALOG_MODELS = (Product, ProductVariant, ProductImage, Category, Brand, Tag, GlobalOption)
+CATALOG_RELATIONS = (
+    Product.categories, Product.tags, Product.ram_options, Product.storage_options, Product.colors,
+)
+
+
+def catalog_changed(sender, **kwargs):
+    # After commit, so a read racing the write can't cache the old rows
+    # under the new version
+    transaction.on_commit(invalidate_products)
+
+
+def relation_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(invalidate_products)
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(catalog_changed, sender=model, dispatch_uid=f'products-cache-save-{model.__name__}')
+    post_delete.connect(catalog_changed, sender=model, dispatch_uid=f'products-cache-delete-{model.__name__}')
+for relation in CATALOG_RELATIONS:
+    m2m_changed.connect(relation_changed, sender=relation.through,
+                        dispatch_uid=f'products-cache-m2m-{relation.through.__name__}')
@@ -1,3 +1,130 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .async_views import product_detail, product_list
+from .models import Brand, GlobalOption, Product, ProductImage, Tag
+
+
+# ===================================================================
+# PRODUCT LIST CACHE (products/views.py, products/async_views.py)
+# ===================================================================
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ProductCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        brand = Brand.objects.create(name='Acme', slug='acme')
+        self.phone = Product.objects.create(title='Phone', brand=brand, price=100)
+        Product.objects.create(title='Laptop', brand=brand, price=900, is_featured=True)
+        self.client = APIClient()
+
+    def get_sync(self, path):
+        response = self.client.get(path)
+        return response.status_code, response.json()
+
+    def get_async(self, view, path, **kwargs):
+        response = async_to_sync(view)(AsyncRequestFactory().get(path), **kwargs)
+        return response.status_code, json.loads(response.content)
+
+    def test_sync_hit_runs_no_queries(self):
+        first = self.get_sync('/api/products/?ordering=price')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_sync('/api/products/?ordering=price'), first)
+
+    def test_async_reads_what_sync_cached(self):
+        expected = self.get_sync('/api/products/?ordering=-price')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_async(product_list, '/api/products/?ordering=-price'), expected)
+
+    def test_sync_reads_what_async_cached(self):
+        expected = self.get_async(product_list, '/api/products/?is_featured=true')
+        self.assertEqual(len(expected[1]), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_sync('/api/products/?is_featured=true'), expected)
+
+    def test_detail_cached_per_product(self):
+        path = f'/api/products/{self.phone.pk}/'
+        uncached = self.get_async(product_detail, path, pk=self.phone.pk)
+        self.assertEqual(uncached[1]['title'], 'Phone')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_sync(path), uncached)
+            self.assertEqual(self.get_async(product_detail, path, pk=self.phone.pk), uncached)
+
+    def test_detail_outside_the_cached_list(self):
+        self.get_sync('/api/products/?is_featured=true')
+        path = f'/api/products/{self.phone.pk}/?is_featured=true'
+        self.assertEqual(self.get_sync(path)[0], 404)
+        self.assertEqual(self.get_async(product_detail, path, pk=self.phone.pk)[0], 404)
+
+
+# ===================================================================
+# CATALOG CACHE INVALIDATION (products/cache.py, products/signals.py)
+# ===================================================================
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ProductCacheInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.brand = Brand.objects.create(name='Acme', slug='acme')
+        self.phone = Product.objects.create(title='Phone', brand=self.brand, price=100)
+        self.client = APIClient()
+        self.detail = f'/api/products/{self.phone.pk}/'
+
+    def titles(self):
+        return [row['title'] for row in self.client.get('/api/products/').json()]
+
+    def warm(self):
+        self.titles()
+        self.client.get(self.detail)
+        self.client.get('/api/products/featured/')
+
+    def test_update_through_the_api(self):
+        self.warm()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(self.detail, {'title': 'Phone 2'}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(), ['Phone 2'])
+        self.assertEqual(self.client.get(self.detail).json()['title'], 'Phone 2')
+
+    def test_create_and_delete(self):
+        self.warm()
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(title='Laptop', brand=self.brand, is_featured=True)
+        self.assertEqual(self.titles(), ['Laptop', 'Phone'])
+        self.assertEqual([row['title'] for row in self.client.get('/api/products/featured/').json()], ['Laptop'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.phone.pk).delete()
+        self.assertEqual(self.titles(), ['Laptop'])
+        self.assertEqual(self.client.get(self.detail).status_code, 404)
+
+    def test_related_rows(self):
+        self.warm()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.phone.tags.add(Tag.objects.create(name='5G', slug='5g'))
+        self.assertEqual([tag['name'] for tag in self.client.get(self.detail).json()['tags']], ['5G'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.phone.colors.add(GlobalOption.objects.create(type='COLOR', value='Black'))
+            ProductImage.objects.create(product=self.phone, alt_text='Front')
+        detail = self.client.get(self.detail).json()
+        self.assertEqual(len(detail['images']), 1)
+        self.assertEqual(len(detail['colors']), 1)
+
+        self.warm()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.brand.name = 'Acme Inc'
+            self.brand.save()
+        self.assertEqual(self.client.get(self.detail).json()['brand']['name'], 'Acme Inc')
+
+    def test_not_invalidated_before_commit(self):
+        self.warm()
+        with self.captureOnCommitCallbacks() as callbacks:
+            Product.objects.filter(pk=self.phone.pk).update(title='Renamed')
+            self.phone.refresh_from_db()
+            self.phone.save()
+            self.assertEqual(self.titles(), ['Phone'])
+        self.assertEqual(len(callbacks), 1)
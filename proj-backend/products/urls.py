@@ -1,4 +1,5 @@
 # products/urls.py
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
@@ -20,6 +21,23 @@ router.register(r'images', ProductImageViewSet, basename='image')
 router.register(r'brands', BrandViewSet, basename='brand')
 router.register(r'options', GlobalOptionViewSet, basename='option')  # 👈 new addition
 
-urlpatterns = [
+urlpatterns = []
+
+# Under backend.asgi catalog reads are served by the async views; listed
+# first, they take these URLs and pass writes on to the viewsets
+if settings.ASYNC_CATALOG_VIEWS:
+    from . import async_views
+    urlpatterns += [
+        path('products/', async_views.product_list, name='product-list'),
+        path('products/<uuid:pk>/', async_views.product_detail, name='product-detail'),
+        path('categories/', async_views.category_list, name='category-list'),
+        path('categories/<int:pk>/', async_views.category_detail, name='category-detail'),
+        path('brands/', async_views.brand_list, name='brand-list'),
+        path('brands/<int:pk>/', async_views.brand_detail, name='brand-detail'),
+        path('options/', async_views.option_list, name='option-list'),
+        path('options/<int:pk>/', async_views.option_detail, name='option-detail'),
+    ]
+
+urlpatterns += [
     path('', include(router.urls)),
 ]
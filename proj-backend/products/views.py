@@ -2,14 +2,14 @@
 from rest_framework import viewsets, permissions, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import FormParser
 from rest_framework import status
 from django_filters.rest_framework import DjangoFilterBackend
-from django.views.decorators.cache import cache_page
-from django.utils.decorators import method_decorator
 from django.core.cache import cache
-from django.db.models import Prefetch
 import traceback
+from backend.uploads import ImageMultiPartParser
+
+from .cache import PRODUCT_LIST_TTL, product_cache_key, product_detail_key, product_version
 
 from .models import (
     Product, ProductVariant, Category, Brand, ProductImage, GlobalOption
@@ -60,12 +60,44 @@ class AllowAll(permissions.BasePermission):
         return True
 
 
+# ==========================================================
+# PRODUCT QUERYSET — shared with the async read views
+# ==========================================================
+def product_queryset(params):
+    # Prefetch everything ProductListSerializer reads, so serializing runs no queries
+    queryset = Product.objects.select_related('brand').prefetch_related(
+        'tags',
+        'categories',
+        'ram_options',
+        'storage_options',
+        'colors',
+        'images',
+        'variants'
+    )
+
+    # Apply filters
+    category_slug = params.get('categories__slug')
+    brand_id = params.get('brand__id')
+    is_featured = params.get('is_featured')
+    is_active = params.get('is_active')
+
+    if category_slug:
+        queryset = queryset.filter(categories__slug=category_slug)
+    if brand_id:
+        queryset = queryset.filter(brand_id=brand_id)
+    if is_featured is not None:
+        queryset = queryset.filter(is_featured=(is_featured.lower() == 'true'))
+    if is_active is not None:
+        queryset = queryset.filter(is_active=(is_active.lower() == 'true'))
+    return queryset
+
+
 # ==========================================================
 # PRODUCT VIEWSET — FULLY OPTIMIZED
 # ==========================================================
 class ProductViewSet(viewsets.ModelViewSet):
     permission_classes = [AllowAll]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [ImageMultiPartParser, FormParser]
 
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['brand__id', 'categories__id', 'categories__slug', 'is_active', 'is_featured']
@@ -84,42 +116,26 @@ class ProductViewSet(viewsets.ModelViewSet):
         return super().get_serializer(*args, **kwargs)
 
     def get_queryset(self):
-        # Build cache key from sorted query params to avoid hash issues
-        query_params_tuple = tuple(sorted(self.request.query_params.items()))
-        cache_key = f"products_all_{hash(query_params_tuple)}"
-        cached_qs = cache.get(cache_key)
-        if cached_qs is not None:
-            return cached_qs
-
-        # Prefetch related objects for efficiency
-        queryset = Product.objects.select_related('brand').prefetch_related(
-            'tags',
-            'categories',
-            'ram_options',
-            'storage_options',
-            'colors',
-            Prefetch('images', queryset=ProductImage.objects.filter(is_primary=True), to_attr='primary_image_list'),
-            Prefetch('images', queryset=ProductImage.objects.filter(is_primary=False), to_attr='gallery_images_list'),
-            'variants'
-        )
-
-        # Apply filters
-        category_slug = self.request.query_params.get('categories__slug')
-        brand_id = self.request.query_params.get('brand__id')
-        is_featured = self.request.query_params.get('is_featured')
-        is_active = self.request.query_params.get('is_active')
-
-        if category_slug:
-            queryset = queryset.filter(categories__slug=category_slug)
-        if brand_id:
-            queryset = queryset.filter(brand_id=brand_id)
-        if is_featured is not None:
-            queryset = queryset.filter(is_featured=(is_featured.lower() == 'true'))
-        if is_active is not None:
-            queryset = queryset.filter(is_active=(is_active.lower() == 'true'))
-
-        cache.set(cache_key, queryset, timeout=60 * 5)
-        return queryset
+        return product_queryset(self.request.query_params)
+
+    # List and detail entries hold the final rows, prefetches included, so a
+    # hit runs no queries; products/cache.py versions them
+    def list(self, request, *args, **kwargs):
+        # Single-flight: one request rebuilds an expired entry, the rest reuse it
+        key = product_cache_key(request.query_params, product_version())
+        rows = cache.get_or_set(key, self._build_rows, timeout=PRODUCT_LIST_TTL)
+        return Response(self.get_serializer(rows, many=True).data)
+
+    def _build_rows(self):
+        # Evaluated here so the measured build time, which drives early
+        # refresh, includes the queries
+        return list(self.filter_queryset(self.get_queryset()))
+
+    def retrieve(self, request, *args, **kwargs):
+        # get_object() raises Http404 for a missing product, which isn't cached
+        key = product_detail_key(kwargs['pk'], request.query_params, product_version())
+        product = cache.get_or_set(key, self.get_object, timeout=PRODUCT_LIST_TTL)
+        return Response(self.get_serializer(product).data)
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -130,10 +146,11 @@ class ProductViewSet(viewsets.ModelViewSet):
     # FEATURED PRODUCTS
     # ==========================================================
     @action(detail=False, methods=['get'], url_path='featured')
-    @method_decorator(cache_page(60 * 5))
     def featured(self, request):
-        queryset = self.get_queryset().filter(is_featured=True)[:12]
-        serializer = ProductListSerializer(queryset, many=True, context=self.get_serializer_context())
+        key = product_cache_key(request.query_params, product_version(), listing='featured')
+        rows = cache.get_or_set(key, lambda: list(self.get_queryset().filter(is_featured=True)[:12]),
+                                timeout=PRODUCT_LIST_TTL)
+        serializer = ProductListSerializer(rows, many=True, context=self.get_serializer_context())
         return Response(serializer.data)
 
     # ==========================================================
@@ -162,7 +179,7 @@ class ProductVariantViewSet(viewsets.ModelViewSet):
     queryset = ProductVariant.objects.select_related('product__brand').all()
     serializer_class = ProductVariantSerializer
     permission_classes = [AllowAll]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [ImageMultiPartParser, FormParser]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['product__id', 'color', 'storage', 'ram', 'processor']
     search_fields = ['sku', 'processor', 'product__title']
@@ -197,6 +214,6 @@ class ProductImageViewSet(viewsets.ModelViewSet):
     queryset = ProductImage.objects.select_related('product').all()
     serializer_class = ProductImageSerializer
     permission_classes = [AllowAll]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [ImageMultiPartParser, FormParser]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['product__id']
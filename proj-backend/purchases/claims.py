@@ -0,0 +1,37 @@
+# purchases/claims.py
+"""
+Guest order claiming.
+
+Guests' orders carry only the device id the frontend sends as X-Device-ID.
+When that guest logs in or registers, every still-unowned order for the
+device they are logging in from is moved onto their account in one UPDATE,
+so from then on their history is a plain `user=` lookup.
+
+Only the requesting device's own header is claimed: the id is the guest's
+only proof of ownership, and ids named in a request body would let anyone
+take over other guests' orders.
+"""
+from .models import Order
+
+
+def device_ids_from(meta):
+    """The requesting device's X-Device-ID, as a list (empty without one)."""
+    header = meta.get('HTTP_X_DEVICE_ID', '').strip()
+    return [header] if header else []
+
+
+def _unclaimed(device_ids):
+    return Order.objects.filter(user__isnull=True, device_id__in=device_ids)
+
+
+def claim_guest_orders(user, device_ids):
+    """Assign unowned orders for device_ids to user. Returns how many were claimed."""
+    if not device_ids:
+        return 0
+    return _unclaimed(device_ids).update(user=user)
+
+
+async def aclaim_guest_orders(user, device_ids):
+    if not device_ids:
+        return 0
+    return await _unclaimed(device_ids).aupdate(user=user)
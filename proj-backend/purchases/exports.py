@@ -0,0 +1,117 @@
+# purchases/exports.py
+"""
+Streaming order exports (CSV / NDJSON).
+
+Orders are read in keyset batches on (date, id) and each batch's items
+are fetched with one query, so memory stays flat no matter how many rows
+are exported. Plain LIMIT queries rather than a server-side cursor: the
+cursor would not survive a transaction-mode pooler such as Neon's.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from .models import Order, OrderItem
+from .reports import day_bounds
+
+ORDER_COLUMNS = [
+    'id', 'date', 'status', 'user_id', 'device_id', 'name', 'phone', 'address',
+    'city', 'payment', 'mpesa_code', 'cash_amount', 'change', 'subtotal',
+    'shipping', 'total',
+]
+ITEM_COLUMNS = ['product_id', 'title', 'price', 'quantity']
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def filter_orders(start=None, end=None, statuses=None):
+    queryset = Order.objects.all()
+    if start or end:
+        lower, upper = day_bounds(start or end, end or start)
+        if start:
+            queryset = queryset.filter(date__gte=lower)
+        if end:
+            queryset = queryset.filter(date__lt=upper)
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    return queryset.order_by('date', 'id')
+
+
+def iter_orders(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield (order_row, [item_rows]), two queries per chunk of orders.
+
+    queryset must be ordered by ('date', 'id'), as filter_orders() returns it.
+    """
+    rows = queryset.values(*ORDER_COLUMNS)
+    batch = list(rows[:chunk_size])
+    while batch:
+        yield from _with_items(batch)
+        if len(batch) < chunk_size:
+            break
+        last = batch[-1]
+        batch = list(rows.filter(
+            Q(date__gt=last['date']) | Q(date=last['date'], id__gt=last['id'])
+        )[:chunk_size])
+
+
+def _with_items(batch):
+    items = {}
+    rows = (
+        OrderItem.objects.filter(order_id__in=[row['id'] for row in batch])
+        .order_by('order_id', 'id')
+        .values('order_id', *ITEM_COLUMNS)
+    )
+    for item in rows:
+        items.setdefault(item.pop('order_id'), []).append(item)
+    for row in batch:
+        yield row, items.get(row['id'], [])
+
+
+# ===================================================================
+# WRITERS
+# ===================================================================
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """One line per order item; orders without items get a single bare line."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(ORDER_COLUMNS + [f'item_{col}' for col in ITEM_COLUMNS])
+    empty = [''] * len(ITEM_COLUMNS)
+    for order, items in iter_orders(queryset, chunk_size):
+        head = [_csv_value(order[col]) for col in ORDER_COLUMNS]
+        if not items:
+            yield writer.writerow(head + empty)
+        for item in items:
+            yield writer.writerow(head + [_csv_value(item[col]) for col in ITEM_COLUMNS])
+
+
+def stream_ndjson(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """One JSON object per order, items nested."""
+    for order, items in iter_orders(queryset, chunk_size):
+        order['items'] = items
+        yield json.dumps(order, cls=DjangoJSONEncoder) + '\n'
+
+
+def stream_export(queryset, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    if fmt == 'ndjson':
+        return stream_ndjson(queryset, chunk_size)
+    return stream_csv(queryset, chunk_size)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
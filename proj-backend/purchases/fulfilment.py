@@ -0,0 +1,70 @@
+# purchases/fulfilment.py
+"""
+Bulk order status transitions for dispatch staff.
+
+Each group of orders sharing a current status is moved with a single
+UPDATE ... WHERE id IN (...) AND status = <expected>, and the transitions
+are recorded with one bulk insert.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Order, OrderStatusTransition
+from .reports import counts_as_sale, record_status_change
+
+UPDATED = 'updated'
+NOT_FOUND = 'not_found'
+INVALID = 'invalid_transition'
+CONFLICT = 'conflict'
+
+
+@transaction.atomic
+def bulk_transition(ids, to_status, from_status=None, user=None):
+    """
+    Move orders to `to_status`. If `from_status` is given only orders
+    currently in that status are moved. Returns {order_id: outcome}.
+    """
+    ids = list(dict.fromkeys(ids))
+    current = dict(
+        Order.objects.select_for_update()
+        .filter(id__in=ids)
+        .values_list('id', 'status')
+    )
+
+    outcomes = {}
+    groups = defaultdict(list)
+    for order_id in ids:
+        status = current.get(order_id)
+        if status is None:
+            outcomes[order_id] = {'result': NOT_FOUND}
+        elif from_status and status != from_status:
+            outcomes[order_id] = {'result': CONFLICT, 'status': status}
+        elif not Order.can_transition(status, to_status):
+            outcomes[order_id] = {'result': INVALID, 'status': status}
+        else:
+            groups[status].append(order_id)
+
+    now = timezone.now()
+    transitions = []
+    flipped = {}
+    for expected, group in groups.items():
+        Order.objects.filter(id__in=group, status=expected).update(status=to_status)
+        for order_id in group:
+            outcomes[order_id] = {'result': UPDATED, 'status': to_status, 'previous': expected}
+            transitions.append(OrderStatusTransition(
+                order_id=order_id, from_status=expected, to_status=to_status,
+                changed_at=now, changed_by=user,
+            ))
+        if counts_as_sale(expected) != counts_as_sale(to_status):
+            flipped.update(dict.fromkeys(group, expected))
+
+    OrderStatusTransition.objects.bulk_create(transitions, batch_size=500)
+
+    # Only cancellations touch the sales rollups
+    if flipped:
+        for order in Order.objects.filter(id__in=flipped).prefetch_related('items'):
+            record_status_change(order, flipped[order.id])
+
+    return {order_id: outcomes[order_id] for order_id in ids}
@@ -0,0 +1,127 @@
+# purchases/idempotency.py
+"""
+Idempotent order submission.
+
+A retried POST /api/orders/ carrying the same Idempotency-Key (or, without a
+key, the same X-Device-ID + payload) replays the first successful response
+from the cache instead of creating a second order. A duplicate that arrives
+while the first is still running gets 409 and retries; it doesn't hold a
+worker waiting.
+
+Keys are scoped to the user, or for guests to their X-Device-ID, so two
+clients that happen to pick the same key never see each other's order.
+A guest's explicit key without X-Device-ID is refused.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+RESULT_TTL = 60 * 60 * 24   # explicit keys: keep replayable responses for a day
+DERIVED_RESULT_TTL = 60 * 10  # device+payload keys: only absorb short retry bursts
+LOCK_TTL = 30               # upper bound on how long one submission may run
+RETRY_AFTER = 1             # seconds a duplicate is told to wait before retrying
+
+KEY_PREFIX = 'idem:order:'
+
+
+def _digest(*parts):
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def fingerprint(data):
+    if hasattr(data, 'lists'):  # QueryDict from form posts
+        data = dict(data.lists())
+    return _digest(json.dumps(data, sort_keys=True, default=str))
+
+
+class MissingScope(Exception):
+    """A guest sent an Idempotency-Key without an X-Device-ID to scope it."""
+
+
+def resolve_key(request, payload_hash):
+    """
+    Explicit Idempotency-Key header wins; otherwise fall back to a hash of
+    X-Device-ID + payload. Keys are scoped per user, or per device for
+    guests, so they can't collide. Returns (cache_key, ttl), or (None, None)
+    when the request can't be keyed; raises MissingScope for a guest's
+    explicit key without a device.
+    """
+    device_id = request.META.get('HTTP_X_DEVICE_ID', '').strip()
+    if request.user.is_authenticated:
+        scope = f'user:{request.user.pk}'
+    elif device_id:
+        scope = f'device:{device_id}'
+    else:
+        scope = None
+
+    explicit = request.META.get('HTTP_IDEMPOTENCY_KEY', '').strip()
+    if explicit:
+        if scope is None:
+            raise MissingScope
+        return KEY_PREFIX + _digest(scope, 'key', explicit), RESULT_TTL
+
+    if device_id:
+        # Short TTL: the same cart may legitimately be ordered again later
+        return KEY_PREFIX + _digest(scope, 'device', device_id, payload_hash), DERIVED_RESULT_TTL
+    return None, None
+
+
+def _replay(stored, payload_hash):
+    if stored['fingerprint'] != payload_hash:
+        return Response(
+            {"error": "Idempotency-Key was already used with a different payload"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    response = Response(stored['data'], status=stored['status'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def run_once(request, execute):
+    """
+    Run execute() at most once per idempotency key and return its response;
+    duplicates get the stored response back.
+    """
+    payload_hash = fingerprint(request.data)
+    try:
+        result_key, ttl = resolve_key(request, payload_hash)
+    except MissingScope:
+        return Response(
+            {"error": "Guests must send X-Device-ID with an Idempotency-Key"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if result_key is None:
+        return execute()
+
+    stored = cache.get(result_key)
+    if stored is not None:
+        return _replay(stored, payload_hash)
+
+    # cache.add is atomic: only one request wins the right to execute
+    lock_key = result_key + ':lock'
+    if not cache.add(lock_key, 1, LOCK_TTL):
+        # Another worker may have finished between the get and the add
+        stored = cache.get(result_key)
+        if stored is not None:
+            return _replay(stored, payload_hash)
+        response = Response(
+            {"error": "A request with this Idempotency-Key is still in progress"},
+            status=status.HTTP_409_CONFLICT
+        )
+        response['Retry-After'] = str(RETRY_AFTER)
+        return response
+
+    try:
+        response = execute()
+        if status.is_success(response.status_code):
+            cache.set(result_key, {
+                'fingerprint': payload_hash,
+                'status': response.status_code,
+                'data': dict(response.data),
+            }, ttl)
+        return response
+    finally:
+        cache.delete(lock_key)
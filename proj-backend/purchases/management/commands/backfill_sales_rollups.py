@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from purchases.reports import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild daily sales rollups from existing orders (Africa/Nairobi days)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First day to rebuild (YYYY-MM-DD). Default: first order.")
+        parser.add_argument('--end', help="Last day to rebuild (YYYY-MM-DD). Default: today.")
+
+    def handle(self, *args, **options):
+        start = self._day(options.get('start'))
+        end = self._day(options.get('end'))
+        if start and end and start > end:
+            raise CommandError("--start must be on or before --end")
+
+        days = rebuild(start=start, end=end)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt sales rollups for {days} day(s)."))
+
+    def _day(self, value):
+        if not value:
+            return None
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Invalid date: {value}")
+        return day
@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+TABLE = 'bench_money_aggregation'
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare SUM/GROUP BY speed (and on Postgres, row size) of numeric(20,6) "
+        "money against BIGINT minor units, using a throwaway table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000)
+        parser.add_argument('--repeat', type=int, default=7)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        postgres = connection.vendor == 'postgresql'
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            cursor.execute(
+                f"CREATE TABLE {TABLE} ("
+                " day_bucket integer NOT NULL,"
+                " amount_numeric numeric(20, 6) NOT NULL,"
+                " amount_minor bigint NOT NULL)"
+            )
+            self._populate(cursor, rows, postgres)
+
+            self.stdout.write(f"{rows:,} rows on {connection.vendor}, best/median of {repeat}:")
+            for label, column in (("numeric(20,6)", "amount_numeric"), ("bigint cents", "amount_minor")):
+                total = self._time(cursor, f"SELECT SUM({column}) FROM {TABLE}", repeat)
+                grouped = self._time(
+                    cursor,
+                    f"SELECT day_bucket, SUM({column}) FROM {TABLE} GROUP BY day_bucket",
+                    repeat,
+                )
+                line = f"  {label:<14} SUM {total}   GROUP BY day {grouped}"
+                if postgres:
+                    cursor.execute(f"SELECT AVG(pg_column_size({column})) FROM {TABLE}")
+                    line += f"   avg column bytes {cursor.fetchone()[0]:.1f}"
+                self.stdout.write(line)
+
+            cursor.execute(f"DROP TABLE {TABLE}")
+
+    def _populate(self, cursor, rows, postgres):
+        if postgres:
+            cursor.execute(
+                f"INSERT INTO {TABLE} "
+                "SELECT g % 365, round((random() * 250000)::numeric, 2), 0 "
+                "FROM generate_series(1, %s) AS g",
+                [rows],
+            )
+            cursor.execute(f"UPDATE {TABLE} SET amount_minor = (amount_numeric * 100)::bigint")
+            cursor.execute(f"ANALYZE {TABLE}")
+            return
+
+        batch = []
+        for i in range(rows):
+            cents = random.randint(0, 25_000_000)
+            batch.append((i % 365, f"{cents / 100:.2f}", cents))
+            if len(batch) == 5000:
+                cursor.executemany(f"INSERT INTO {TABLE} VALUES (%s, %s, %s)", batch)
+                batch = []
+        if batch:
+            cursor.executemany(f"INSERT INTO {TABLE} VALUES (%s, %s, %s)", batch)
+
+    def _time(self, cursor, sql, repeat):
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(sql)
+            cursor.fetchall()
+            samples.append((time.perf_counter() - start) * 1000)
+        return f"{min(samples):7.2f}/{statistics.median(samples):7.2f} ms"
@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from purchases.exports import (
+    DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, filter_orders, stream_export
+)
+
+
+class Command(BaseCommand):
+    help = "Stream all orders (with items) to CSV or NDJSON without loading them into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='fmt', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help="File to write. Default: stdout.")
+        parser.add_argument('--start', help="First order day (YYYY-MM-DD, Africa/Nairobi).")
+        parser.add_argument('--end', help="Last order day (YYYY-MM-DD, Africa/Nairobi).")
+        parser.add_argument('--status', action='append', default=[],
+                            help="Only export orders in this status (repeatable).")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = filter_orders(
+            start=self._day(options['start']),
+            end=self._day(options['end']),
+            statuses=options['status'],
+        )
+        chunks = stream_export(queryset, options['fmt'], chunk_size=options['chunk_size'])
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as fh:
+                fh.writelines(chunks)
+            self.stderr.write(self.style.SUCCESS(f"Exported orders to {options['output']}"))
+        else:
+            sys.stdout.writelines(chunks)
+
+    def _day(self, value):
+        if not value:
+            return None
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Invalid date: {value}")
+        return day
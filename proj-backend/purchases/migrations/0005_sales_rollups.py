@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchases', '0004_order_device_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('orders', models.IntegerField(default=0)),
+                ('units', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=6, default=0, max_digits=20)),
+            ],
+            options={
+                'ordering': ['day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyPaymentSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('payment', models.CharField(choices=[('paybill', 'M-Pesa Paybill'), ('withdraw', 'Withdraw Agent'), ('cod', 'Cash on Delivery')], max_length=20)),
+                ('orders', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=6, default=0, max_digits=20)),
+            ],
+            options={
+                'ordering': ['day', 'payment'],
+                'unique_together': {('day', 'payment')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('product_id', models.CharField(max_length=100)),
+                ('title', models.CharField(max_length=200)),
+                ('units', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=6, default=0, max_digits=20)),
+            ],
+            options={
+                'ordering': ['day', 'product_id'],
+                'unique_together': {('day', 'product_id')},
+            },
+        ),
+    ]
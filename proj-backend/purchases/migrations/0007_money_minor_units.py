@@ -0,0 +1,112 @@
+# Converts order money columns from numeric(20, 6) to integer minor units.
+#
+# New BIGINT columns are added alongside the old ones, filled in primary-key
+# chunks (so large tables are never loaded at once), then swapped in.
+
+from django.db import migrations, models
+
+import purchases.money
+
+CHUNK_SIZE = 2000
+
+# (model, field, default)
+MONEY_FIELDS = [
+    ('order', 'cash_amount', 0),
+    ('order', 'change', 0),
+    ('order', 'subtotal', None),
+    ('order', 'shipping', None),
+    ('order', 'total', None),
+    ('orderitem', 'price', None),
+    ('dailysales', 'revenue', 0),
+    ('dailypaymentsales', 'revenue', 0),
+    ('dailyproductsales', 'revenue', 0),
+]
+
+
+def _fields_by_model():
+    grouped = {}
+    for model_name, field, _ in MONEY_FIELDS:
+        grouped.setdefault(model_name, []).append(field)
+    return grouped
+
+
+def _copy(apps, source, target):
+    """Copy each money field between `<field><source>` and `<field><target>` in pk chunks."""
+    for model_name, fields in _fields_by_model().items():
+        model = apps.get_model('purchases', model_name)
+        src = [f"{f}{source}" for f in fields]
+        dst = [f"{f}{target}" for f in fields]
+        last_pk = None
+        while True:
+            qs = model.objects.order_by('pk')
+            if last_pk is not None:
+                qs = qs.filter(pk__gt=last_pk)
+            chunk = list(qs.only('pk', *src)[:CHUNK_SIZE])
+            if not chunk:
+                break
+            for obj in chunk:
+                for s, d in zip(src, dst):
+                    # Decimal in, the target field converts on save
+                    setattr(obj, d, getattr(obj, s) or 0)
+            model.objects.bulk_update(chunk, dst, batch_size=500)
+            last_pk = chunk[-1].pk
+
+
+def forwards(apps, schema_editor):
+    _copy(apps, source='', target='_minor')
+
+
+def backwards(apps, schema_editor):
+    _copy(apps, source='_minor', target='')
+
+
+def _money(default):
+    if default is None:
+        return purchases.money.MoneyField()
+    return purchases.money.MoneyField(default=default)
+
+
+def _numeric(default, null=False):
+    kwargs = {'max_digits': 20, 'decimal_places': 6, 'null': null}
+    if default is not None:
+        kwargs['default'] = default
+    return models.DecimalField(**kwargs)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchases', '0006_order_status_transitions'),
+    ]
+
+    operations = (
+        [
+            migrations.AddField(
+                model_name=model_name,
+                name=f'{field}_minor',
+                field=purchases.money.MoneyField(null=True),
+            )
+            for model_name, field, _ in MONEY_FIELDS
+        ]
+        # Old columns become nullable before the copy so that, when reversed,
+        # they are re-added nullable, refilled, and only then made NOT NULL
+        + [
+            migrations.AlterField(
+                model_name=model_name, name=field, field=_numeric(default, null=True),
+            )
+            for model_name, field, default in MONEY_FIELDS
+        ]
+        + [migrations.RunPython(forwards, backwards)]
+        + [
+            migrations.RemoveField(model_name=model_name, name=field)
+            for model_name, field, _ in MONEY_FIELDS
+        ]
+        + [
+            migrations.RenameField(model_name=model_name, old_name=f'{field}_minor', new_name=field)
+            for model_name, field, _ in MONEY_FIELDS
+        ]
+        + [
+            migrations.AlterField(model_name=model_name, name=field, field=_money(default))
+            for model_name, field, default in MONEY_FIELDS
+        ]
+    )
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchases', '0007_money_minor_units'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-date'], name='order_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('user__isnull', True)), fields=['device_id', '-date'], name='order_guest_device_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+from .money import MoneyField
 
 
 class Order(models.Model):
@@ -9,6 +11,11 @@ class Order(models.Model):
         ('cod', 'Cash on Delivery'),
     ]
 
+    # Fulfilment pipeline, in order (matches the admin dashboard steps)
+    STATUS_FLOW = ['confirmed', 'received', 'processing', 'packaging', 'dispatched', 'delivered']
+    CANCELLED = 'cancelled'
+    STATUSES = STATUS_FLOW + [CANCELLED]
+
     id = models.CharField(primary_key=True, max_length=30)
 
     # ✅ Optional user field (Zero Knowledge — no login required)
@@ -30,32 +37,120 @@ class Order(models.Model):
     payment = models.CharField(max_length=20, choices=PAYMENT_CHOICES)
     mpesa_code = models.CharField(max_length=50, blank=True, null=True)
 
-    # 💰 Money fields with high precision and wide range
-    cash_amount = models.DecimalField(max_digits=20, decimal_places=6, default=0)
-    change = models.DecimalField(max_digits=20, decimal_places=6, default=0)
-    subtotal = models.DecimalField(max_digits=20, decimal_places=6)
-    shipping = models.DecimalField(max_digits=20, decimal_places=6)
-    total = models.DecimalField(max_digits=20, decimal_places=6)
+    # 💰 Money fields — stored as integer cents, exposed as Decimal
+    cash_amount = MoneyField(default=0)
+    change = MoneyField(default=0)
+    subtotal = MoneyField()
+    shipping = MoneyField()
+    total = MoneyField()
 
     # 🚚 Order meta
     status = models.CharField(max_length=30, default='confirmed')
     date = models.DateTimeField(auto_now_add=True)
 
     device_id = models.CharField(max_length=100, blank=True, null=True, db_index=True)
-    
+
+    class Meta:
+        indexes = [
+            # 📜 Order history: WHERE user_id = ? ORDER BY date DESC
+            models.Index(fields=['user', '-date'], name='order_user_date_idx'),
+            # 🧾 Guest orders still waiting to be claimed (purchases/claims.py)
+            models.Index(fields=['device_id', '-date'], condition=models.Q(user__isnull=True),
+                         name='order_guest_device_idx'),
+        ]
 
     def __str__(self):
         return f"{self.id} - {self.name}"
 
+    @classmethod
+    def can_transition(cls, old, new):
+        """
+        Orders only move forward through STATUS_FLOW (steps may be skipped);
+        anything not yet delivered can be cancelled.
+        """
+        if old == new or new not in cls.STATUSES:
+            return False
+        if new == cls.CANCELLED:
+            return old != 'delivered'
+        if old not in cls.STATUS_FLOW:
+            return False
+        return cls.STATUS_FLOW.index(new) > cls.STATUS_FLOW.index(old)
+
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     product_id = models.CharField(max_length=100)
     title = models.CharField(max_length=200)
 
-    # 💰 Support large prices and high precision
-    price = models.DecimalField(max_digits=20, decimal_places=6)
+    # 💰 Integer cents, exposed as Decimal
+    price = MoneyField()
     quantity = models.IntegerField()
 
     def __str__(self):
         return f"{self.title} × {self.quantity}"
+
+
+class OrderStatusTransition(models.Model):
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='transitions')
+    from_status = models.CharField(max_length=30)
+    to_status = models.CharField(max_length=30)
+    changed_at = models.DateTimeField(default=timezone.now)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name='order_transitions',
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        ordering = ['changed_at']
+        indexes = [models.Index(fields=['order', 'changed_at'])]
+
+    def __str__(self):
+        return f"{self.order_id}: {self.from_status} → {self.to_status}"
+
+
+# ===================================================================
+# DAILY SALES ROLLUPS (Africa/Nairobi days — see purchases/reports.py)
+# ===================================================================
+class DailySales(models.Model):
+    day = models.DateField(unique=True)
+    orders = models.IntegerField(default=0)
+    units = models.IntegerField(default=0)
+    revenue = MoneyField(default=0)
+
+    class Meta:
+        ordering = ['day']
+
+    def __str__(self):
+        return f"{self.day}: {self.orders} orders"
+
+
+class DailyPaymentSales(models.Model):
+    day = models.DateField()
+    payment = models.CharField(max_length=20, choices=Order.PAYMENT_CHOICES)
+    orders = models.IntegerField(default=0)
+    revenue = MoneyField(default=0)
+
+    class Meta:
+        ordering = ['day', 'payment']
+        unique_together = ('day', 'payment')
+
+    def __str__(self):
+        return f"{self.day} {self.payment}: {self.orders} orders"
+
+
+class DailyProductSales(models.Model):
+    day = models.DateField()
+    product_id = models.CharField(max_length=100)
+    title = models.CharField(max_length=200)
+    units = models.IntegerField(default=0)
+    revenue = MoneyField(default=0)
+
+    class Meta:
+        ordering = ['day', 'product_id']
+        unique_together = ('day', 'product_id')
+
+    def __str__(self):
+        return f"{self.day} {self.title}: {self.units} units"
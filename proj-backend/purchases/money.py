@@ -0,0 +1,59 @@
+# purchases/money.py
+"""
+Money stored as integer minor units (KES cents) in a BIGINT column.
+
+Python code and the API keep seeing Decimal amounts; conversion to and from
+cents happens at the database boundary, so SUM()/comparisons run on plain
+integers instead of Postgres numeric.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils.functional import cached_property
+
+MINOR_UNITS = 100
+CENT = Decimal('0.01')
+
+
+def to_minor(amount):
+    """Decimal/int/float/str amount → int cents (half-up)."""
+    return int((Decimal(str(amount)) * MINOR_UNITS).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_minor(cents):
+    """int cents → Decimal amount with 2 decimal places."""
+    return (Decimal(int(cents)) / MINOR_UNITS).quantize(CENT)
+
+
+class MoneyField(models.BigIntegerField):
+    description = "Amount stored as integer minor units"
+
+    @cached_property
+    def validators(self):
+        # BigIntegerField adds the column's range, which is in cents, not amounts
+        return [*self.default_validators, *self._validators]
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return from_minor(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, Decimal):
+            return value
+        try:
+            return Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP)
+        except (InvalidOperation, ValueError):
+            raise ValidationError(
+                self.error_messages['invalid'], code='invalid', params={'value': value}
+            )
+
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        if value is None:
+            return None
+        try:
+            return to_minor(value)
+        except (InvalidOperation, ValueError, TypeError) as e:
+            raise e.__class__(f"Field '{self.name}' expected a money amount but got {value!r}.") from e
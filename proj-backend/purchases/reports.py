@@ -0,0 +1,223 @@
+# purchases/reports.py
+"""
+Daily sales rollups.
+
+Orders are folded into per-day counters when they are created, edited or
+deleted, so the reporting endpoint only ever reads a handful of rollup rows
+instead of aggregating over every Order/OrderItem. An edit takes the
+order's previous contribution out and adds the new one.
+"""
+from collections import defaultdict, namedtuple
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from django.db import transaction
+from django.db.models import F, Value, Sum, Count, Max, ExpressionWrapper
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import (
+    Order, OrderItem, DailySales, DailyPaymentSales, DailyProductSales
+)
+from .money import MoneyField
+
+# Business days are counted on Nairobi wall-clock time
+REPORT_TZ = ZoneInfo('Africa/Nairobi')
+
+# Orders in these states are not counted as sales
+NON_REVENUE_STATUSES = {Order.CANCELLED}
+
+
+def counts_as_sale(status):
+    return (status or '').lower() not in NON_REVENUE_STATUSES
+
+
+def order_day(order):
+    return timezone.localtime(order.date, REPORT_TZ).date()
+
+
+def day_bounds(start, end):
+    """Aware [start 00:00, end+1 00:00) range for Nairobi calendar days."""
+    lower = datetime.combine(start, time.min, tzinfo=REPORT_TZ)
+    upper = datetime.combine(end + timedelta(days=1), time.min, tzinfo=REPORT_TZ)
+    return lower, upper
+
+
+def _bump(model, lookup, defaults=None, **deltas):
+    obj, _ = model.objects.get_or_create(**lookup, defaults=defaults or {})
+    # Value() carries the model field so money deltas are converted to cents
+    model.objects.filter(pk=obj.pk).update(**{
+        field: F(field) + Value(value, output_field=model._meta.get_field(field))
+        for field, value in deltas.items()
+    })
+
+
+# ===================================================================
+# INCREMENTAL UPDATES
+# ===================================================================
+# What an order adds to the rollups; items are (product_id, title, quantity, price)
+Contribution = namedtuple('Contribution', 'status day payment total items')
+
+
+def contribution(order):
+    """Snapshot of the order's rollup-relevant fields. Take it before editing the order."""
+    return Contribution(
+        status=order.status,
+        day=order_day(order),
+        payment=order.payment,
+        total=Decimal(order.total or 0),
+        items=tuple(
+            (item.product_id, item.title, item.quantity, Decimal(item.price))
+            for item in order.items.all()
+        ),
+    )
+
+
+@transaction.atomic
+def _apply(c, sign):
+    units = sum(quantity for _, _, quantity, _ in c.items)
+    _bump(DailySales, {'day': c.day},
+          orders=sign, units=sign * units, revenue=sign * c.total)
+    _bump(DailyPaymentSales, {'day': c.day, 'payment': c.payment},
+          orders=sign, revenue=sign * c.total)
+    for product_id, title, quantity, price in c.items:
+        _bump(DailyProductSales, {'day': c.day, 'product_id': product_id},
+              defaults={'title': title},
+              units=sign * quantity,
+              revenue=sign * price * quantity)
+
+
+def apply_order(order, sign=1):
+    """Add (sign=1) or remove (sign=-1) an order from the rollups."""
+    _apply(contribution(order), sign)
+
+
+def record_new_order(order):
+    if counts_as_sale(order.status):
+        apply_order(order, sign=1)
+
+
+@transaction.atomic
+def record_order_update(before, order):
+    """Re-apply an edited order: `before` is contribution() taken before the edit."""
+    after = contribution(order)
+    if after == before:
+        return
+    if counts_as_sale(before.status):
+        _apply(before, -1)
+    if counts_as_sale(after.status):
+        _apply(after, 1)
+
+
+def record_status_change(order, old_status):
+    was, now = counts_as_sale(old_status), counts_as_sale(order.status)
+    if was and not now:
+        apply_order(order, sign=-1)
+    elif now and not was:
+        apply_order(order, sign=1)
+
+
+def record_deleted_order(order):
+    if counts_as_sale(order.status):
+        apply_order(order, sign=-1)
+
+
+# ===================================================================
+# BACKFILL
+# ===================================================================
+def _first_order_day():
+    first = Order.objects.order_by('date').values_list('date', flat=True).first()
+    return timezone.localtime(first, REPORT_TZ).date() if first else timezone.localdate()
+
+
+@transaction.atomic
+def rebuild(start=None, end=None):
+    """Recompute rollups from raw orders, optionally for a day range only."""
+    orders = Order.objects.exclude(status__in=NON_REVENUE_STATUSES)
+    items = OrderItem.objects.exclude(order__status__in=NON_REVENUE_STATUSES)
+    rollups = [DailySales, DailyPaymentSales, DailyProductSales]
+
+    if start or end:
+        start = start or _first_order_day()
+        end = end or timezone.localtime(timezone.now(), REPORT_TZ).date()
+        lower, upper = day_bounds(start, end)
+        orders = orders.filter(date__gte=lower, date__lt=upper)
+        items = items.filter(order__date__gte=lower, order__date__lt=upper)
+        for model in rollups:
+            model.objects.filter(day__range=(start, end)).delete()
+    else:
+        for model in rollups:
+            model.objects.all().delete()
+
+    orders = orders.annotate(day=TruncDate('date', tzinfo=REPORT_TZ))
+    items = items.annotate(day=TruncDate('order__date', tzinfo=REPORT_TZ))
+
+    units_by_day = defaultdict(int)
+    product_rows = []
+    for row in (items.values('day', 'product_id')
+                .annotate(last_title=Max('title'), units=Sum('quantity'),
+                          revenue=Sum(ExpressionWrapper(F('price') * F('quantity'),
+                                                        output_field=MoneyField())))):
+        units_by_day[row['day']] += row['units'] or 0
+        product_rows.append(DailyProductSales(
+            day=row['day'], product_id=row['product_id'], title=row['last_title'],
+            units=row['units'] or 0, revenue=row['revenue'] or 0,
+        ))
+
+    day_rows = [
+        DailySales(day=row['day'], orders=row['orders'],
+                   units=units_by_day[row['day']], revenue=row['revenue'] or 0)
+        for row in orders.values('day').annotate(orders=Count('id'), revenue=Sum('total'))
+    ]
+    payment_rows = [
+        DailyPaymentSales(**row)
+        for row in orders.values('day', 'payment').annotate(orders=Count('id'), revenue=Sum('total'))
+    ]
+
+    DailySales.objects.bulk_create(day_rows, batch_size=1000)
+    DailyPaymentSales.objects.bulk_create(payment_rows, batch_size=1000)
+    DailyProductSales.objects.bulk_create(product_rows, batch_size=1000)
+    return len(day_rows)
+
+
+# ===================================================================
+# RANGE QUERIES
+# ===================================================================
+def summarize(start, end, top=10):
+    daily = DailySales.objects.filter(day__range=(start, end))
+    totals = daily.aggregate(orders=Sum('orders'), units=Sum('units'), revenue=Sum('revenue'))
+
+    by_payment = (
+        DailyPaymentSales.objects.filter(day__range=(start, end))
+        .values('payment')
+        .annotate(order_count=Sum('orders'), revenue_sum=Sum('revenue'))
+        .order_by('-revenue_sum')
+    )
+    top_products = (
+        DailyProductSales.objects.filter(day__range=(start, end))
+        .values('product_id')
+        .annotate(last_title=Max('title'), unit_count=Sum('units'), revenue_sum=Sum('revenue'))
+        .order_by('-revenue_sum')[:top]
+    )
+
+    return {
+        'start': start,
+        'end': end,
+        'timezone': str(REPORT_TZ),
+        'totals': {
+            'orders': totals['orders'] or 0,
+            'units': totals['units'] or 0,
+            'revenue': totals['revenue'] or Decimal('0'),
+        },
+        'daily': list(daily.values('day', 'orders', 'units', 'revenue')),
+        'by_payment': [
+            {'payment': row['payment'], 'orders': row['order_count'], 'revenue': row['revenue_sum']}
+            for row in by_payment
+        ],
+        'top_products': [
+            {'product_id': row['product_id'], 'title': row['last_title'],
+             'units': row['unit_count'], 'revenue': row['revenue_sum']}
+            for row in top_products
+        ],
+    }
@@ -1,7 +1,11 @@
 # purchases/serializers.py
+from django.db import transaction
 from rest_framework import serializers
-from .models import Order, OrderItem
+from .models import Order, OrderItem, OrderStatusTransition
+from .money import MoneyField
+from .reports import contribution, record_new_order, record_order_update
 import time
+from decimal import ROUND_HALF_UP
 import random
 import string
 
@@ -11,13 +15,32 @@ def generate_unique_order_id():
     rand = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
     return f"CT{now}-{rand}"
 
+# Money is stored as integer cents but goes over the wire as a decimal.
+# 18 digits keep amount * 100 inside the BIGINT column.
+class MoneySerializerField(serializers.DecimalField):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_digits', 18)
+        kwargs.setdefault('decimal_places', 2)
+        kwargs.setdefault('rounding', ROUND_HALF_UP)
+        super().__init__(**kwargs)
+
+
+MONEY_FIELD_MAPPING = {
+    **serializers.ModelSerializer.serializer_field_mapping,
+    MoneyField: MoneySerializerField,
+}
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
+    serializer_field_mapping = MONEY_FIELD_MAPPING
+
     class Meta:
         model = OrderItem
         fields = ['product_id', 'title', 'price', 'quantity']
 
 
 class OrderSerializer(serializers.ModelSerializer):
+    serializer_field_mapping = MONEY_FIELD_MAPPING
     items = OrderItemSerializer(many=True)
 
     class Meta:
@@ -29,6 +52,7 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'user', 'date']  # device_id is writable via header
 
+    @transaction.atomic
     def create(self, validated_data):
         items_data = validated_data.pop('items', [])
         request = self.context.get('request')
@@ -57,4 +81,37 @@ class OrderSerializer(serializers.ModelSerializer):
         for item_data in items_data:
             OrderItem.objects.create(order=order, **item_data)
 
-        return order
\ No newline at end of file
+        # === 7. FOLD INTO DAILY SALES ROLLUPS ===
+        record_new_order(order)
+
+        return order
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        old_status = instance.status
+        before = contribution(instance)
+        items_data = validated_data.pop('items', None)
+        order = super().update(instance, validated_data)
+        if items_data is not None:
+            # Items are replaced wholesale, as they were sent at checkout
+            order.items.all().delete()
+            for item_data in items_data:
+                OrderItem.objects.create(order=order, **item_data)
+            getattr(order, '_prefetched_objects_cache', {}).pop('items', None)
+        if order.status != old_status:
+            request = self.context.get('request')
+            user = request.user if request and request.user.is_authenticated else None
+            OrderStatusTransition.objects.create(
+                order=order, from_status=old_status, to_status=order.status, changed_by=user
+            )
+        # Status, total, payment or items may have changed: move the rollups with them
+        record_order_update(before, order)
+        return order
+
+
+class BulkStatusTransitionSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.CharField(max_length=30), allow_empty=False, max_length=500
+    )
+    to_status = serializers.ChoiceField(choices=Order.STATUSES)
+    from_status = serializers.ChoiceField(choices=Order.STATUSES, required=False)
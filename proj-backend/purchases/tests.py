@@ -1,3 +1,338 @@
-from django.test import TestCase
+import json
+from datetime import date
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.test import APIClient
+
+from accounts.models import User
+
+from .exports import filter_orders, iter_orders
+from .fulfilment import CONFLICT, INVALID, NOT_FOUND, UPDATED, bulk_transition
+from .idempotency import fingerprint, resolve_key
+from .models import (
+    DailyPaymentSales, DailyProductSales, DailySales, Order, OrderItem, OrderStatusTransition,
+)
+from .money import MoneyField, from_minor, to_minor
+from .reports import record_new_order
+from .serializers import MoneySerializerField, OrderSerializer
+
+
+class OrderRollupTests(TestCase):
+    def setUp(self):
+        self.order = Order.objects.create(
+            id='ORD-1', name='Jane', phone='0700000000', address='1 Road', city='Nairobi',
+            payment='cod', subtotal=1000, shipping=200, total=1200,
+        )
+        OrderItem.objects.create(order=self.order, product_id='p1', title='Phone', price=500, quantity=2)
+        record_new_order(self.order)
+        self.day = DailySales.objects.get().day
+
+    def patch(self, **data):
+        serializer = OrderSerializer(self.order, data=data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def test_total_change_moves_revenue(self):
+        self.patch(total='1500.00')
+        sales = DailySales.objects.get(day=self.day)
+        self.assertEqual((sales.orders, sales.units, sales.revenue), (1, 2, Decimal('1500.00')))
+        self.assertEqual(DailyPaymentSales.objects.get(day=self.day, payment='cod').revenue, Decimal('1500.00'))
+
+    def test_payment_change_moves_between_methods(self):
+        self.patch(payment='paybill')
+        self.assertEqual(DailyPaymentSales.objects.get(payment='cod').orders, 0)
+        self.assertEqual(DailyPaymentSales.objects.get(payment='paybill').revenue, Decimal('1200.00'))
+
+    def test_items_replaced(self):
+        self.patch(items=[{'product_id': 'p2', 'title': 'Case', 'price': '100.00', 'quantity': 3}])
+        self.assertEqual(DailySales.objects.get(day=self.day).units, 3)
+        self.assertEqual(DailyProductSales.objects.get(product_id='p1').units, 0)
+        self.assertEqual(DailyProductSales.objects.get(product_id='p2').revenue, Decimal('300.00'))
+
+    def test_cancel_then_edit_stays_out(self):
+        self.patch(status='cancelled')
+        self.patch(total='5000.00')
+        sales = DailySales.objects.get(day=self.day)
+        self.assertEqual((sales.orders, sales.revenue), (0, Decimal('0')))
+
+    def test_unrelated_edit_is_a_no_op(self):
+        self.patch(phone='0711111111')
+        self.assertEqual(DailySales.objects.get(day=self.day).revenue, Decimal('1200.00'))
+        self.assertIsInstance(self.day, date)
+
+
+# ===================================================================
+# MONEY AS MINOR UNITS (purchases/money.py, migration 0007)
+# ===================================================================
+def make_order(pk='ORD-M', **money):
+    fields = {'subtotal': 0, 'shipping': 0, 'total': 0, **money}
+    return Order.objects.create(
+        id=pk, name='Jane', phone='0700000000', address='1 Road', city='Nairobi', payment='cod', **fields,
+    )
+
+
+class MoneyFieldTests(TestCase):
+    def test_minor_unit_conversion(self):
+        self.assertEqual(to_minor(Decimal('1234.56')), 123456)
+        self.assertEqual(to_minor('0.005'), 1)       # half-up
+        self.assertEqual(to_minor(19.99), 1999)       # via str(), no float error
+        self.assertEqual(from_minor(123456), Decimal('1234.56'))
+
+    def test_round_trip(self):
+        make_order(total=Decimal('1234.56'), cash_amount='2000', change=Decimal('765.44'))
+        order = Order.objects.get()
+        self.assertEqual((order.total, order.cash_amount, order.change),
+                         (Decimal('1234.56'), Decimal('2000.00'), Decimal('765.44')))
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT total FROM purchases_order')
+            self.assertEqual(cursor.fetchone()[0], 123456)
+
+    def test_lookups_and_aggregates_use_cents(self):
+        from django.db.models import Sum
+        make_order('A', total='10.10')
+        make_order('B', total='0.20')
+        self.assertEqual(Order.objects.filter(total__gt=Decimal('10.00')).get().id, 'A')
+        self.assertEqual(Order.objects.aggregate(s=Sum('total'))['s'], Decimal('10.30'))
+
+    def test_invalid_amount(self):
+        from django.core.exceptions import ValidationError
+        with self.assertRaises(ValidationError):
+            MoneyField().to_python('ten')
+
+    def test_serializer_keeps_amounts_inside_bigint(self):
+        largest = Decimal('9999999999999999.99')
+        serializer = OrderSerializer(data={
+            'name': 'Jane', 'phone': '0700000000', 'address': '1 Road', 'city': 'Nairobi', 'payment': 'cod',
+            'subtotal': largest, 'shipping': 0, 'total': largest, 'items': [],
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.save().total, largest)
+
+        serializer = OrderSerializer(data={**serializer.initial_data, 'total': largest * 10})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('total', serializer.errors)
+
+    def test_serializer_field_keeps_callers_bounds(self):
+        field = MoneySerializerField(min_value=Decimal('0'), max_value=Decimal('100'))
+        self.assertEqual(field.run_validation('99.99'), Decimal('99.99'))
+        for amount in ('-0.01', '100.01'):
+            with self.assertRaises(serializers.ValidationError):
+                field.run_validation(amount)
+
+
+class MoneyMigrationTests(TransactionTestCase):
+    before = [('purchases', '0006_order_status_transitions')]
+    after = [('purchases', '0007_money_minor_units')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_numeric_amounts_become_cents_and_back(self):
+        apps = self.migrate(self.before)
+        OldOrder = apps.get_model('purchases', 'Order')
+        OldOrder.objects.create(
+            id='ORD-OLD', name='Jane', phone='0700000000', address='1 Road', city='Nairobi', payment='cod',
+            cash_amount=Decimal('1500.000000'), change=Decimal('0.505000'),
+            subtotal=Decimal('999.990000'), shipping=Decimal('200'), total=Decimal('1199.990000'),
+        )
+        apps.get_model('purchases', 'OrderItem').objects.create(
+            order_id='ORD-OLD', product_id='p1', title='Phone', price=Decimal('999.99'), quantity=1,
+        )
+
+        apps = self.migrate(self.after)
+        order = apps.get_model('purchases', 'Order').objects.get()
+        self.assertEqual(
+            (order.cash_amount, order.change, order.subtotal, order.shipping, order.total),
+            (Decimal('1500.00'), Decimal('0.51'), Decimal('999.99'), Decimal('200.00'), Decimal('1199.99')),
+        )
+        self.assertEqual(apps.get_model('purchases', 'OrderItem').objects.get().price, Decimal('999.99'))
+
+        apps = self.migrate(self.before)
+        self.assertEqual(apps.get_model('purchases', 'Order').objects.get().total, Decimal('1199.99'))
+
+
+# ===================================================================
+# GUEST ORDER CLAIMS (purchases/claims.py)
+# ===================================================================
+# Login authenticates on the hashing pool's threads, which only see committed rows
+class GuestOrderClaimTests(TransactionTestCase):
+    def setUp(self):
+        User.objects.create_user('jane@example.com', 'correct horse')
+        make_order('MINE', device_id='device-a')
+        make_order('THEIRS', device_id='device-b')
+
+    def test_claims_only_the_header_device(self):
+        response = APIClient().post(
+            '/api/accounts/login/',
+            {'email': 'jane@example.com', 'password': 'correct horse', 'device_ids': ['device-b']},
+            format='json', HTTP_X_DEVICE_ID='device-a',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['claimed_orders'], 1)
+        self.assertEqual(
+            dict(Order.objects.values_list('id', 'user__email')), {'MINE': 'jane@example.com', 'THEIRS': None},
+        )
+
+
+# ===================================================================
+# ORDER EXPORTS (purchases/exports.py)
+# ===================================================================
+class OrderExportTests(TestCase):
+    def setUp(self):
+        for pk in ['E1', 'E2', 'E3', 'E4', 'E5']:
+            make_order(pk, total='10.00')
+        # Several orders on one timestamp: the keyset must break ties on id
+        Order.objects.filter(id__in=['E2', 'E3', 'E4']).update(date=Order.objects.get(id='E2').date)
+        OrderItem.objects.create(order_id='E3', product_id='p1', title='Phone', price=5, quantity=2)
+        OrderItem.objects.create(order_id='E3', product_id='p2', title='Case', price=1, quantity=1)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('staff@example.com', 'x', is_staff=True))
+
+    def export(self, **params):
+        response = self.client.get('/api/orders/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_every_order_once_across_batches(self):
+        for chunk_size in (1, 2, 5, 50):
+            with self.subTest(chunk_size=chunk_size):
+                rows = list(iter_orders(filter_orders(), chunk_size=chunk_size))
+                self.assertEqual(sorted(order['id'] for order, _ in rows), ['E1', 'E2', 'E3', 'E4', 'E5'])
+                self.assertEqual(len(dict((order['id'], items) for order, items in rows)['E3']), 2)
+
+    def test_two_queries_per_batch(self):
+        with self.assertNumQueries(6):
+            list(iter_orders(filter_orders(), chunk_size=2))
+
+    def test_csv_one_line_per_item(self):
+        lines = self.export().splitlines()
+        self.assertEqual(lines[0].split(',')[:2], ['id', 'date'])
+        self.assertEqual(len(lines), 1 + 4 + 2)
+        self.assertEqual(sum(line.startswith('E3,') for line in lines), 2)
+
+    def test_ndjson_nests_items(self):
+        orders = [json.loads(line) for line in self.export(output='ndjson').splitlines()]
+        self.assertEqual(len(orders), 5)
+        items = {order['id']: order['items'] for order in orders}
+        self.assertEqual([item['product_id'] for item in items['E3']], ['p1', 'p2'])
+        self.assertEqual(items['E1'], [])
+
+    def test_staff_only(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/orders/export/').status_code, 401)
+
+
+# ===================================================================
+# IDEMPOTENT SUBMISSION (purchases/idempotency.py)
+# ===================================================================
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class IdempotentOrderTests(TestCase):
+    payload = {
+        'name': 'Jane', 'phone': '0700000000', 'address': '1 Road', 'city': 'Nairobi', 'payment': 'cod',
+        'subtotal': '100.00', 'shipping': '200.00', 'total': '300.00',
+        'items': [{'product_id': 'p1', 'title': 'Phone', 'price': '100.00', 'quantity': 1}],
+    }
+
+    def setUp(self):
+        cache.clear()
+
+    def submit(self, key=None, device=None, payload=None):
+        headers = {}
+        if key:
+            headers['HTTP_IDEMPOTENCY_KEY'] = key
+        if device:
+            headers['HTTP_X_DEVICE_ID'] = device
+        return APIClient().post('/api/orders/', payload or self.payload, format='json', **headers)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.submit('k1', 'device-a')
+        self.assertEqual(first.status_code, 201)
+        again = self.submit('k1', 'device-a')
+        self.assertEqual((again.status_code, again['Idempotent-Replayed']), (201, 'true'))
+        self.assertEqual(again.data['id'], first.data['id'])
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_guests_with_the_same_key_are_kept_apart(self):
+        mine = self.submit('1', 'device-a')
+        theirs = self.submit('1', 'device-b', payload={**self.payload, 'name': 'John'})
+        self.assertEqual((mine.status_code, theirs.status_code), (201, 201))
+        self.assertNotIn('Idempotent-Replayed', theirs)
+        self.assertEqual(theirs.data['name'], 'John')
+
+    def test_guest_key_needs_a_device(self):
+        response = self.submit('k1')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_in_flight_duplicate_gets_409(self):
+        meta = {'HTTP_IDEMPOTENCY_KEY': 'k1', 'HTTP_X_DEVICE_ID': 'device-a'}
+        request = mock.Mock(user=AnonymousUser(), META=meta)
+        key, _ = resolve_key(request, fingerprint(self.payload))
+        cache.add(key + ':lock', 1)  # another worker is running it
+        response = self.submit('k1', 'device-a')
+        self.assertEqual((response.status_code, response['Retry-After']), (409, '1'))
+        self.assertFalse(Order.objects.exists())
+
+    def test_same_key_different_payload(self):
+        self.submit('k1', 'device-a')
+        self.assertEqual(self.submit('k1', 'device-a', payload={**self.payload, 'total': '1.00'}).status_code, 422)
+
+
+# ===================================================================
+# BULK STATUS TRANSITIONS (purchases/fulfilment.py)
+# ===================================================================
+class BulkStatusTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('staff@example.com', 'x', is_staff=True)
+        for pk, order_status in [('B1', 'confirmed'), ('B2', 'confirmed'), ('B3', 'packaging'), ('B4', 'delivered')]:
+            make_order(pk, status=order_status, total='50.00')
+            record_new_order(Order.objects.get(pk=pk))
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def post(self, **data):
+        return self.client.post('/api/orders/bulk-status/', data, format='json')
+
+    def test_outcomes_per_order(self):
+        response = self.post(ids=['B1', 'B3', 'B4', 'NOPE'], to_status='processing')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['updated'], response.data['skipped']), (1, 3))
+        self.assertEqual({pk: o['result'] for pk, o in response.data['results'].items()}, {
+            'B1': UPDATED, 'B3': INVALID, 'B4': INVALID, 'NOPE': NOT_FOUND,
+        })
+        self.assertEqual(dict(Order.objects.values_list('id', 'status'))['B1'], 'processing')
+
+    def test_from_status_guards_against_concurrent_moves(self):
+        results = bulk_transition(['B1', 'B3'], 'dispatched', from_status='confirmed', user=self.staff)
+        self.assertEqual(results['B1']['result'], UPDATED)
+        self.assertEqual(results['B3'], {'result': CONFLICT, 'status': 'packaging'})
+        transition = OrderStatusTransition.objects.get()
+        self.assertEqual((transition.order_id, transition.from_status, transition.to_status), ('B1', 'confirmed', 'dispatched'))
+        self.assertEqual(transition.changed_by, self.staff)
+
+    def test_cancellation_leaves_the_sales_rollups(self):
+        with CaptureQueriesContext(connection) as queries:
+            bulk_transition(['B1', 'B2', 'B3'], Order.CANCELLED)
+        # One UPDATE per current status, not per order
+        self.assertEqual(sum(q['sql'].startswith('UPDATE "purchases_order"') for q in queries), 2)
+        sales = DailySales.objects.get()
+        self.assertEqual((sales.orders, sales.revenue), (1, Decimal('50.00')))
+
+    def test_staff_only(self):
+        self.client.force_authenticate(User.objects.create_user('jane@example.com', 'x'))
+        self.assertEqual(self.post(ids=['B1'], to_status='processing').status_code, 403)
@@ -1,6 +1,9 @@
 # purchases/urls.py
 from django.urls import path
-from .views import OrderListCreateView, OrderDetailView, OrderPublicDetailView
+from .views import (
+    OrderListCreateView, OrderDetailView, OrderPublicDetailView,
+    OrderReportView, OrderExportView, OrderBulkStatusView,
+)
 
 urlpatterns = [
     # 1. LIST & CREATE ORDERS (for admin/auth)
@@ -9,6 +12,11 @@ urlpatterns = [
     # 2. PUBLIC DETAIL (accessible without auth)
     path('order/<str:id>/', OrderPublicDetailView.as_view(), name='order-public-detail'),
 
-    # 3. ADMIN CRUD BY ID
+    # 3. ADMIN REPORTS, EXPORT & BULK STATUS (must come before the <id> catch-all)
+    path('reports/', OrderReportView.as_view(), name='order-reports'),
+    path('export/', OrderExportView.as_view(), name='order-export'),
+    path('bulk-status/', OrderBulkStatusView.as_view(), name='order-bulk-status'),
+
+    # 4. ADMIN CRUD BY ID
     path('<str:id>/', OrderDetailView.as_view(), name='order-detail-crud'),
 ]
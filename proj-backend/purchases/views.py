@@ -1,14 +1,27 @@
 # purchases/views.py
+from datetime import timedelta
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from backend.throttling import TokenBucketThrottle
 from .models import Order
-from .serializers import OrderSerializer
+from .serializers import OrderSerializer, BulkStatusTransitionSerializer
+from .fulfilment import bulk_transition, UPDATED
+from .reports import REPORT_TZ, record_deleted_order, summarize
+from .exports import EXPORT_FORMATS, filter_orders, stream_export
+from .idempotency import run_once
 
 
 # 1. LIST + CREATE ORDERS (SECURE FILTERING)
 class OrderListCreateView(generics.ListCreateAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.AllowAny]  # Allow guest CREATE only
+    throttle_classes = [TokenBucketThrottle]  # POST only
+    throttle_scope = 'orders'
 
     def get_queryset(self):
         """
@@ -23,22 +36,26 @@ class OrderListCreateView(generics.ListCreateAPIView):
         if user.is_authenticated and (user.is_staff or user.is_superuser):
             return queryset
 
-        # LOGGED IN USER → THEIR ORDERS
+        # LOGGED IN USER → THEIR ORDERS (guest orders are claimed at login/register)
         if user.is_authenticated:
             return queryset.filter(user=user)
 
-        # GUEST → device_id only
+        # GUEST → unclaimed orders for their device_id only
         device_id = self.request.query_params.get('device_id')
         if device_id:
-            return queryset.filter(device_id=device_id)
+            return queryset.filter(user__isnull=True, device_id=device_id)
 
         # DEFAULT: NO ACCESS
         return queryset.none()
 
     def create(self, request, *args, **kwargs):
         """
-        Create order — serializer handles ID, device_id, user
+        Create order — serializer handles ID, device_id, user.
+        Retries with the same Idempotency-Key replay the first response.
         """
+        return run_once(request, lambda: self._create(request))
+
+    def _create(self, request):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
@@ -69,6 +86,11 @@ class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
     def delete(self, request, *args, **kwargs):
         return self.destroy(request, *args, **kwargs)
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        record_deleted_order(instance)
+        instance.delete()
+
 
 # 3. PUBLIC: FETCH SINGLE ORDER (NO LOGIN)
 class OrderPublicDetailView(generics.RetrieveAPIView):
@@ -86,4 +108,98 @@ class OrderPublicDetailView(generics.RetrieveAPIView):
             return Response(
                 {"error": "Order not found"},
                 status=status.HTTP_404_NOT_FOUND
-            )
\ No newline at end of file
+            )
+
+
+# 4. ADMIN: SALES REPORTS (SERVED FROM DAILY ROLLUPS)
+class OrderReportView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        ?start=YYYY-MM-DD&end=YYYY-MM-DD (inclusive, Africa/Nairobi days)
+        Defaults to the last 30 days.
+        """
+        today = timezone.localtime(timezone.now(), REPORT_TZ).date()
+        try:
+            end = self._parse_day(request.query_params.get('end')) or today
+            start = self._parse_day(request.query_params.get('start')) or end - timedelta(days=29)
+            top = int(request.query_params.get('top', 10))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if start > end:
+            return Response(
+                {"error": "start must be on or before end"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(summarize(start, end, top=max(1, min(top, 100))))
+
+    @staticmethod
+    def _parse_day(value):
+        if not value:
+            return None
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        return day
+
+
+# 5. ADMIN: STREAMING ORDER EXPORT (CSV / NDJSON)
+class OrderExportView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        ?output=csv|ndjson&start=YYYY-MM-DD&end=YYYY-MM-DD&status=confirmed,delivered
+        ("format" is reserved by DRF content negotiation, hence "output")
+        """
+        fmt = request.query_params.get('output', 'csv').lower()
+        if fmt not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"output must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            start = OrderReportView._parse_day(request.query_params.get('start'))
+            end = OrderReportView._parse_day(request.query_params.get('end'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        statuses = [s for s in request.query_params.get('status', '').split(',') if s]
+        queryset = filter_orders(start=start, end=end, statuses=statuses)
+
+        response = StreamingHttpResponse(
+            stream_export(queryset, fmt), content_type=EXPORT_FORMATS[fmt]
+        )
+        response['Content-Disposition'] = f'attachment; filename="orders.{fmt}"'
+        return response
+
+
+# 6. ADMIN: BULK STATUS TRANSITIONS (FULFILMENT)
+class OrderBulkStatusView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        """
+        { "ids": [...], "to_status": "dispatched", "from_status": "confirmed" }
+        from_status is optional; when given, orders in any other status are
+        reported as conflicts and left untouched.
+        """
+        serializer = BulkStatusTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        outcomes = bulk_transition(
+            data['ids'],
+            data['to_status'],
+            from_status=data.get('from_status'),
+            user=request.user,
+        )
+        updated = sum(1 for o in outcomes.values() if o['result'] == UPDATED)
+        return Response({
+            "updated": updated,
+            "skipped": len(outcomes) - updated,
+            "results": outcomes,
+        }, status=status.HTTP_200_OK)
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from . import moderation
 from .models import Testimonial
 
 @admin.register(Testimonial)
@@ -7,3 +8,17 @@ class TestimonialAdmin(admin.ModelAdmin):
     list_filter = ("is_approved", "rating")
     search_fields = ("name", "product", "experience", "email")
     readonly_fields = ("created_at", "updated_at")
+    actions = ["approve", "reject"]
+
+    @admin.action(description="Approve selected testimonials")
+    def approve(self, request, queryset):
+        self.message_user(request, f"Approved {moderation.approve(queryset)} testimonial(s).")
+
+    @admin.action(description="Reject selected testimonials")
+    def reject(self, request, queryset):
+        self.message_user(request, f"Rejected {moderation.reject(queryset)} testimonial(s).")
+
+    # Used by the built-in "Delete selected" action: one DELETE, one feed invalidation,
+    # and the photo variants removed
+    def delete_queryset(self, request, queryset):
+        moderation.delete(queryset)
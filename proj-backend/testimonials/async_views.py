@@ -0,0 +1,23 @@
+# testimonials/async_views.py
+"""
+Async testimonial reads for the ASGI deployment (see backend/async_views.py).
+Submissions and moderation still go to TestimonialViewSet.
+"""
+from django.http import HttpResponse
+from rest_framework.request import Request
+
+from backend.async_views import async_routes, read_or_fallback
+from .feed import arender_page
+from .views import TestimonialViewSet
+
+testimonial_list, testimonial_detail = async_routes(TestimonialViewSet)
+
+
+async def _feed(request):
+    content, hit = await arender_page(Request(request, authenticators=()))
+    response = HttpResponse(content, content_type='application/json')
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
+
+
+testimonial_feed = read_or_fallback(_feed, TestimonialViewSet.as_view({'get': 'feed'}))
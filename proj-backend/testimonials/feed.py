@@ -0,0 +1,107 @@
+# testimonials/feed.py
+"""
+Public testimonial feed: approved rows only, keyset-paginated, with each
+rendered page cached.
+
+Page keys embed a feed version. Testimonial.save()/delete() bump it when an
+approved row (or one that was approved) changes, so moderation shows up on
+the next request while the old pages simply age out.
+
+Pages are keyed by their canonical URL: only the re-encoded cursor and a
+non-default page size, so arbitrary extra query params share the cached
+page instead of each rendering (and storing) a copy of it.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from backend.pagination import KeysetPagination
+from .models import Testimonial
+from .serializers import TestimonialFeedSerializer
+
+VERSION_KEY = 'testimonials:feed:version'
+PAGE_TTL = 60 * 10
+
+
+class TestimonialFeedPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+    page_size = 12
+    max_page_size = 50
+
+    def base_url(self, request):
+        """Canonical page URL: only the params that select the page, normalized."""
+        params = {}
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            # Re-encoded, so padding or spelling variants share a page (bad ones 404)
+            values = self.decode_cursor(Testimonial, self.ordering, cursor)
+            params[self.cursor_query_param] = self.encode_cursor(values)
+        page_size = self.get_page_size(request)
+        if page_size != self.page_size:
+            params[self.page_size_query_param] = page_size
+        url = request.build_absolute_uri(request.path)
+        return f'{url}?{urlencode(params)}' if params else url
+
+
+def feed_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY, 0)
+    return version
+
+
+async def afeed_version():
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, time.time_ns(), None)
+        version = await cache.aget(VERSION_KEY, 0)
+    return version
+
+
+def invalidate_feed():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def _page_key(url, version):
+    digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+    return f'testimonials:feed:{version}:{digest}'
+
+
+def _render(paginator, page, request):
+    data = TestimonialFeedSerializer(page, many=True, context={'request': request}).data
+    return JSONRenderer().render(paginator.get_paginated_response(data).data)
+
+
+def render_page(request):
+    """Return (JSON bytes, cache hit?) for the feed page `request` asks for."""
+    paginator = TestimonialFeedPagination()
+    key = _page_key(paginator.base_url(request), feed_version())
+    content = cache.get(key)
+    if content is not None:
+        return content, True
+
+    page = paginator.paginate_queryset(Testimonial.objects.filter(is_approved=True), request)
+    content = _render(paginator, page, request)
+    cache.set(key, content, PAGE_TTL)
+    return content, False
+
+
+async def arender_page(request):
+    """render_page() for async views."""
+    paginator = TestimonialFeedPagination()
+    key = _page_key(paginator.base_url(request), await afeed_version())
+    content = await cache.aget(key)
+    if content is not None:
+        return content, True
+
+    page = await paginator.apaginate_queryset(Testimonial.objects.filter(is_approved=True), request)
+    content = _render(paginator, page, request)
+    await cache.aset(key, content, PAGE_TTL)
+    return content, False
@@ -0,0 +1,108 @@
+# testimonials/image_pipeline.py
+"""
+Responsive WebP variants for testimonial photos.
+
+Testimonial.save() schedules processing after commit whenever the photo
+changes. A small thread pool takes it from there, off the request path: it
+reads the original from storage, hands the decode/resize/encode to a
+process pool (CPU-bound Pillow work shouldn't hold the GIL in a web
+worker), uploads the variants and records them on the row. Variants of a
+replaced or deleted photo are removed from storage.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+
+from backend.metrics import IMAGE_JOBS_PENDING
+from .imaging import make_variants
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_processes = None
+_threads = None
+
+
+def _pools():
+    global _processes, _threads
+    with _lock:
+        if _processes is None:
+            workers = settings.TESTIMONIAL_IMAGE_WORKERS
+            # spawn: forking a threaded web worker is unsafe
+            _processes = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+            _threads = ThreadPoolExecutor(workers, thread_name_prefix='testimonial-img')
+    return _processes, _threads
+
+
+def variant_name(image_name, width):
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return f'testimonials/variants/{stem}-{width}w.webp'
+
+
+def build_variants(testimonial):
+    """Create and store the variants for testimonial.image; return the stored list."""
+    processes, _ = _pools()
+    with testimonial.image.open('rb') as original:
+        data = original.read()
+    variants = processes.submit(make_variants, data).result()
+
+    stored = []
+    for width, height, webp in variants:
+        name = default_storage.save(variant_name(testimonial.image.name, width), ContentFile(webp))
+        stored.append({'name': name, 'width': width, 'height': height, 'bytes': len(webp)})
+    return stored
+
+
+def process_testimonial(pk):
+    """Build variants for one testimonial and save them. Returns the stored list or None."""
+    from .models import Testimonial
+
+    testimonial = Testimonial.objects.filter(pk=pk).first()
+    if testimonial is None or not testimonial.image:
+        return None
+    image_name = testimonial.image.name
+    stored = build_variants(testimonial)
+
+    # Only record them if the photo wasn't replaced meanwhile
+    updated = Testimonial.objects.filter(pk=pk, image=image_name).update(image_variants=stored)
+    if not updated:
+        delete_variants(stored)
+        return None
+    # Reprocessing (process_testimonial_images --all) replaces earlier variants
+    delete_variants(testimonial.image_variants)
+    if testimonial.is_approved:
+        from .feed import invalidate_feed
+        invalidate_feed()
+    return stored
+
+
+def delete_variants(variants):
+    """Remove stored variant files; a failure only leaves an orphan behind."""
+    for variant in variants:
+        try:
+            default_storage.delete(variant['name'])
+        except Exception:
+            logger.warning("Could not delete image variant %s", variant['name'], exc_info=True)
+
+
+def _run(pk):
+    try:
+        process_testimonial(pk)
+    except Exception:
+        logger.exception("Image processing failed for testimonial %s", pk)
+    finally:
+        IMAGE_JOBS_PENDING.dec()
+        close_old_connections()
+
+
+def schedule(pk):
+    _, threads = _pools()
+    IMAGE_JOBS_PENDING.inc()
+    threads.submit(_run, pk)
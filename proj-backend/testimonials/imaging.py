@@ -0,0 +1,40 @@
+# testimonials/imaging.py
+"""
+Pure image work for testimonial photos, run in worker processes.
+
+Nothing here touches Django, so the module imports cleanly in a freshly
+spawned process (see testimonials/image_pipeline.py).
+"""
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+WIDTHS = (320, 640, 1280)
+WEBP_QUALITY = 80
+
+
+def make_variants(data, widths=WIDTHS, quality=WEBP_QUALITY):
+    """
+    Decode an uploaded photo, apply its EXIF orientation and return
+    [(width, height, webp_bytes)] for each target width not larger than the
+    photo (at least one). Metadata (EXIF, GPS, ICC) is not carried over.
+    """
+    with Image.open(BytesIO(data)) as image:
+        # JPEG can decode straight at 1/2, 1/4 or 1/8 scale; far less work for phone photos
+        image.draft('RGB', (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(image)
+        mode = 'RGBA' if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info else 'RGB'
+        image = image.convert(mode)
+
+        targets = [w for w in sorted(widths) if w < image.width] or [image.width]
+        if image.width <= max(widths) and image.width not in targets:
+            targets.append(image.width)
+
+        variants = []
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            out = BytesIO()
+            resized.save(out, 'WEBP', quality=quality, method=4)
+            variants.append((width, height, out.getvalue()))
+        return variants
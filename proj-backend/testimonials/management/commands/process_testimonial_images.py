@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from testimonials.image_pipeline import process_testimonial
+from testimonials.models import Testimonial
+
+CAROUSEL_WIDTH = 640
+
+
+class Command(BaseCommand):
+    help = "Build WebP variants for testimonial photos and report the byte savings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help="Reprocess photos that already have variants.")
+
+    def handle(self, *args, **options):
+        queryset = Testimonial.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            queryset = queryset.filter(image_variants=[])
+
+        processed = failed = original_bytes = carousel_bytes = 0
+        for testimonial in queryset.iterator():
+            try:
+                variants = process_testimonial(testimonial.pk)
+                original_bytes += testimonial.image.size
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Testimonial {testimonial.pk}: {e}")
+                continue
+            if not variants:
+                continue
+            processed += 1
+            # What the carousel loads: the largest variant no wider than CAROUSEL_WIDTH
+            fitting = [v for v in variants if v['width'] <= CAROUSEL_WIDTH] or variants[:1]
+            carousel_bytes += fitting[-1]['bytes']
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} photo(s), {failed} failed."))
+        if processed:
+            self.stdout.write(
+                f"Originals {original_bytes / 1024:.0f} KiB → {CAROUSEL_WIDTH}w WebP "
+                f"{carousel_bytes / 1024:.0f} KiB ({original_bytes / max(carousel_bytes, 1):.1f}x smaller)"
+            )
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 03:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testimonials', '0003_remove_testimonial_category'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testimonial',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['created_at', 'id'], name='testimonial_approved_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 04:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testimonials', '0004_approved_feed_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testimonial',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 
 class Testimonial(models.Model):
     CATEGORY_CHOICES = [
@@ -13,6 +13,8 @@ class Testimonial(models.Model):
 
     product = models.CharField(max_length=255)
     image = models.ImageField(upload_to='testimonials/', blank=True, null=True)
+    # 🖼️ WebP sizes of `image` for srcset: [{name, width, height, bytes}] (image_pipeline.py)
+    image_variants = models.JSONField(default=list, blank=True, editable=False)
     experience = models.TextField()
     rating = models.PositiveSmallIntegerField(default=5)  # 1-5
     name = models.CharField(max_length=120)
@@ -24,6 +26,79 @@ class Testimonial(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # ⭐ Public feed (testimonials/feed.py): approved only, newest first
+            models.Index(fields=["created_at", "id"], condition=models.Q(is_approved=True),
+                         name="testimonial_approved_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} — {self.product} ({self.rating})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        stored = dict(zip(field_names, values))
+        # Remember the stored approval so un-approving also refreshes the feed
+        instance._was_approved = stored.get("is_approved", True)
+        if "image" in stored:
+            instance._stored_image = stored["image"] or None
+        return instance
+
+    def _image_changed(self, update_fields):
+        if update_fields is not None and "image" not in update_fields:
+            return False
+        if self._state.adding:
+            return bool(self.image)
+        if "image" in self.get_deferred_fields():
+            return False  # never loaded, so never reassigned
+        if not hasattr(self, "_stored_image"):
+            # Loaded with .only()/.defer(), read or assigned since
+            stored = type(self).objects.filter(pk=self.pk).values_list("image", flat=True).first()
+            self._stored_image = stored or None
+        return (self.image.name or None) != self._stored_image
+
+    # Changes to approved testimonials invalidate the cached public feed;
+    # new pending submissions don't
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        image_changed = self._image_changed(update_fields)
+        old_variants = []
+        if image_changed:
+            if not self._state.adding:
+                if "image_variants" in self.get_deferred_fields():
+                    self.refresh_from_db(fields=["image_variants"])
+                old_variants = self.image_variants
+            self.image_variants = []
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "image_variants"}
+        super().save(*args, **kwargs)
+        if self.is_approved or getattr(self, "_was_approved", False):
+            self._invalidate_feed()
+        self._was_approved = self.is_approved
+        self._stored_image = self.image.name or None
+
+        # 🖼️ New photo → drop the old variants and build new ones after commit, off the request path
+        if old_variants:
+            self._delete_variants(old_variants)
+        if image_changed and self.image:
+            from .image_pipeline import schedule
+            pk = self.pk
+            transaction.on_commit(lambda: schedule(pk))
+
+    def delete(self, *args, **kwargs):
+        variants = self.image_variants
+        result = super().delete(*args, **kwargs)
+        if self.is_approved or getattr(self, "_was_approved", False):
+            self._invalidate_feed()
+        if variants:
+            self._delete_variants(variants)
+        return result
+
+    def _delete_variants(self, variants):
+        from .image_pipeline import delete_variants
+        transaction.on_commit(lambda: delete_variants(variants))
+
+    def _invalidate_feed(self):
+        from .feed import invalidate_feed
+        transaction.on_commit(invalidate_feed)
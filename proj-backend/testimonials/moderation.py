@@ -0,0 +1,60 @@
+# testimonials/moderation.py
+"""
+Bulk moderation: one UPDATE or DELETE per batch.
+
+QuerySet.update()/delete() skip Testimonial.save()/delete(), so these
+helpers invalidate the public feed themselves, once per batch and only
+when an approved row was affected, and delete() removes the photo
+variants the rows recorded.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Testimonial
+
+MAX_BATCH = 1000
+
+
+def _invalidate_feed():
+    from .feed import invalidate_feed
+    transaction.on_commit(invalidate_feed)
+
+
+def approve(queryset):
+    """Approve the pending rows of `queryset`. Returns how many changed."""
+    count = queryset.filter(is_approved=False).update(is_approved=True, updated_at=timezone.now())
+    if count:
+        _invalidate_feed()
+    return count
+
+
+def reject(queryset):
+    """Withdraw approval from the approved rows of `queryset`. Returns how many changed."""
+    count = queryset.filter(is_approved=True).update(is_approved=False, updated_at=timezone.now())
+    if count:
+        _invalidate_feed()
+    return count
+
+
+def delete(queryset):
+    """Delete every row of `queryset` and its photo variants. Returns how many were deleted."""
+    with transaction.atomic():
+        was_public = queryset.filter(is_approved=True).exists()
+        variants = [
+            variant for recorded in queryset.values_list('image_variants', flat=True) for variant in recorded
+        ]
+        count, _ = queryset.delete()
+    if was_public:
+        _invalidate_feed()
+    if variants:
+        from .image_pipeline import delete_variants
+        transaction.on_commit(lambda: delete_variants(variants))
+    return count
+
+
+ACTIONS = {'approve': approve, 'reject': reject, 'delete': delete}
+
+
+def moderate(action, ids):
+    """Apply `action` to the testimonials with these ids."""
+    return ACTIONS[action](Testimonial.objects.filter(pk__in=ids))
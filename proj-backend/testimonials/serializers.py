@@ -1,7 +1,22 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from .models import Testimonial
+from .moderation import ACTIONS, MAX_BATCH
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """[{url, width, height}] smallest first, for srcset; empty until processed."""
+
+    def to_representation(self, value):
+        return [
+            {'url': default_storage.url(v['name']), 'width': v['width'], 'height': v['height']}
+            for v in sorted(value or [], key=lambda v: v['width'])
+        ]
+
 
 class TestimonialSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Testimonial
         read_only_fields = ("id", "created_at", "updated_at", "is_approved")
@@ -9,7 +24,24 @@ class TestimonialSerializer(serializers.ModelSerializer):
 
 # Admin serializer that allows toggling is_approved
 class TestimonialAdminSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Testimonial
         fields = "__all__"
         read_only_fields = ("id", "created_at", "updated_at")
+
+# Public feed: approved testimonials without contact details
+class TestimonialFeedSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
+    class Meta:
+        model = Testimonial
+        fields = ("id", "product", "image", "image_variants", "experience", "rating", "name", "created_at")
+
+
+# Bulk moderation request: {"action": "approve", "ids": [1, 2, 3]}
+class TestimonialBulkSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=sorted(ACTIONS))
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False,
+                                max_length=MAX_BATCH)
@@ -1,3 +1,170 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+
+from .admin import TestimonialAdmin
+from .models import Testimonial
+
+
+# ===================================================================
+# PUBLIC FEED (testimonials/feed.py)
+# ===================================================================
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestimonialFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Testimonial.objects.bulk_create([
+            Testimonial(product='Phone', experience='Great', name=f'Buyer {i}', is_approved=True)
+            for i in range(3)
+        ])
+        self.client = APIClient()
+
+    def get(self, query=''):
+        return self.client.get(f'/api/testimonials/feed/{query}')
+
+    def test_extra_params_share_the_cached_page(self):
+        self.assertEqual(self.get('?page_size=2')['X-Cache'], 'MISS')
+        response = self.get('?utm_source=x&page_size=2&_=123')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(cache._cache), 2)   # the feed version and one page
+
+        # The cached next link carries only the page-selecting params
+        next_link = response.json()['next']
+        self.assertNotIn('utm_source', next_link)
+        self.assertIn('page_size=2', next_link)
+
+    def test_default_page_size_is_the_same_page(self):
+        self.get()
+        self.assertEqual(self.get('?page_size=12')['X-Cache'], 'HIT')
+
+    def test_cursor_is_normalized(self):
+        next_link = self.get('?page_size=2').json()['next']
+        cursor = next_link.split('cursor=')[1].split('&')[0]
+        self.assertEqual(self.get(f'?page_size=2&cursor={cursor}')['X-Cache'], 'MISS')
+        self.assertEqual(self.get(f'?cursor={cursor}==&page_size=2&ref=mail')['X-Cache'], 'HIT')
+        self.assertEqual(len(self.get(f'?page_size=2&cursor={cursor}').json()['results']), 1)
+
+    def test_bad_cursor_is_not_found(self):
+        self.assertEqual(self.get('?cursor=junk').status_code, 404)
+
+
+# ===================================================================
+# PHOTO VARIANTS (Testimonial.save(), image_pipeline.py)
+# ===================================================================
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+@mock.patch('testimonials.image_pipeline.schedule')
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.variant = default_storage.save('testimonials/variants/old-320w.webp', ContentFile(b'webp'))
+        testimonial = Testimonial.objects.create(
+            product='Phone', experience='Great', name='Jane', image='testimonials/old.jpg',
+        )
+        # As the pipeline records them
+        Testimonial.objects.filter(pk=testimonial.pk).update(
+            image_variants=[{'name': self.variant, 'width': 320, 'height': 240, 'bytes': 4}],
+        )
+
+    def test_replacing_the_photo_deletes_old_variants(self, schedule):
+        testimonial = Testimonial.objects.get()
+        testimonial.image = 'testimonials/new.jpg'
+        with self.captureOnCommitCallbacks(execute=True):
+            testimonial.save(update_fields=['image'])
+        self.assertFalse(default_storage.exists(self.variant))
+        self.assertEqual(Testimonial.objects.get().image_variants, [])
+        schedule.assert_called_once_with(testimonial.pk)
+
+    def test_deferred_photo_is_left_alone(self, schedule):
+        testimonial = Testimonial.objects.only('id', 'is_approved').get()
+        testimonial.is_approved = True
+        with self.captureOnCommitCallbacks(execute=True):
+            testimonial.save()
+        self.assertTrue(default_storage.exists(self.variant))
+        self.assertEqual(len(Testimonial.objects.get().image_variants), 1)
+        schedule.assert_not_called()
+
+    def test_photo_assigned_after_deferred_load(self, schedule):
+        testimonial = Testimonial.objects.defer('image', 'image_variants').get()
+        testimonial.image = 'testimonials/new.jpg'
+        with self.captureOnCommitCallbacks(execute=True):
+            testimonial.save()
+        self.assertFalse(default_storage.exists(self.variant))
+        self.assertEqual(Testimonial.objects.get().image_variants, [])
+        schedule.assert_called_once()
+
+    def test_deleting_removes_variants(self, schedule):
+        with self.captureOnCommitCallbacks(execute=True):
+            Testimonial.objects.get().delete()
+        self.assertFalse(default_storage.exists(self.variant))
+
+
+# ===================================================================
+# BULK MODERATION (testimonials/moderation.py)
+# ===================================================================
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+class BulkModerationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user('staff@example.com', 'x', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+        self.pending = Testimonial.objects.create(product='Phone', experience='Great', name='Pending')
+        self.approved = Testimonial.objects.create(product='Phone', experience='Great', name='Approved',
+                                                   is_approved=True)
+
+    def with_variant(self, testimonial, name):
+        stored = default_storage.save(f'testimonials/variants/{name}-320w.webp', ContentFile(b'webp'))
+        Testimonial.objects.filter(pk=testimonial.pk).update(
+            image_variants=[{'name': stored, 'width': 320, 'height': 240, 'bytes': 4}],
+        )
+        return stored
+
+    def bulk(self, action, *testimonials):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/testimonials/bulk/', {
+                'action': action, 'ids': [t.pk for t in testimonials],
+            }, format='json')
+
+    def feed_names(self):
+        return [row['name'] for row in self.client.get('/api/testimonials/feed/').json()['results']]
+
+    def test_approve_and_reject_refresh_the_feed(self):
+        self.assertEqual(self.feed_names(), ['Approved'])
+        self.assertEqual(self.bulk('approve', self.pending, self.approved).data['count'], 1)
+        self.assertEqual(sorted(self.feed_names()), ['Approved', 'Pending'])
+        self.assertEqual(self.bulk('reject', self.pending, self.approved).data['count'], 2)
+        self.assertEqual(self.feed_names(), [])
+
+    def test_bulk_delete_removes_variants(self):
+        variants = [self.with_variant(self.pending, 'a'), self.with_variant(self.approved, 'b')]
+        # exists(), the variant list, one DELETE, inside one savepoint
+        with self.assertNumQueries(5):
+            response = self.bulk('delete', self.pending, self.approved)
+        self.assertEqual(response.data['count'], 2)
+        self.assertFalse(Testimonial.objects.exists())
+        self.assertEqual([default_storage.exists(name) for name in variants], [False, False])
+
+    def test_admin_delete_selected_removes_variants(self):
+        variant = self.with_variant(self.approved, 'c')
+        with self.captureOnCommitCallbacks(execute=True):
+            TestimonialAdmin(Testimonial, admin.site).delete_queryset(None, Testimonial.objects.all())
+        self.assertFalse(default_storage.exists(variant))
+
+    def test_staff_only(self):
+        self.client.force_authenticate(User.objects.create_user('jane@example.com', 'x'))
+        self.assertEqual(self.bulk('approve', self.pending).status_code, 403)
@@ -1,8 +1,21 @@
 # testimonials/urls.py
+from django.conf import settings
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 from .views import TestimonialViewSet
 
 router = DefaultRouter()
 router.register(r'testimonials', TestimonialViewSet, basename='testimonial')
 
-urlpatterns = router.urls
+urlpatterns = []
+
+# Under backend.asgi reads are served by the async views (see products/urls.py)
+if settings.ASYNC_CATALOG_VIEWS:
+    from . import async_views
+    urlpatterns += [
+        path('testimonials/', async_views.testimonial_list, name='testimonial-list'),
+        path('testimonials/feed/', async_views.testimonial_feed, name='testimonial-feed'),
+        path('testimonials/<int:pk>/', async_views.testimonial_detail, name='testimonial-detail'),
+    ]
+
+urlpatterns += router.urls
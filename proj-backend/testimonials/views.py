@@ -1,13 +1,22 @@
 from rest_framework import generics, permissions, viewsets, status
 from rest_framework.response import Response
+from rest_framework.decorators import action
+from django.http import HttpResponse
+from backend.throttling import TokenBucketThrottle
+from backend.uploads import IMAGE_UPLOAD_PARSERS
 from .models import Testimonial
-from .serializers import TestimonialSerializer, TestimonialAdminSerializer
+from .moderation import moderate
+from .serializers import TestimonialSerializer, TestimonialAdminSerializer, TestimonialBulkSerializer
+from .feed import render_page
 
 # Public route for users to submit/view testimonials
 class TestimonialListCreateView(generics.ListCreateAPIView):
     queryset = Testimonial.objects.all().order_by('-created_at')
     serializer_class = TestimonialSerializer
     permission_classes = [permissions.AllowAny]  # No login needed
+    parser_classes = IMAGE_UPLOAD_PARSERS  # the photo
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = 'testimonials'
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -20,10 +29,13 @@ class TestimonialListCreateView(generics.ListCreateAPIView):
 class TestimonialViewSet(viewsets.ModelViewSet):
     queryset = Testimonial.objects.all().order_by('-created_at')
     serializer_class = TestimonialSerializer
+    parser_classes = IMAGE_UPLOAD_PARSERS  # the photo
+    throttle_classes = [TokenBucketThrottle]  # public create (POST) only
+    throttle_scope = 'testimonials'
 
     def get_permissions(self):
         # ✅ Anyone can view, but only admins can edit/delete
-        if self.action in ['update', 'partial_update', 'destroy']:
+        if self.action in ['update', 'partial_update', 'destroy', 'bulk']:
             from rest_framework.permissions import IsAdminUser
             return [IsAdminUser()]
         return [permissions.AllowAny()]
@@ -33,3 +45,20 @@ class TestimonialViewSet(viewsets.ModelViewSet):
         if self.action in ['update', 'partial_update', 'destroy']:
             return TestimonialAdminSerializer
         return TestimonialSerializer
+
+    # ✅ Public homepage feed: approved only, paginated, cached per page
+    @action(detail=False, methods=['get'])
+    def feed(self, request):
+        content, hit = render_page(request)
+        response = HttpResponse(content, content_type='application/json')
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+    # ✅ Bulk approve/reject/delete: one query per batch, feed invalidated once
+    @action(detail=False, methods=['post'], throttle_classes=[])
+    def bulk(self, request):
+        serializer = TestimonialBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        action_name = serializer.validated_data['action']
+        count = moderate(action_name, serializer.validated_data['ids'])
+        return Response({'action': action_name, 'count': count})